@@ -1,54 +1,128 @@
-import os
-from flask import Flask, render_template, request, redirect, url_for, flash
+"""
+The BugKiller web app.
+
+``create_app`` builds the Flask application; importing this module creates
+the default one (``app``, for gunicorn, tests and ``python app.py``) without
+touching the database or the broker. The schema version is checked on the
+first request (see migrations.py); Celery lives in celery_app.py.
+"""
+
+import io
+import csv
+import json
+import time
+import collections
+import datetime
+import threading
+
+import click
+from flask import (
+    Flask,
+    current_app,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    abort,
+    session,
+    make_response,
+    Response,
+    stream_with_context,
+)
+from markupsafe import Markup
 from flask_login import (
     LoginManager,
     UserMixin,
     login_user,
     logout_user,
     login_required,
+    current_user,
 )
-from werkzeug.security import check_password_hash
 from prometheus_flask_exporter import PrometheusMetrics
-from prometheus_client import Counter
-from celery import Celery
-
-from database import db_manager
-from config import Config
-
-# Create the Flask application instance
-app = Flask(__name__)
-if os.environ.get("TESTING") == "True":
-    from config import TestingConfig
-
-    app.config.from_object(TestingConfig)
-else:
-    app.config.from_object(Config)
-
-# Celery Configuration
-celery = Celery(app.name, broker=app.config.get("CELERY_BROKER_URL"))
-celery.conf.update(
-    broker_url=app.config.get("CELERY_BROKER_URL"),
-    result_backend=app.config.get("CELERY_RESULT_BACKEND"),
-    task_always_eager=app.config.get("CELERY_TASK_ALWAYS_EAGER", False),
+from prometheus_client import REGISTRY, Counter
+
+from database import db_manager, PartialInsertError
+from db_metrics import PoolCollector
+from config import get_config
+from cache import make_bug_list_cache, LRUCache
+from outbox import enqueue_bug_notifications
+from passwords import PASSWORD_REHASHED, VerifierBusy, make_password_verifier
+from resilience import push_deadline, pop_deadline
+from search import search_bugs
+import archive
+from http_cache import Compressor, ConditionalGet, templates_fingerprint
+import migrations
+import stats
+from profiling import RequestProfiler, SamplingProfiler
+from pagination import encode_cursor, decode_cursor, keyset_page_params, InvalidCursor
+from statements import (
+    BugRecord,
+    INSERT_BUG,
+    DELETE_BUG,
+    BUG_BY_ID,
+    BUG_STATUS,
+    EXPORT_BUGS,
+    EXPORT_BUGS_BY_STATUS,
+    UPDATE_BUG_STATUS,
+    UPDATE_USER_PASSWORD,
+    USER_BY_ID,
+    USER_BY_USERNAME,
+    bug_page_statement,
 )
 
-# Register tasks with the configured celery instance
-from tasks import register_tasks
+# Views are collected by @route and added to each app by create_app, under
+# their function names (the endpoints url_for uses)
+_routes = []
+
+
+def route(rule, **options):
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+
+    return decorator
 
-tasks_registry = register_tasks(celery)
-send_bug_report_email = tasks_registry["send_email"]
-send_slack_notification = tasks_registry["send_slack"]
 
 # [Level 17] Prometheus Metrics Setup
-metrics = PrometheusMetrics(app, path="/metrics")
+metrics = PrometheusMetrics.for_app_factory(path="/metrics")
+# Pool gauges are read from pool_stats() at scrape time
+REGISTRY.register(PoolCollector(db_manager))
 BUG_CREATED_COUNTER = Counter(
     "bug_created_total", "Total number of bugs reported", ["status"]
 )
+USER_LOOKUP_COUNTER = Counter(
+    "user_lookups_total",
+    "Flask-Login user loads by source (session, cache or db)",
+    ["source"],
+)
+
+# Per-process state, built by create_app from the app's config:
+# the dashboard's read-through cache, invalidated by every bug write
+bug_list_cache = None
+# HTTP validators for the dashboard, derived from bug_list_cache's version
+conditional_get = None
+# Identity cache for load_user
+user_cache = None
+# Password checks for /login, in a bounded pool of processes
+password_verifier = None
+# Opt-in request profiling: PROFILER_SAMPLE_RATE of requests, plus admin
+# requests sent with the X-Profile header; results under /admin/profile
+request_profiler = None
+
+# Whether this process has checked the schema version (ensure_schema)
+_schema_ready = False
+_schema_lock = threading.Lock()
+# Served even while the database is unreachable or behind
+SCHEMA_EXEMPT_ENDPOINTS = {"health_check", "prometheus_metrics", "static"}
 
 # Login Manager Setup
 login_manager = LoginManager()
 login_manager.login_view = "login"
-login_manager.init_app(app)
+
+
+# Statuses offered by the add form and the dashboard filter
+BUG_STATUSES = ["New", "In Progress", "Resolved", "Closed"]
 
 
 # User Model for Flask-Login (kept here for simplicity, models.py is optional)
@@ -58,114 +132,648 @@ class User(UserMixin):
         self.username = username
 
 
+def invalidate_user(user_id):
+    """Drop a cached identity; call whenever a user row changes."""
+    user_cache.delete(str(user_id))
+
+
+def _remember_identity(user_id, username):
+    user_cache.set(str(user_id), (user_id, username))
+    if current_app.config.get("USER_IDENTITY_IN_SESSION"):
+        session["_identity"] = [user_id, username, time.time()]
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    row = db_manager.fetch_one(
-        "SELECT id, username FROM users WHERE id = ?", (user_id,)
-    )
+    if current_app.config.get("USER_IDENTITY_IN_SESSION"):
+        identity = session.get("_identity")
+        if (
+            identity
+            and str(identity[0]) == str(user_id)
+            and time.time() - identity[2]
+            < current_app.config.get("USER_SESSION_IDENTITY_TTL", 300)
+        ):
+            USER_LOOKUP_COUNTER.labels(source="session").inc()
+            return User(identity[0], identity[1])
+
+    cached = user_cache.get(str(user_id))
+    if cached is not None:
+        USER_LOOKUP_COUNTER.labels(source="cache").inc()
+        return User(*cached)
+
+    USER_LOOKUP_COUNTER.labels(source="db").inc()
+    row = db_manager.query_one(USER_BY_ID, (user_id,))
     if row:
-        uid = row["id"] if isinstance(row, dict) else row[0]
-        uname = row["username"] if isinstance(row, dict) else row[1]
-        return User(uid, uname)
+        _remember_identity(row.id, row.username)
+        return User(row.id, row.username)
     return None
 
 
-# Initialize database before first request
-with app.app_context():
-    db_manager.init_db()
+def _is_profiler_admin():
+    return (
+        current_user.is_authenticated
+        and current_user.username in current_app.config.get("PROFILER_ADMINS", [])
+    )
 
 
-@app.route("/health")
+def ensure_schema():
+    """
+    Check the schema version on the first request of this process (one
+    indexed lookup) and migrate, or refuse to serve, when it is behind.
+    """
+    global _schema_ready
+    if _schema_ready or request.endpoint in SCHEMA_EXEMPT_ENDPOINTS:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        auto_migrate = current_app.config.get("DB_AUTO_MIGRATE", True)
+        try:
+            current = migrations.is_current(db_manager)
+        except Exception:
+            # e.g. a MySQL database that does not exist yet
+            if not auto_migrate:
+                raise
+            current = False
+        if not current:
+            if not auto_migrate:
+                raise RuntimeError("Database schema is behind; run scripts/migrate.py")
+            current_app.logger.info("Migrating the database schema")
+            db_manager.init_db()
+        _schema_ready = True
+
+
+def start_db_budget():
+    # Every DB call (and retry) in this request shares one time budget
+    request.environ["bugkiller.db_deadline"] = push_deadline(
+        current_app.config.get("DB_REQUEST_BUDGET", 5)
+    )
+
+
+def end_db_budget(exc=None):
+    token = request.environ.pop("bugkiller.db_deadline", None)
+    if token is not None:
+        pop_deadline(token)
+
+
+@route("/health")
 def health_check():
-    """Health check endpoint for K8s."""
+    """
+    Health check endpoint for K8s. Reports "degraded" (still HTTP 200, so the
+    pod is not restarted for an outage it cannot fix) while the database
+    circuit breaker is not closed.
+    """
+    breaker_state = db_manager.breaker.state
+    if breaker_state != "closed":
+        return {"status": "degraded", "database": breaker_state}, 200
     return {"status": "healthy"}, 200
 
 
-@app.route("/")
+def fetch_bug_page(status=None, cursor=None, limit=20):
+    """Return one newest-first page of BugRecords and the cursor of the next page."""
+    rows = db_manager.query(
+        bug_page_statement(status, cursor), keyset_page_params(status, cursor, limit)
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def _load_bug_page_for_cache(status, cursor, limit):
+    bugs, next_cursor = fetch_bug_page(status=status, cursor=cursor, limit=limit)
+    return [bug.as_tuple() for bug in bugs], next_cursor
+
+
+def _load_status_counts():
+    counts = stats.status_counts(db_manager)
+    return {"total": sum(counts.values()), **counts}
+
+
+def _render_bug_table(status, cursor, limit, cache_key):
+    # Pages are cached as plain tuples so every backend (Redis included) can
+    # store them; rebuilding a page's records on a hit is cheap.
+    rows, next_cursor = bug_list_cache.get_or_load(
+        cache_key, lambda: _load_bug_page_for_cache(status, cursor, limit)
+    )
+    return render_template(
+        "bug_table.html",
+        bugs=[BugRecord(*row) for row in rows],
+        counts=bug_list_cache.get_or_load("status_counts", _load_status_counts),
+        status=status,
+        statuses=BUG_STATUSES,
+        next_cursor=next_cursor,
+        is_first_page=cursor is None,
+    )
+
+
+@route("/")
 def index():
-    # [L16 FIX] Added LIMIT 20 to prevent O(N) latency
-    bugs = db_manager.execute_query(
-        "SELECT * FROM bugs ORDER BY created_at DESC LIMIT 20", fetch=True
+    # Keyset pagination: every page is an index range scan, however deep
+    status = request.args.get("status") or None
+    limit = request.args.get(
+        "limit", current_app.config.get("BUGS_PER_PAGE", 20), type=int
     )
-    return render_template("index.html", bugs=bugs)
+    limit = max(1, min(limit, current_app.config.get("BUGS_MAX_PER_PAGE", 100)))
+    try:
+        cursor = (
+            decode_cursor(request.args["after"]) if "after" in request.args else None
+        )
+    except InvalidCursor:
+        abort(400)
+
+    # A poll of an unchanged page is answered from the data version alone,
+    # without querying or rendering. Pending flashes must be rendered.
+    validator = None
+    if (
+        current_app.config.get("HTTP_CONDITIONAL_GET", True)
+        and "_flashes" not in session
+    ):
+        validator = bug_list_cache.validator()
+    if validator is not None:
+        etag = conditional_get.etag(
+            validator, request.full_path, current_user.get_id() or ""
+        )
+        last_modified = conditional_get.last_modified(validator)
+        if conditional_get.is_fresh(etag, last_modified):
+            response = make_response("", 304)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return conditional_get.apply(response, etag, last_modified)
+
+    cache_key = f"{status}|{request.args.get('after', '')}|{limit}"
+    # The rendered table is shared by every user with the same login state
+    authenticated = current_user.is_authenticated
+    bug_table = bug_list_cache.get_or_load(
+        f"html|{int(authenticated)}|{cache_key}",
+        lambda: _render_bug_table(status, cursor, limit, cache_key),
+    )
+    response = make_response(render_template("index.html", bug_table=Markup(bug_table)))
+    # Clients must revalidate, which the ETag makes cheap
+    response.headers["Cache-Control"] = "private, no-cache"
+    if validator is not None:
+        conditional_get.apply(response, etag, last_modified)
+    return response
+
+
+def _search_page():
+    """Run the search described by the request args for both search routes."""
+    text = request.args.get("q", "").strip()
+    per_page = current_app.config.get("SEARCH_PER_PAGE", 20)
+    page = max(1, request.args.get("page", 1, type=int))
+    if page * per_page > current_app.config.get("SEARCH_MAX_RESULTS", 1000):
+        abort(400)
+    bugs, has_next = search_bugs(db_manager, text, page, per_page)
+    return text, page, bugs, has_next
+
+
+@route("/search")
+def search():
+    text, page, bugs, has_next = _search_page()
+    return render_template(
+        "search.html", q=text, page=page, bugs=bugs, has_next=has_next
+    )
+
 
+@route("/api/search")
+def api_search():
+    """Ranked title search: ?q=terms&page=N; the last term matches as a prefix."""
+    text, page, bugs, has_next = _search_page()
+    return {
+        "q": text,
+        "page": page,
+        "next_page": page + 1 if has_next else None,
+        "results": [
+            {**bug.as_dict(), "created_at": str(bug.created_at)} for bug in bugs
+        ],
+    }
 
-@app.route("/login", methods=["GET", "POST"])
+
+@route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         username = request.form.get("username")
         password = request.form.get("password")
 
-        user_row = db_manager.fetch_one(
-            "SELECT * FROM users WHERE username = ?", (username,)
-        )
+        user_row = db_manager.query_one(USER_BY_USERNAME, (username,))
 
+        valid = False
         if user_row:
-            stored_pw = (
-                user_row["password"] if isinstance(user_row, dict) else user_row[2]
-            )
-            user_id = user_row["id"] if isinstance(user_row, dict) else user_row[0]
-
-            if check_password_hash(stored_pw, password):
-                user = User(user_id, username)
-                login_user(user)
-                return redirect(url_for("index"))
+            try:
+                valid, new_hash = password_verifier.verify(user_row.password, password)
+            except VerifierBusy:
+                # Shed the login storm instead of queueing it behind the pool
+                flash("Too many logins right now, please try again")
+                response = make_response(render_template("login.html"), 503)
+                response.headers["Retry-After"] = "1"
+                return response
+            if new_hash is not None:
+                _store_rehashed_password(user_row.id, new_hash)
+
+        if valid:
+            user = User(user_row.id, username)
+            login_user(user)
+            _remember_identity(user_row.id, username)
+            return redirect(url_for("index"))
 
         flash("Invalid username or password")
     return render_template("login.html")
 
 
-@app.route("/logout")
+def _store_rehashed_password(user_id, new_hash):
+    # Best effort: the login succeeds either way, the upgrade is retried
+    # on the next one
+    try:
+        db_manager.execute_write(UPDATE_USER_PASSWORD, (new_hash, user_id))
+    except Exception as e:
+        current_app.logger.error(f"Could not store rehashed password: {e}")
+        return
+    PASSWORD_REHASHED.inc()
+    invalidate_user(user_id)
+
+
+@route("/logout")
 @login_required
 def logout():
     logout_user()
+    session.pop("_identity", None)
     return redirect(url_for("index"))
 
 
-@app.route("/add", methods=["GET", "POST"])
+@route("/add", methods=["GET", "POST"])
 def add_bug():
     if request.method == "POST":
         title = request.form.get("bug_title")
         status = request.form.get("bug_status")
 
+        def insert_bug(tx):
+            # Also indexes the title for search (FTS5 trigger / FULLTEXT)
+            bug_id = tx.execute(INSERT_BUG, (title, status))
+            # Queued in the same transaction; the outbox relay publishes it
+            enqueue_bug_notifications(tx, [[bug_id, title, status]])
+            stats.record_created(tx, [bug_id])
+
         try:
-            db_manager.execute_query(
-                "INSERT INTO bugs (title, status) VALUES (?, ?)", (title, status)
-            )
+            db_manager.write(insert_bug)
             BUG_CREATED_COUNTER.labels(status=status).inc()
+            bug_list_cache.invalidate()
         except Exception as e:
-            app.logger.error(f"Database error during add_bug: {e}")
+            current_app.logger.error(f"Database error during add_bug: {e}")
             flash(f"Error saving bug to database: {str(e)}")
             return redirect(url_for("index"))
 
-        # [Level 14] Trigger background task (Async)
-        try:
-            send_bug_report_email.delay(title, status)
-        except Exception as e:
-            app.logger.error(f"Celery task submission failed: {e}")
-
-        # [Level 15] External Notification (Async via Celery)
-        try:
-            send_slack_notification.delay(title, status)
-        except Exception as e:
-            app.logger.error(f"Failed to queue Slack task: {e}")
-
         return redirect(url_for("index"))
 
     return render_template("add_bug.html")
 
 
-@app.route("/delete/<int:bug_id>")
+def _validate_bulk_bugs(items):
+    """Return ([(title, status), ...], errors) for a bulk payload."""
+    rows, errors = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({"index": index, "error": "must be an object"})
+            continue
+        title = item.get("title")
+        status = item.get("status") or "New"
+        if not isinstance(title, str) or not title.strip() or len(title) > 255:
+            errors.append({"index": index, "error": "title must be 1-255 characters"})
+        elif not isinstance(status, str) or len(status) > 50:
+            errors.append(
+                {"index": index, "error": "status must be at most 50 characters"}
+            )
+        else:
+            rows.append((title, status))
+    return rows, errors
+
+
+@route("/api/bugs/bulk", methods=["POST"])
+def bulk_add_bugs():
+    """
+    Create many bugs from a JSON list (or {"bugs": [...]}) of
+    {"title": ..., "status": ...} objects. The payload is validated as a whole,
+    inserted in chunked transactions, each queueing its notifications in the
+    outbox. If a later chunk fails the earlier ones stay committed and the
+    response is 207 with their ids and the index to resume from.
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get("bugs") if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        return {"error": "Expected a non-empty JSON list of bugs"}, 400
+    max_bugs = current_app.config.get("BULK_MAX_BUGS", 10000)
+    if len(items) > max_bugs:
+        return {"error": f"At most {max_bugs} bugs per request"}, 413
+
+    rows, errors = _validate_bulk_bugs(items)
+    if errors:
+        return {"error": "Validation failed", "details": errors[:100]}, 400
+
+    def enqueue_chunk(tx, chunk, chunk_ids):
+        stats.record_created(tx, chunk_ids)
+        # One outbox row per channel per chunk instead of two tasks per bug
+        enqueue_bug_notifications(
+            tx,
+            [
+                [bug_id, title, status]
+                for bug_id, (title, status) in zip(chunk_ids, chunk)
+            ],
+        )
+
+    failure = None
+    try:
+        ids = db_manager.insert_many(
+            INSERT_BUG,
+            rows,
+            chunk_size=current_app.config.get("BULK_INSERT_CHUNK_SIZE", 500),
+            on_chunk=enqueue_chunk,
+        )
+    except PartialInsertError as e:
+        current_app.logger.error(f"Database error during bulk_add_bugs: {e.cause}")
+        ids, failure = e.ids, e
+    if not ids:
+        return {"error": "Database error"}, 500
+
+    committed = rows[: len(ids)]
+    by_status = collections.Counter(status for _, status in committed)
+    for status, count in by_status.items():
+        BUG_CREATED_COUNTER.labels(status=status).inc(count)
+    bug_list_cache.invalidate()
+
+    if failure is not None:
+        # The first len(ids) bugs are stored; a client retries from there
+        return {
+            "error": "Database error; only some bugs were created",
+            "ids": ids,
+            "count": len(ids),
+            "failed_index": len(ids),
+        }, 207
+    return {"ids": ids, "count": len(ids)}, 201
+
+
+def _export_ndjson(bugs, rows_per_chunk=500):
+    lines = []
+    for bug in bugs:
+        row = bug.as_dict()
+        row["created_at"] = str(row["created_at"])
+        lines.append(json.dumps(row) + "\n")
+        # Hand the server a few KB at a time, not one write per row
+        if len(lines) == rows_per_chunk:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
+
+
+def _export_csv(bugs, rows_per_chunk=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(BugRecord.__slots__)
+    for count, bug in enumerate(bugs, 1):
+        writer.writerow(bug.as_tuple())
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@route("/api/bugs/export")
+def export_bugs():
+    """
+    Stream every bug (optionally ?status=...) in id order as NDJSON
+    (default) or ?format=csv. Rows go from a server-side cursor straight to
+    the response, so memory stays flat however large the table is.
+    """
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ("ndjson", "csv"):
+        return {"error": "format must be ndjson or csv"}, 400
+    status = request.args.get("status")
+    if status:
+        bugs = db_manager.stream(EXPORT_BUGS_BY_STATUS, (status,))
+    else:
+        bugs = db_manager.stream(EXPORT_BUGS)
+
+    if export_format == "csv":
+        body, mimetype = _export_csv(bugs), "text/csv"
+    else:
+        body, mimetype = _export_ndjson(bugs), "application/x-ndjson"
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = (
+        f"attachment; filename=bugs.{export_format}"
+    )
+    return response
+
+
+def _bug_json(bug, archived):
+    return {**bug.as_dict(), "created_at": str(bug.created_at), "archived": archived}
+
+
+@route("/api/bugs/<int:bug_id>")
+def get_bug(bug_id):
+    """One bug by id, from the working table or the archive."""
+    bug = db_manager.query_one(BUG_BY_ID, (bug_id,))
+    if bug is not None:
+        return _bug_json(bug, False)
+    bug = archive.archived_bug(db_manager, bug_id)
+    if bug is not None:
+        return _bug_json(bug, True)
+    return {"error": "Bug not found"}, 404
+
+
+@route("/api/bugs/archived")
+def list_archived_bugs():
+    """Archived bugs, newest id first: ?before=<id>&limit=N."""
+    limit = request.args.get(
+        "limit", current_app.config.get("BUGS_PER_PAGE", 20), type=int
+    )
+    limit = max(1, min(limit, current_app.config.get("BUGS_MAX_PER_PAGE", 100)))
+    bugs, next_before = archive.archived_page(
+        db_manager, request.args.get("before", type=int), limit
+    )
+    return {
+        "bugs": [_bug_json(bug, True) for bug in bugs],
+        "next_before": next_before,
+    }
+
+
+@route("/delete/<int:bug_id>")
 @login_required
 def delete_bug(bug_id):
+    def remove_bug(tx):
+        stats.record_removed(tx, [bug_id])
+        # Also removes the bug from the search index
+        tx.execute(DELETE_BUG, (bug_id,))
+
     try:
-        db_manager.execute_query("DELETE FROM bugs WHERE id = ?", (bug_id,))
+        db_manager.write(remove_bug)
+        bug_list_cache.invalidate()
     except Exception as e:
-        app.logger.error(f"Error deleting bug {bug_id}: {e}")
+        current_app.logger.error(f"Error deleting bug {bug_id}: {e}")
         flash(f"Error deleting bug: {str(e)}")
 
     return redirect(url_for("index"))
 
 
+@route("/api/bugs/<int:bug_id>/status", methods=["POST"])
+@login_required
+def update_bug_status(bug_id):
+    """Set a bug's status from {"status": ...}, adjusting the status counts."""
+    payload = request.get_json(silent=True) or {}
+    status = payload.get("status")
+    if status not in BUG_STATUSES:
+        return {"error": f"status must be one of {BUG_STATUSES}"}, 400
+
+    def change_status(tx):
+        row = tx.fetch_one(BUG_STATUS, (bug_id,))
+        if row is not None:
+            tx.execute(UPDATE_BUG_STATUS, (status, bug_id))
+            stats.record_status_change(tx, row["status"], status)
+        return row is not None
+
+    try:
+        found = db_manager.write(change_status)
+    except Exception as e:
+        current_app.logger.error(f"Error updating bug {bug_id}: {e}")
+        return {"error": "Database error"}, 500
+    if not found:
+        return {"error": "Bug not found"}, 404
+    bug_list_cache.invalidate()
+    return {"id": bug_id, "status": status}
+
+
+@route("/api/stats")
+def api_stats():
+    """
+    Status counts and the creation trend: ?period=hour|day (default hour)
+    and ?days=N (default 7, at most 366) of buckets.
+    """
+    period = request.args.get("period", "hour")
+    if period not in stats.PERIODS:
+        abort(400)
+    days = max(1, min(request.args.get("days", 7, type=int), 366))
+    since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+    return {
+        "counts": bug_list_cache.get_or_load("status_counts", _load_status_counts),
+        "period": period,
+        "created": [
+            {"bucket": bucket, "count": count}
+            for bucket, count in stats.created_trend(db_manager, period, since)
+        ],
+    }
+
+
+def _require_profiler_admin():
+    # 404 rather than 403: the profiler is not advertised to other users
+    if not _is_profiler_admin():
+        abort(404)
+
+
+@route("/admin/profile", methods=["GET", "POST"])
+def profile_summary():
+    """
+    Profiled requests and samples per endpoint; POST {"sample_rate": x}
+    changes this process's sampling rate (0 turns sampling off).
+    """
+    _require_profiler_admin()
+    if request.method == "POST":
+        payload = request.get_json(silent=True) or {}
+        rate = payload.get("sample_rate")
+        if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            return {"error": "sample_rate must be a number from 0 to 1"}, 400
+        request_profiler.sample_rate = float(rate)
+    return {
+        "sample_rate": request_profiler.sample_rate,
+        "interval": request_profiler.profiler.interval,
+        "endpoints": request_profiler.profiler.summary(),
+    }
+
+
+@route("/admin/profile/download")
+def profile_download():
+    """
+    The aggregated stacks as ?format=collapsed (default) or speedscope,
+    for every endpoint or just ?endpoint=.
+    """
+    _require_profiler_admin()
+    fmt = request.args.get("format", "collapsed")
+    endpoint = request.args.get("endpoint") or None
+    profiler = request_profiler.profiler
+    if fmt == "collapsed":
+        body, mimetype, ext = profiler.collapsed(endpoint), "text/plain", "txt"
+    elif fmt == "speedscope":
+        body, mimetype = profiler.speedscope(endpoint), "application/json"
+        ext = "speedscope.json"
+    else:
+        abort(400)
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=profile.{ext}"},
+    )
+
+
+@route("/admin/profile/reset", methods=["POST"])
+def profile_reset():
+    _require_profiler_admin()
+    request_profiler.profiler.reset()
+    return {"reset": True}
+
+
+@click.command("migrate")
+def migrate_command():
+    """Apply pending schema migrations."""
+    db_manager.init_db()
+    click.echo(f"Schema at version {migrations.current_version(db_manager)}")
+
+
+def create_app(config_object=None):
+    """
+    Build the app from ``config_object`` (default: config.get_config()).
+    Call it once per process: the metrics and caches are process-wide.
+    """
+    global bug_list_cache, conditional_get, user_cache, password_verifier
+    global request_profiler
+
+    app = Flask(__name__)
+    app.config.from_object(config_object or get_config())
+
+    metrics.init_app(app)
+
+    bug_list_cache = make_bug_list_cache(app.config)
+    conditional_get = ConditionalGet(salt=templates_fingerprint(app.template_folder))
+    if app.config.get("HTTP_COMPRESS", True):
+        app.after_request(
+            Compressor(
+                min_size=app.config.get("HTTP_COMPRESS_MIN_SIZE", 1024),
+                gzip_level=app.config.get("HTTP_GZIP_LEVEL", 6),
+                brotli_quality=app.config.get("HTTP_BROTLI_QUALITY", 5),
+            )
+        )
+    user_cache = LRUCache(
+        "users",
+        maxsize=app.config.get("USER_CACHE_SIZE", 1024),
+        ttl=app.config.get("USER_CACHE_TTL", 60),
+    )
+    login_manager.init_app(app)
+    password_verifier = make_password_verifier(app.config)
+
+    app.before_request(ensure_schema)
+    request_profiler = RequestProfiler(
+        SamplingProfiler(interval=app.config.get("PROFILER_INTERVAL", 0.005)),
+        sample_rate=app.config.get("PROFILER_SAMPLE_RATE", 0.0),
+        is_admin=_is_profiler_admin,
+    )
+    request_profiler.init_app(app)
+    app.before_request(start_db_budget)
+    app.teardown_request(end_db_budget)
+
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    app.cli.add_command(migrate_command)
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
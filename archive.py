@@ -0,0 +1,152 @@
+"""
+Hot/cold archival of old bugs.
+
+Bugs in a terminal status (``ARCHIVE_STATUSES``) created more than
+``ARCHIVE_AFTER_DAYS`` ago move from ``bugs`` to ``bugs_archive`` in small
+batches, each its own transaction, so the working table, its indexes and the
+dashboard stay sized by live work. Between batches the mover sleeps in
+proportion to how long the batch held the writer (``max_duty_cycle``), so a
+run never takes more than that share of write capacity from ``/add``.
+
+Archived bugs keep their ids and stay readable through ``archived_bug`` and
+``archived_page``; they still count in the statistics (see stats.py) but no
+longer show up in the dashboard or search.
+"""
+
+import datetime
+import logging
+import time
+
+from prometheus_client import Counter
+
+from statements import BUG_LIST_COLUMNS, BugRecord, statement
+
+logger = logging.getLogger(__name__)
+
+BUGS_ARCHIVED = Counter("bugs_archived_total", "Bugs moved to the archive table")
+
+ARCHIVED_BUG = statement(
+    "archived_bug",
+    f"SELECT {BUG_LIST_COLUMNS} FROM bugs_archive WHERE id = ?",
+    BugRecord,
+)
+ARCHIVED_PAGE = statement(
+    "archived_page",
+    f"SELECT {BUG_LIST_COLUMNS} FROM bugs_archive ORDER BY id DESC LIMIT ?",
+    BugRecord,
+)
+ARCHIVED_PAGE_BEFORE = statement(
+    "archived_page_before",
+    f"SELECT {BUG_LIST_COLUMNS} FROM bugs_archive WHERE id < ?"
+    " ORDER BY id DESC LIMIT ?",
+    BugRecord,
+)
+
+
+def create_archive_table(db):
+    """
+    Create ``bugs_archive``. This is migration 5; apply it with
+    ``migrations.migrate`` rather than calling it directly.
+    """
+    db.execute_query(
+        """
+        CREATE TABLE IF NOT EXISTS bugs_archive (
+            id INT NOT NULL PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            status VARCHAR(50),
+            created_at TIMESTAMP NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def archive_batch(db, cutoff, statuses, batch_size=500):
+    """
+    Move up to ``batch_size`` bugs with a status in ``statuses`` created
+    before ``cutoff`` (a ``YYYY-MM-DD HH:MM:SS`` string) in one transaction.
+    Returns the number moved.
+    """
+    select = (
+        f"SELECT id FROM bugs WHERE status IN ({_placeholders(statuses)})"
+        " AND created_at < ? LIMIT ?"
+    )
+    if db.db_type == "mysql":
+        # Lock the batch so a concurrent status change cannot slip in
+        select += " FOR UPDATE"
+    with db.transaction() as tx:
+        rows = tx.fetchall(select, (*statuses, cutoff, batch_size))
+        ids = [row["id"] for row in rows]
+        if ids:
+            # The predicate is repeated in case a row changed since the SELECT
+            where = (
+                f"id IN ({_placeholders(ids)})"
+                f" AND status IN ({_placeholders(statuses)}) AND created_at < ?"
+            )
+            params = (*ids, *statuses, cutoff)
+            tx.execute(
+                "INSERT INTO bugs_archive (id, title, status, created_at)"
+                f" SELECT id, title, status, created_at FROM bugs WHERE {where}",
+                params,
+            )
+            tx.execute(f"DELETE FROM bugs WHERE {where}", params)
+    BUGS_ARCHIVED.inc(len(ids))
+    return len(ids)
+
+
+def archive_old_bugs(
+    db,
+    older_than_days,
+    statuses,
+    batch_size=500,
+    max_duty_cycle=0.2,
+    max_seconds=None,
+    sleep=time.sleep,
+):
+    """
+    Archive every eligible bug, batch by batch, until none is left or
+    ``max_seconds`` passed. After a batch that took ``t`` seconds the mover
+    sleeps ``t * (1 - max_duty_cycle) / max_duty_cycle``. Returns a dict with
+    ``archived``, ``batches`` and ``seconds``.
+    """
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        days=older_than_days
+    )
+    cutoff = cutoff.strftime("%Y-%m-%d %H:%M:%S")
+    statuses = tuple(statuses)
+    started = time.monotonic()
+    result = {"archived": 0, "batches": 0, "seconds": 0.0}
+    while True:
+        batch_start = time.monotonic()
+        moved = archive_batch(db, cutoff, statuses, batch_size)
+        busy = time.monotonic() - batch_start
+        result["archived"] += moved
+        result["batches"] += 1
+        if moved < batch_size:
+            break
+        if max_seconds is not None and time.monotonic() - started >= max_seconds:
+            logger.info("Archival stopped after %.1fs; resuming next run", max_seconds)
+            break
+        if max_duty_cycle < 1:
+            sleep(busy * (1 - max_duty_cycle) / max_duty_cycle)
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+def archived_bug(db, bug_id):
+    """The archived BugRecord ``bug_id``, or None."""
+    return db.query_one(ARCHIVED_BUG, (bug_id,))
+
+
+def archived_page(db, before_id=None, limit=20):
+    """Newest-first page of archived bugs and the ``before_id`` of the next."""
+    if before_id is None:
+        rows = db.query(ARCHIVED_PAGE, (limit + 1,))
+    else:
+        rows = db.query(ARCHIVED_PAGE_BEFORE, (before_id, limit + 1))
+    next_before = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_before
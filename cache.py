@@ -0,0 +1,263 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_HITS = Counter("cache_hits_total", "Cache lookups served from cache", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "Cache lookups that missed", ["cache"])
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total", "Entries dropped from a cache", ["cache", "reason"]
+)
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL.
+
+    Version counters are kept outside the LRU so they can never be evicted;
+    losing one would resurrect entries written under an older version.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        # Versions count writes seen by this process only
+        self._nonce = uuid.uuid4().hex[:8]
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= now:
+                del self._data[key]
+                CACHE_EVICTIONS.labels(cache=self.name, reason="expired").inc()
+                entry = None
+            if entry is None:
+                CACHE_MISSES.labels(cache=self.name).inc()
+                return None
+            self._data.move_to_end(key)
+        CACHE_HITS.labels(cache=self.name).inc()
+        return entry[0]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                CACHE_EVICTIONS.labels(cache=self.name, reason="capacity").inc()
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_version(self, namespace):
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def bump_version(self, namespace):
+        with self._lock:
+            version = self._versions.get(namespace, 0) + 1
+            self._versions[namespace] = version
+            return version
+
+    def version_token(self, namespace):
+        """
+        A token that changes whenever ``namespace``'s data may have changed.
+        Other processes' writes are invisible here, so the token also rolls
+        over every ``ttl`` seconds: it is never trusted for longer than the
+        entries themselves.
+        """
+        window = int(time.time() // self.ttl) if self.ttl else 0
+        return f"{self._nonce}.{self.get_version(namespace)}.{window}"
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """
+    Redis-backed cache shared by every node; values are stored as JSON.
+
+    Redis errors are logged and treated as misses so a cache outage degrades
+    to hitting the database instead of failing requests. Evictions happen
+    server-side and show up in Redis' own ``evicted_keys`` stat.
+    """
+
+    def __init__(self, name, url, ttl=None, prefix="bugkiller:cache:"):
+        import redis
+
+        self.name = name
+        self.ttl = ttl
+        self.prefix = f"{prefix}{name}:"
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+
+    def get(self, key):
+        try:
+            raw = self._client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning("Redis cache %s get failed: %s", self.name, e)
+            raw = None
+        if raw is None:
+            CACHE_MISSES.labels(cache=self.name).inc()
+            return None
+        CACHE_HITS.labels(cache=self.name).inc()
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            self._client.set(
+                self.prefix + key, json.dumps(value, default=str), ex=ttl or None
+            )
+        except Exception as e:
+            logger.warning("Redis cache %s set failed: %s", self.name, e)
+
+    def delete(self, key):
+        try:
+            self._client.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning("Redis cache %s delete failed: %s", self.name, e)
+
+    def clear(self):
+        try:
+            keys = list(self._client.scan_iter(self.prefix + "*"))
+            if keys:
+                self._client.delete(*keys)
+        except Exception as e:
+            logger.warning("Redis cache %s clear failed: %s", self.name, e)
+
+    def get_version(self, namespace):
+        try:
+            return int(self._client.get(f"{self.prefix}version:{namespace}") or 0)
+        except Exception as e:
+            logger.warning("Redis cache %s version read failed: %s", self.name, e)
+            return 0
+
+    def version_token(self, namespace):
+        """The shared version, or None if Redis cannot be asked right now."""
+        try:
+            return str(int(self._client.get(f"{self.prefix}version:{namespace}") or 0))
+        except Exception as e:
+            logger.warning("Redis cache %s version read failed: %s", self.name, e)
+            return None
+
+    def bump_version(self, namespace):
+        try:
+            return self._client.incr(f"{self.prefix}version:{namespace}")
+        except Exception as e:
+            # Entries written under the old version live on until their TTL.
+            logger.warning("Redis cache %s version bump failed: %s", self.name, e)
+            return None
+
+
+class NullCache:
+    """Cache that never stores anything; used when caching is disabled."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def get(self, key):
+        CACHE_MISSES.labels(cache=self.name).inc()
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+    def get_version(self, namespace):
+        return 0
+
+    def bump_version(self, namespace):
+        return 0
+
+    def version_token(self, namespace):
+        # Writes are not tracked, so nothing can be validated
+        return None
+
+
+class VersionedCache:
+    """
+    Read-through cache for one namespace, invalidated by bumping its version.
+
+    Keys embed the namespace version, so ``invalidate()`` is a single counter
+    increment no matter how many entries exist; entries of older versions are
+    simply never read again and age out via TTL/LRU.
+    """
+
+    def __init__(self, backend, namespace):
+        self.backend = backend
+        self.namespace = namespace
+
+    def version(self):
+        return self.backend.get_version(self.namespace)
+
+    def validator(self):
+        """
+        Opaque token for HTTP validators (ETag/Last-Modified): it changes
+        whenever the namespace is invalidated. None when the backend cannot
+        tell, in which case responses must not be validated.
+        """
+        return self.backend.version_token(self.namespace)
+
+    def get_or_load(self, key, loader):
+        full_key = f"{self.namespace}:v{self.version()}:{key}"
+        value = self.backend.get(full_key)
+        if value is None:
+            value = loader()
+            self.backend.set(full_key, value)
+        return value
+
+    def invalidate(self):
+        return self.backend.bump_version(self.namespace)
+
+
+def make_cache(name, backend="memory", url=None, maxsize=1024, ttl=None):
+    """Build a cache backend by name: ``memory``, ``redis`` or ``none``."""
+    if backend == "redis":
+        return RedisCache(name, url, ttl=ttl)
+    if backend == "memory":
+        return LRUCache(name, maxsize=maxsize, ttl=ttl)
+    if backend == "none":
+        return NullCache(name)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+def make_bug_list_cache(config):
+    """
+    The dashboard's read-through cache, from BUG_LIST_CACHE_* in ``config``.
+    Processes sharing a Redis backend see each other's invalidations.
+    """
+    return VersionedCache(
+        make_cache(
+            "bug_list",
+            backend=config.get("BUG_LIST_CACHE_BACKEND", "memory"),
+            url=config.get("REDIS_URL"),
+            maxsize=config.get("BUG_LIST_CACHE_SIZE", 1024),
+            ttl=config.get("BUG_LIST_CACHE_TTL", 5),
+        ),
+        "bugs",
+    )
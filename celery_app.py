@@ -0,0 +1,86 @@
+"""
+The Celery application for workers and beat, kept out of the web process:
+
+    celery -A celery_app.celery worker --loglevel=info
+    celery -A celery_app.celery beat --loglevel=info
+
+Tasks use the same configuration as the app (config.get_config()). The
+schema is created by scripts/migrate.py before workers start, not here.
+Workers serve their metrics on CELERY_METRICS_PORT; run them with
+PROMETHEUS_MULTIPROC_DIR set to an empty directory so that the prefork
+children's metrics are included (see tasks.start_metrics_server).
+"""
+
+from celery import Celery
+from celery.signals import worker_init
+
+from cache import make_bug_list_cache
+from config import get_config
+from dispatcher import make_dispatcher, make_mailer
+from notifications import make_slack_digest
+from tasks import register_tasks, start_metrics_server
+
+_config_class = get_config()
+config = {
+    key: getattr(_config_class, key) for key in dir(_config_class) if key.isupper()
+}
+
+celery = Celery("app", broker=config.get("CELERY_BROKER_URL"))
+celery.conf.update(
+    broker_url=config.get("CELERY_BROKER_URL"),
+    result_backend=config.get("CELERY_RESULT_BACKEND"),
+    task_always_eager=config.get("CELERY_TASK_ALWAYS_EAGER", False),
+)
+
+# Archival runs invalidate the dashboard pages (shared when the cache is Redis)
+bug_list_cache = make_bug_list_cache(config)
+
+notification_dispatcher = make_dispatcher(config)
+tasks_registry = register_tasks(
+    celery,
+    slack=make_slack_digest(config, notification_dispatcher),
+    dispatcher=notification_dispatcher,
+    mailer=make_mailer(config),
+    on_archived=lambda: bug_list_cache.invalidate(),
+    slack_max_retries=config.get("SLACK_TASK_MAX_RETRIES", 5),
+)
+send_bug_report_email = tasks_registry["send_email"]
+send_slack_notification = tasks_registry["send_slack"]
+send_bug_report_email_batch = tasks_registry["send_email_batch"]
+send_slack_notification_batch = tasks_registry["send_slack_batch"]
+relay_outbox = tasks_registry["relay_outbox"]
+archive_bugs = tasks_registry["archive_bugs"]
+
+# Notifications are published from the outbox by beat, not by requests
+celery.conf.beat_schedule = {
+    "relay-notification-outbox": {
+        "task": relay_outbox.name,
+        "schedule": config.get("OUTBOX_RELAY_INTERVAL", 2),
+        "kwargs": {
+            "batch_size": config.get("OUTBOX_BATCH_SIZE", 200),
+            "lease": config.get("OUTBOX_CLAIM_LEASE", 60),
+            "max_bugs_per_task": config.get("OUTBOX_MAX_BUGS_PER_TASK", 500),
+            "retention": config.get("OUTBOX_RETENTION", 3600),
+            "max_attempts": config.get("OUTBOX_MAX_ATTEMPTS", 10),
+        },
+    },
+    "archive-old-bugs": {
+        "task": archive_bugs.name,
+        "schedule": config.get("ARCHIVE_INTERVAL", 3600),
+        "kwargs": {
+            "older_than_days": config.get("ARCHIVE_AFTER_DAYS", 90),
+            "statuses": config.get("ARCHIVE_STATUSES", ["Resolved", "Closed"]),
+            "batch_size": config.get("ARCHIVE_BATCH_SIZE", 500),
+            "max_duty_cycle": config.get("ARCHIVE_MAX_DUTY_CYCLE", 0.2),
+            "max_seconds": config.get("ARCHIVE_MAX_SECONDS", 300),
+        },
+    },
+}
+
+
+@worker_init.connect(weak=False)
+def serve_worker_metrics(**kwargs):
+    # In the main worker process (beat has no task metrics to serve)
+    port = config.get("CELERY_METRICS_PORT")
+    if port:
+        start_metrics_server(port)
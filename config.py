@@ -19,6 +19,144 @@ class Config:
     CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", REDIS_URL)
     CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", REDIS_URL)
 
+    # Port on which Celery workers serve their metrics (0 = off); see
+    # tasks.start_metrics_server for PROMETHEUS_MULTIPROC_DIR
+    CELERY_METRICS_PORT = int(os.environ.get("CELERY_METRICS_PORT", 9808))
+
+    # Schema migrations (migrations.py). The web app checks the schema
+    # version once, on its first request; behind, it migrates when
+    # DB_AUTO_MIGRATE is on and refuses to serve otherwise (run
+    # scripts/migrate.py as a deploy step instead).
+    DB_AUTO_MIGRATE = os.environ.get("DB_AUTO_MIGRATE", "true").lower() == "true"
+
+    # Time budget shared by all DB calls (including retries) of one request
+    DB_REQUEST_BUDGET = float(os.environ.get("DB_REQUEST_BUDGET", 5))
+
+    # Dashboard pagination
+    BUGS_PER_PAGE = int(os.environ.get("BUGS_PER_PAGE", 20))
+    BUGS_MAX_PER_PAGE = int(os.environ.get("BUGS_MAX_PER_PAGE", 100))
+
+    # Full-text search (/search, /api/search). Results are ranked pages;
+    # SEARCH_MAX_RESULTS caps how deep a client can page.
+    SEARCH_PER_PAGE = int(os.environ.get("SEARCH_PER_PAGE", 20))
+    SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", 1000))
+
+    # Dashboard bug-list cache: "memory" (per process), "redis" (shared via
+    # REDIS_URL) or "none". The TTL bounds how stale a page can be on nodes
+    # that did not see the write (memory backend) or if Redis is unreachable.
+    BUG_LIST_CACHE_BACKEND = os.environ.get("BUG_LIST_CACHE_BACKEND", "memory")
+    BUG_LIST_CACHE_TTL = float(os.environ.get("BUG_LIST_CACHE_TTL", 5))
+    BUG_LIST_CACHE_SIZE = int(os.environ.get("BUG_LIST_CACHE_SIZE", 1024))
+
+    # HTTP caching: the dashboard answers If-None-Match/If-Modified-Since
+    # with 304 while the bug-list cache version is unchanged, and responses
+    # of at least HTTP_COMPRESS_MIN_SIZE bytes are brotli/gzip-encoded.
+    HTTP_CONDITIONAL_GET = (
+        os.environ.get("HTTP_CONDITIONAL_GET", "true").lower() == "true"
+    )
+    HTTP_COMPRESS = os.environ.get("HTTP_COMPRESS", "true").lower() == "true"
+    HTTP_COMPRESS_MIN_SIZE = int(os.environ.get("HTTP_COMPRESS_MIN_SIZE", 1024))
+    HTTP_GZIP_LEVEL = int(os.environ.get("HTTP_GZIP_LEVEL", 6))
+    HTTP_BROTLI_QUALITY = int(os.environ.get("HTTP_BROTLI_QUALITY", 5))
+
+    # Identity cache for Flask-Login's user_loader. With
+    # USER_IDENTITY_IN_SESSION the verified (id, username) also rides in the
+    # signed session cookie and is trusted for USER_SESSION_IDENTITY_TTL
+    # seconds, so steady-state requests need no lookup at all.
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 1024))
+    USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 60))
+    USER_IDENTITY_IN_SESSION = (
+        os.environ.get("USER_IDENTITY_IN_SESSION", "false").lower() == "true"
+    )
+    USER_SESSION_IDENTITY_TTL = float(os.environ.get("USER_SESSION_IDENTITY_TTL", 300))
+
+    # Bulk ingestion API (POST /api/bugs/bulk)
+    BULK_MAX_BUGS = int(os.environ.get("BULK_MAX_BUGS", 10000))
+    BULK_INSERT_CHUNK_SIZE = int(os.environ.get("BULK_INSERT_CHUNK_SIZE", 500))
+
+    # Notification outbox relay (Celery beat task relay_outbox). Rows are
+    # claimed under a lease so several relays can run; published rows are
+    # purged after OUTBOX_RETENTION seconds. A row whose publish failed
+    # OUTBOX_MAX_ATTEMPTS times is parked as dead and kept (0: retry forever).
+    OUTBOX_RELAY_INTERVAL = float(os.environ.get("OUTBOX_RELAY_INTERVAL", 2))
+    OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 200))
+    OUTBOX_CLAIM_LEASE = float(os.environ.get("OUTBOX_CLAIM_LEASE", 60))
+    OUTBOX_MAX_BUGS_PER_TASK = int(os.environ.get("OUTBOX_MAX_BUGS_PER_TASK", 500))
+    OUTBOX_RETENTION = float(os.environ.get("OUTBOX_RETENTION", 3600))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 10))
+
+    # Archival (Celery beat task archive_bugs, or scripts/archive_bugs.py):
+    # bugs in ARCHIVE_STATUSES created more than ARCHIVE_AFTER_DAYS ago move
+    # to bugs_archive, ARCHIVE_BATCH_SIZE per transaction. The mover sleeps
+    # so it holds the writer at most ARCHIVE_MAX_DUTY_CYCLE of the time, and
+    # one run stops after ARCHIVE_MAX_SECONDS.
+    ARCHIVE_INTERVAL = float(os.environ.get("ARCHIVE_INTERVAL", 3600))
+    ARCHIVE_AFTER_DAYS = float(os.environ.get("ARCHIVE_AFTER_DAYS", 90))
+    ARCHIVE_STATUSES = os.environ.get("ARCHIVE_STATUSES", "Resolved,Closed").split(",")
+    ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 500))
+    ARCHIVE_MAX_DUTY_CYCLE = float(os.environ.get("ARCHIVE_MAX_DUTY_CYCLE", 0.2))
+    ARCHIVE_MAX_SECONDS = float(os.environ.get("ARCHIVE_MAX_SECONDS", 300))
+
+    # Password checks on /login (passwords.py) run in PASSWORD_WORKERS
+    # processes (0: in the request thread). At most PASSWORD_MAX_PENDING may
+    # be queued or running per app process; further logins get a 503 with
+    # Retry-After, as do checks not done within PASSWORD_TIMEOUT seconds.
+    # Hashes made with other parameters than PASSWORD_HASH_METHOD (Werkzeug
+    # syntax, e.g. "scrypt" or "pbkdf2:sha256:600000") are upgraded on login.
+    PASSWORD_WORKERS = int(os.environ.get("PASSWORD_WORKERS", os.cpu_count() or 1))
+    PASSWORD_MAX_PENDING = int(os.environ.get("PASSWORD_MAX_PENDING", 64))
+    PASSWORD_TIMEOUT = float(os.environ.get("PASSWORD_TIMEOUT", 10))
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+
+    # Request profiling (profiling.py): a sampling profiler records the
+    # stacks of PROFILER_SAMPLE_RATE of requests (0 = off) every
+    # PROFILER_INTERVAL seconds, plus any request sent with an X-Profile
+    # header by one of PROFILER_ADMINS. Results are per process, under
+    # /admin/profile.
+    PROFILER_SAMPLE_RATE = float(os.environ.get("PROFILER_SAMPLE_RATE", 0))
+    PROFILER_INTERVAL = float(os.environ.get("PROFILER_INTERVAL", 0.005))
+    PROFILER_ADMINS = os.environ.get("PROFILER_ADMINS", "admin").split(",")
+
+    # Slack delivery. Requests share a keep-alive session per worker process
+    # and honour Retry-After on HTTP 429. A message Slack did not accept
+    # after SLACK_MAX_ATTEMPTS fails its task, which Celery retries with
+    # backoff up to SLACK_TASK_MAX_RETRIES times (at-least-once until then).
+    # With SLACK_DIGEST_WINDOW > 0 the bugs a worker receives are sent as
+    # one digest per window (or as soon as SLACK_DIGEST_MAX_BUGS are
+    # buffered) instead of one message per task. Buffered bugs are lost if
+    # the worker is killed before the window ends or the digest fails: digest
+    # mode trades the outbox's at-least-once guarantee for fewer messages, so
+    # Slack delivery becomes at-most-once.
+    SLACK_WEBHOOK_URL = os.environ.get(
+        "SLACK_WEBHOOK_URL", "https://api.slack.com/messaging/send"
+    )
+    SLACK_TIMEOUT = float(os.environ.get("SLACK_TIMEOUT", 2))
+    SLACK_MAX_ATTEMPTS = int(os.environ.get("SLACK_MAX_ATTEMPTS", 5))
+    SLACK_POOL_SIZE = int(os.environ.get("SLACK_POOL_SIZE", 4))
+    SLACK_MAX_RETRY_AFTER = float(os.environ.get("SLACK_MAX_RETRY_AFTER", 30))
+    SLACK_TASK_MAX_RETRIES = int(os.environ.get("SLACK_TASK_MAX_RETRIES", 5))
+    SLACK_DIGEST_WINDOW = float(os.environ.get("SLACK_DIGEST_WINDOW", 0))
+    SLACK_DIGEST_MAX_BUGS = int(os.environ.get("SLACK_DIGEST_MAX_BUGS", 500))
+    SLACK_DIGEST_MAX_LINES = int(os.environ.get("SLACK_DIGEST_MAX_LINES", 50))
+
+    # Async delivery. With NOTIFY_ASYNC the email tasks send one report per
+    # bug and Slack posts its webhook on a per-worker event loop, at most
+    # NOTIFY_MAX_IN_FLIGHT at once and NOTIFY_PER_DESTINATION per server
+    # (SMTP sessions and HTTP connections are kept alive per server).
+    # NOTIFY_TIMEOUT bounds each send attempt, not Retry-After back-off.
+    # Without SMTP_HOST sending email is simulated.
+    NOTIFY_ASYNC = os.environ.get("NOTIFY_ASYNC", "false").lower() == "true"
+    NOTIFY_MAX_IN_FLIGHT = int(os.environ.get("NOTIFY_MAX_IN_FLIGHT", 200))
+    NOTIFY_PER_DESTINATION = int(os.environ.get("NOTIFY_PER_DESTINATION", 50))
+    NOTIFY_TIMEOUT = float(os.environ.get("NOTIFY_TIMEOUT", 10))
+    SMTP_HOST = os.environ.get("SMTP_HOST")
+    SMTP_PORT = int(os.environ.get("SMTP_PORT", 25))
+    SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "false").lower() == "true"
+    SMTP_USERNAME = os.environ.get("SMTP_USERNAME")
+    SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD")
+    NOTIFY_EMAIL_FROM = os.environ.get("NOTIFY_EMAIL_FROM", "bugkiller@localhost")
+    NOTIFY_EMAIL_TO = os.environ.get("NOTIFY_EMAIL_TO", "qa@localhost")
+
 
 class TestingConfig(Config):
     """Configuration for testing environment."""
@@ -27,3 +165,10 @@ class TestingConfig(Config):
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_BROKER_URL = "memory://"
     CELERY_RESULT_BACKEND = "cache+memory://"
+
+
+def get_config():
+    """The configuration class for this process (TESTING=True: TestingConfig)."""
+    if os.environ.get("TESTING") == "True":
+        return TestingConfig
+    return Config
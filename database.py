@@ -1,8 +1,89 @@
+import functools
+import itertools
+import logging
 import os
 import time
 import sqlite3
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 import pymysql
-from werkzeug.security import generate_password_hash
+from pymysql.constants import SERVER_STATUS
+
+from db_metrics import (
+    ADHOC,
+    DB_FAILURES,
+    pool_observers,
+    statement_timer,
+)
+from db_pool import ConnectionPool
+from group_commit import GroupCommitWriter
+import migrations
+from statements import Statement, compile_statements
+from resilience import (
+    CircuitBreaker,
+    DeadlineExceeded,
+    Deadline,
+    RetryPolicy,
+    current_deadline,
+    error_class,
+    is_connectivity_error,
+    is_retryable,
+)
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+DB_RETRIES = Counter(
+    "db_retries_total", "Database operations retried, by error class", ["error"]
+)
+DB_RETRY_WAIT_SECONDS = Counter(
+    "db_retry_wait_seconds_total", "Time spent sleeping between database retries"
+)
+DB_CIRCUIT_STATE = Gauge(
+    "db_circuit_state", "Database circuit breaker state (0=closed, 1=half-open, 2=open)"
+)
+DB_CIRCUIT_REJECTIONS = Counter(
+    "db_circuit_rejections_total", "Database calls failed fast by the open circuit"
+)
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class Transaction:
+    """Statements executed on one connection and committed together."""
+
+    def __init__(self, db, conn):
+        self.db = db
+        self.conn = conn
+
+    def execute(self, query, params=()):
+        return self.db._execute(self.conn, query, params)
+
+    def executemany(self, query, rows):
+        return self.db._executemany(self.conn, query, rows)
+
+    def fetchall(self, query, params=()):
+        return self.db._execute(self.conn, query, params, fetch=True)
+
+    def fetch_one(self, query, params=()):
+        rows = self.fetchall(query, params)
+        return rows[0] if rows else None
+
+
+class PartialInsertError(Exception):
+    """
+    A chunked insert failed part-way; ``ids`` holds the rows already
+    committed (a prefix of the input) and ``cause`` the error.
+    """
+
+    def __init__(self, ids, cause):
+        super().__init__(f"Insert failed after {len(ids)} rows: {cause}")
+        self.ids = ids
+        self.cause = cause
+
+
+def _env_flag(name, default="false"):
+    return os.environ.get(name, default).lower() in ("1", "true", "yes")
 
 
 class DatabaseManager:
@@ -15,80 +96,610 @@ class DatabaseManager:
         self.db_name = os.environ.get("DB_NAME", "bugkiller")
 
         base_dir = os.path.dirname(os.path.abspath(__file__))
-        self.sqlite_path = os.path.join(base_dir, "db", "bugkiller.db")
+        self.sqlite_path = os.environ.get(
+            "DB_SQLITE_PATH", os.path.join(base_dir, "db", "bugkiller.db")
+        )
+
+        # Connection pool settings (shared by the sqlite and mysql backends)
+        self.pool_min_size = int(os.environ.get("DB_POOL_MIN_SIZE", 1))
+        self.pool_max_size = int(os.environ.get("DB_POOL_MAX_SIZE", 10))
+        self.pool_max_lifetime = float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800))
+        self.pool_timeout = float(os.environ.get("DB_POOL_TIMEOUT", 5))
+        self.pool_pre_ping = _env_flag("DB_POOL_PRE_PING", "true")
+        self._pool = None
+        self._write_pool = None
+        self._pool_lock = threading.Lock()
+
+        # SQLite engine mode: "default" (rollback journal, one shared pool) or
+        # "wal" (WAL journal, tuned pragmas, one serialized writer connection
+        # and a pool of read-only connections so reads never wait on writes).
+        self.sqlite_mode = os.environ.get("DB_SQLITE_MODE", "default")
+        self.sqlite_cache_kb = int(os.environ.get("DB_SQLITE_CACHE_KB", 65536))
+        self.sqlite_mmap_bytes = int(
+            os.environ.get("DB_SQLITE_MMAP_BYTES", 256 * 1024 * 1024)
+        )
+        self.sqlite_busy_timeout_ms = int(
+            os.environ.get("DB_SQLITE_BUSY_TIMEOUT_MS", 5000)
+        )
+
+        # Group commit: coalesce concurrent writes into shared transactions
+        self.group_commit = _env_flag("DB_GROUP_COMMIT")
+        self.group_commit_max_batch = int(
+            os.environ.get("DB_GROUP_COMMIT_MAX_BATCH", 64)
+        )
+        self.group_commit_max_delay = (
+            float(os.environ.get("DB_GROUP_COMMIT_MAX_DELAY_MS", 2)) / 1000
+        )
+        self.group_commit_timeout = float(os.environ.get("DB_GROUP_COMMIT_TIMEOUT", 30))
+        self._writer = None
+
+        # Per-statement latency histograms and pool timings (db_metrics.py)
+        self.metrics_enabled = _env_flag("DB_METRICS", "true")
+
+        # Streaming reads (``stream``): rows fetched per round trip, and how
+        # long MySQL waits on a slow consumer before dropping the connection
+        self.stream_batch_size = int(os.environ.get("DB_STREAM_BATCH_SIZE", 1000))
+        self.stream_net_write_timeout = int(
+            os.environ.get("DB_STREAM_NET_WRITE_TIMEOUT", 600)
+        )
+
+        # Failure handling: exponential backoff with jitter inside a time
+        # budget (the enclosing deadline_scope, e.g. one HTTP request, or
+        # DB_OPERATION_BUDGET), and a breaker that fails fast when the
+        # database is known to be down.
+        self.connect_timeout = int(os.environ.get("DB_CONNECT_TIMEOUT", 3))
+        self.operation_budget = float(os.environ.get("DB_OPERATION_BUDGET", 10))
+        self.startup_budget = float(os.environ.get("DB_STARTUP_BUDGET", 60))
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(os.environ.get("DB_RETRY_ATTEMPTS", 4)),
+            base_delay=float(os.environ.get("DB_RETRY_BASE_DELAY", 0.05)),
+            max_delay=float(os.environ.get("DB_RETRY_MAX_DELAY", 2)),
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.environ.get("DB_BREAKER_THRESHOLD", 5)),
+            reset_timeout=float(os.environ.get("DB_BREAKER_RESET_TIMEOUT", 10)),
+            on_change=lambda state: DB_CIRCUIT_STATE.set(_CIRCUIT_STATE_VALUES[state]),
+        )
+
+    @property
+    def wal_mode(self):
+        return self.db_type != "mysql" and self.sqlite_mode == "wal"
+
+    @property
+    def id_column(self):
+        """Auto-increment primary key column definition for this dialect."""
+        if self.db_type == "sqlite":
+            return "id INTEGER PRIMARY KEY AUTOINCREMENT"
+        return "id INT AUTO_INCREMENT PRIMARY KEY"
+
+    def _make_pool(self, name, factory, max_size):
+        on_checkout, on_connect = (
+            pool_observers(name) if self.metrics_enabled else (None, None)
+        )
+        return ConnectionPool(
+            factory,
+            min_size=min(self.pool_min_size, max_size),
+            max_size=max_size,
+            max_lifetime=self.pool_max_lifetime,
+            timeout=self.pool_timeout,
+            ping=self._ping if self.pool_pre_ping else None,
+            reset=self._reset,
+            on_checkout=on_checkout,
+            on_connect=on_connect,
+        )
+
+    @property
+    def pool(self):
+        """Lazily created pool used for reads (and for writes outside WAL mode)."""
+        if self._pool is not None:
+            return self._pool
+        with self._pool_lock:
+            if self._pool is None:
+                factory = self.get_connection
+                if self.wal_mode:
+                    factory = functools.partial(self._connect_sqlite, read_only=True)
+                name = "read" if self.wal_mode else "main"
+                self._pool = self._make_pool(name, factory, self.pool_max_size)
+        return self._pool
+
+    @property
+    def write_pool(self):
+        """
+        Pool that writes check connections out of. In WAL mode this is a
+        single-connection pool, i.e. one serialized writer; otherwise it is
+        the shared ``pool``.
+        """
+        if not self.wal_mode:
+            return self.pool
+        if self._write_pool is not None:
+            return self._write_pool
+        with self._pool_lock:
+            if self._write_pool is None:
+                self._write_pool = self._make_pool("write", self.get_connection, 1)
+        return self._write_pool
+
+    def close(self):
+        """Stop the group-commit writer and close pooled connections."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for pool in (self._write_pool, self._pool):
+            if pool is not None:
+                pool.close()
+
+    def pools(self):
+        """The pools created so far, by metrics name (main, or read/write)."""
+        pools = {}
+        if self._pool is not None:
+            pools["read" if self.wal_mode else "main"] = self._pool
+        if self._write_pool is not None:
+            pools["write"] = self._write_pool
+        return pools
+
+    def pool_stats(self):
+        stats = self.pool.stats()
+        if self.wal_mode:
+            stats["writer"] = self.write_pool.stats()
+        return stats
+
+    def _ping(self, conn):
+        if self.db_type == "mysql":
+            conn.ping(reconnect=False)
+        else:
+            conn.execute("SELECT 1")
+
+    def _reset(self, conn):
+        # Never hand out a connection with an open transaction: on MySQL a
+        # lingering read snapshot would make later SELECTs see stale data.
+        if self.db_type == "mysql":
+            if conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                conn.rollback()
+        elif conn.in_transaction:
+            conn.rollback()
 
     def get_connection(self, connect_to_db=True):
+        # A single attempt: retrying is _with_retries' job, within a budget.
         if self.db_type == "mysql":
-            retries = 15
-            last_error = None
-            while retries > 0:
-                try:
-                    conn = pymysql.connect(
-                        host=self.host,
-                        port=self.port,
-                        user=self.user,
-                        password=self.password,
-                        database=self.db_name if connect_to_db else None,
-                        cursorclass=pymysql.cursors.DictCursor,
-                        connect_timeout=5,
-                    )
-                    return conn
-                except Exception as e:
-                    last_error = e
-                    if "Unknown database" in str(e) and connect_to_db:
-                        return self.get_connection(connect_to_db=False)
-                    retries -= 1
-                    time.sleep(2)
-            raise Exception(f"MySQL connection failed after retries: {last_error}")
+            try:
+                return pymysql.connect(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    database=self.db_name if connect_to_db else None,
+                    cursorclass=pymysql.cursors.DictCursor,
+                    connect_timeout=self.connect_timeout,
+                )
+            except pymysql.err.OperationalError as e:
+                if "Unknown database" in str(e) and connect_to_db:
+                    return self.get_connection(connect_to_db=False)
+                raise
         else:
-            conn = sqlite3.connect(self.sqlite_path)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return self._connect_sqlite()
+
+    def _connect_sqlite(self, read_only=False):
+        # Pooled connections are handed to whichever thread checks them out
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{self.sqlite_path}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if self.sqlite_mode == "wal":
+            if not read_only:
+                conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL is durable against application crashes in WAL mode and
+            # only fsyncs at checkpoints instead of on every commit.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{self.sqlite_cache_kb}")
+            conn.execute(f"PRAGMA mmap_size={self.sqlite_mmap_bytes}")
+            conn.execute(f"PRAGMA busy_timeout={self.sqlite_busy_timeout_ms}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _sql(self, query):
+        """Dialect SQL for a ``Statement`` (precompiled) or a raw ``?`` string."""
+        if isinstance(query, Statement):
+            return query.sql_for(self.db_type)
+        if self.db_type == "mysql":
+            return query.replace("?", "%s")
+        return query
+
+    def _execute(self, conn, query, params=(), fetch=False):
+        """Run one statement on ``conn`` without committing."""
+        is_statement = isinstance(query, Statement)
+        record = query.record if is_statement else None
+        sql = self._sql(query)
+        started = time.perf_counter()
+        if self.db_type == "mysql":
+            cursor_class = pymysql.cursors.Cursor if record else None
+            with conn.cursor(cursor_class) as cursor:
+                cursor.execute(sql, params)
+                executed = time.perf_counter()
+                if fetch:
+                    rows = cursor.fetchall()
+                else:
+                    result = cursor.lastrowid
+        else:
+            cursor = conn.cursor() if record else conn
+            if record:
+                cursor.row_factory = None  # plain tuples for record building
+            cursor = cursor.execute(sql, params)
+            executed = time.perf_counter()
+            if fetch:
+                rows = cursor.fetchall()
+            else:
+                result = cursor.lastrowid
+        if fetch:
+            # Building records is part of the fetch phase
+            result = [record(*row) for row in rows] if record else rows
+        if self.metrics_enabled:
+            name = query.name if is_statement else ADHOC
+            statement_timer(name, "execute").observe(executed - started)
+            if fetch:
+                statement_timer(name, "fetch").observe(time.perf_counter() - executed)
+        return result
+
+    def _deadline(self):
+        return current_deadline() or Deadline(self.operation_budget)
+
+    def _checkout_timeout(self, deadline):
+        return min(self.pool_timeout, deadline.remaining())
+
+    def _with_retries(self, operation, deadline=None):
+        """
+        Call ``operation()``, retrying transient errors with exponential
+        backoff and jitter while the deadline allows. Non-retryable errors
+        (constraint violations, SQL errors, pool exhaustion) are raised at once.
+        """
+        deadline = deadline or self._deadline()
+        attempt = 0
+        while True:
+            attempt += 1
+            if deadline.expired:
+                raise DeadlineExceeded("Database time budget exhausted")
+            try:
+                self.breaker.before_call()
+            except Exception:
+                DB_CIRCUIT_REJECTIONS.inc()
+                raise
+            try:
+                result = operation()
+            except Exception as e:
+                retryable = is_retryable(e)
+                if is_connectivity_error(e):
+                    self.breaker.record_failure()
+                    # Once the breaker trips, further retries are pointless
+                    retryable = retryable and self.breaker.state == "closed"
+                else:
+                    self.breaker.release()
+                if not retryable:
+                    DB_FAILURES.labels(error=error_class(e)).inc()
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                if (
+                    self.retry_policy.max_attempts is not None
+                    and attempt >= self.retry_policy.max_attempts
+                ) or delay >= deadline.remaining():
+                    logger.error(
+                        "Database operation failed after %d attempts: %s", attempt, e
+                    )
+                    DB_FAILURES.labels(error=error_class(e)).inc()
+                    raise
+                DB_RETRIES.labels(error=error_class(e)).inc()
+                DB_RETRY_WAIT_SECONDS.inc(delay)
+                logger.warning(
+                    "Database operation failed (attempt %d), retrying in %.3fs: %s",
+                    attempt,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
 
     def execute_query(self, query, params=(), fetch=False):
         """Execute a query with retry logic for resilience."""
-        retries = 3
-        last_error = None
 
-        while retries > 0:
-            try:
-                conn = self.get_connection()
+        pool = self.pool if fetch else self.write_pool
+        deadline = self._deadline()
+
+        def run():
+            with pool.connection(self._checkout_timeout(deadline)) as conn:
+                result = self._execute(conn, query, params, fetch)
+                if not fetch:
+                    conn.commit()
+                return result
+
+        return self._with_retries(run)
+
+    def bind(self, conn):
+        """Wrap an already checked-out connection in a ``Transaction``."""
+        return Transaction(self, conn)
+
+    @contextmanager
+    def transaction(self, timeout=None):
+        """Yield a ``Transaction`` on a writer connection, committed on success."""
+        with self.write_pool.connection(timeout) as conn:
+            yield Transaction(self, conn)
+            conn.commit()
+
+    @property
+    def writer(self):
+        """Lazily started group-commit writer (see ``group_commit.py``)."""
+        if self._writer is None or not self._writer.alive:
+            with self._pool_lock:
+                if self._writer is None or not self._writer.alive:
+                    self._writer = GroupCommitWriter(
+                        self,
+                        max_batch=self.group_commit_max_batch,
+                        max_delay=self.group_commit_max_delay,
+                    )
+        return self._writer
+
+    def write(self, work):
+        """
+        Run ``work(tx)`` in a write transaction and return its result.
+
+        With group commit enabled the work is queued to the writer thread and
+        shares one transaction (and one commit) with concurrent writes; it
+        runs inside its own savepoint, so a failure only affects its caller.
+        """
+        deadline = self._deadline()
+        if self.group_commit:
+
+            def submit():
+                future = self.writer.submit(work)
                 try:
-                    if self.db_type == "mysql":
-                        query = query.replace("?", "%s")
-                        with conn.cursor() as cursor:
-                            cursor.execute(query, params)
-                            if fetch:
-                                return cursor.fetchall()
-                            conn.commit()
-                            return cursor.lastrowid
-                    else:
-                        cursor = conn.execute(query, params)
-                        if fetch:
-                            return cursor.fetchall()
-                        conn.commit()
-                        return cursor.lastrowid
-                finally:
-                    conn.close()
-                break  # Success, exit retry loop
-            except Exception as e:
-                last_error = e
-                retries -= 1
-                if retries > 0:
-                    print(
-                        f"Database query failed, retrying in 2s... ({retries} retries left). Error: {e}"
+                    return future.result(
+                        min(self.group_commit_timeout, deadline.remaining())
                     )
-                    time.sleep(2)
-                else:
-                    print(f"Database query failed after all retries. Error: {e}")
-                    raise last_error
+                except FutureTimeoutError:
+                    # Give up at once if the work can no longer run; once the
+                    # writer has started it, wait for its outcome only as long
+                    # as the request's budget allows.
+                    if future.cancel():
+                        raise DeadlineExceeded("Timed out waiting for group commit")
+                try:
+                    return future.result(deadline.remaining())
+                except FutureTimeoutError:
+                    raise DeadlineExceeded(
+                        "Group commit still running when the time budget ran"
+                        " out; the write may or may not be committed"
+                    ) from None
+
+            return self._with_retries(submit, deadline)
+
+        def run():
+            with self.transaction(self._checkout_timeout(deadline)) as tx:
+                return work(tx)
+
+        return self._with_retries(run, deadline)
+
+    def execute_write(self, query, params=()):
+        """Execute a single write statement via ``write`` and return lastrowid."""
+        return self.write(lambda tx: tx.execute(query, params))
+
+    def _executemany(self, conn, query, rows):
+        """
+        ``executemany`` an INSERT on ``conn`` without committing; returns the
+        new ids in input order.
+
+        On MySQL pymysql folds the rows into one multi-row INSERT, whose
+        auto-increment ids are consecutive from ``lastrowid``. It silently
+        splits statements longer than its ``max_stmt_length``, after which
+        ``lastrowid`` only covers the last piece, so rows are sent in batches
+        sized to stay under that limit. On SQLite the open transaction holds
+        the write lock, so the ids end at ``last_insert_rowid()``.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        if self.db_type == "mysql":
+            sql = self._sql(query)
+            ids = []
+            with conn.cursor() as cursor:
+                for batch in self._statement_batches(cursor, sql, rows):
+                    cursor.executemany(sql, batch)
+                    if cursor.rowcount != len(batch):
+                        raise pymysql.err.DataError(
+                            f"Expected {len(batch)} inserted rows, "
+                            f"got {cursor.rowcount}"
+                        )
+                    ids.extend(range(cursor.lastrowid, cursor.lastrowid + len(batch)))
+            return ids
+        conn.executemany(self._sql(query), rows)
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    @staticmethod
+    def _statement_batches(cursor, sql, rows):
+        """Split ``rows`` so each multi-row INSERT fits in one statement."""
+        limit = cursor.max_stmt_length
+        encoding = cursor.connection.encoding
+        batch, size = [], 0
+        for row in rows:
+            # The fully rendered single-row statement over-estimates the
+            # bytes this row adds to a multi-row INSERT, so batches stay safe.
+            row_size = len(cursor.mogrify(sql, row).encode(encoding, "replace"))
+            if batch and size + row_size > limit:
+                yield batch
+                batch, size = [], 0
+            batch.append(row)
+            size += row_size
+        if batch:
+            yield batch
+
+    def insert_many(self, query, rows, chunk_size=500, on_chunk=None):
+        """
+        Insert ``rows`` with ``executemany``, committing once per chunk.
+
+        Returns the new ids in input order. ``on_chunk(tx, chunk, ids)`` runs
+        inside each chunk's transaction, before it commits, so follow-up
+        writes commit (or roll back) together with the rows. If a chunk
+        fails, ``PartialInsertError`` carries the ids of the chunks already
+        committed.
+        """
+        rows = iter(rows)
+        ids = []
+        # Chunks are taken lazily, so a generator of rows is never held whole
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            try:
+                with self.transaction() as tx:
+                    chunk_ids = tx.executemany(query, chunk)
+                    if on_chunk is not None:
+                        on_chunk(tx, chunk, chunk_ids)
+            except Exception as e:
+                raise PartialInsertError(ids, e) from e
+            ids.extend(chunk_ids)
+        return ids
+
+    def _connect_streaming(self):
+        # A dedicated connection: a long export must not pin a pooled one
+        if self.db_type == "mysql":
+            conn = self.get_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SET SESSION net_write_timeout = %s",
+                    (self.stream_net_write_timeout,),
+                )
+            return conn
+        return self._connect_sqlite(read_only=self.wal_mode)
+
+    def stream(self, query, params=(), batch_size=None):
+        """
+        Iterate over the rows of a read query without materialising them.
+
+        MySQL uses an unbuffered server-side cursor (``SSCursor``), SQLite
+        steps its cursor with ``fetchmany``; either way at most
+        ``batch_size`` rows are held at once. Runs on its own connection,
+        closed when the iterator is exhausted or closed. Only connecting is
+        retried: once rows were yielded the query cannot be replayed.
+        """
+        record = query.record if isinstance(query, Statement) else None
+        sql = self._sql(query)
+        batch_size = batch_size or self.stream_batch_size
+        conn = self._with_retries(self._connect_streaming)
+        try:
+            if self.db_type == "mysql":
+                cursor_class = (
+                    pymysql.cursors.SSCursor if record else pymysql.cursors.SSDictCursor
+                )
+                cursor = conn.cursor(cursor_class)
+            else:
+                cursor = conn.cursor()
+                if record:
+                    cursor.row_factory = None
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield record(*row) if record else row
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
 
     def fetch_one(self, query, params=()):
         results = self.execute_query(query, params, fetch=True)
         return results[0] if results else None
 
+    def query(self, stmt, params=()):
+        """Run a read ``Statement`` and return its records."""
+        return self.execute_query(stmt, params, fetch=True)
+
+    def query_one(self, stmt, params=()):
+        return self.fetch_one(stmt, params)
+
+    def table_exists(self, name):
+        if self.db_type == "mysql":
+            query = (
+                "SELECT 1 FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = ?"
+            )
+        else:
+            query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+        return self.fetch_one(query, (name,)) is not None
+
+    def column_exists(self, table, column):
+        if self.db_type == "mysql":
+            query = (
+                "SELECT 1 FROM information_schema.columns WHERE table_schema ="
+                " DATABASE() AND table_name = ? AND column_name = ?"
+            )
+        else:
+            query = "SELECT 1 FROM pragma_table_info(?) WHERE name = ?"
+        return self.fetch_one(query, (table, column)) is not None
+
+    def create_index(self, name, table, columns, fulltext=False):
+        """
+        Create an index if it does not exist yet (MySQL lacks IF NOT EXISTS).
+        ``fulltext`` creates a MySQL FULLTEXT index.
+        """
+        column_list = ", ".join(columns)
+        kind = "FULLTEXT INDEX" if fulltext else "INDEX"
+        if self.db_type == "mysql":
+            exists = self.fetch_one(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = ? AND index_name = ?",
+                (table, name),
+            )
+            if not exists:
+                self.execute_query(f"CREATE {kind} {name} ON {table} ({column_list})")
+        else:
+            self.execute_query(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column_list})"
+            )
+
+    def drop_index(self, name, table):
+        """Drop an index if it exists (e.g. to bulk load without it)."""
+        if self.db_type == "mysql":
+            exists = self.fetch_one(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = ? AND index_name = ?",
+                (table, name),
+            )
+            if exists:
+                self.execute_query(f"DROP INDEX {name} ON {table}")
+        else:
+            self.execute_query(f"DROP INDEX IF EXISTS {name}")
+
+    def wait_until_available(self, budget=None):
+        """
+        Block until the MySQL server accepts connections or ``budget`` seconds
+        (DB_STARTUP_BUDGET) pass, e.g. while docker-compose starts MySQL.
+        Bypasses the circuit breaker, which is meant for steady-state traffic.
+        """
+        if self.db_type != "mysql":
+            return
+        deadline = Deadline(self.startup_budget if budget is None else budget)
+        policy = RetryPolicy(max_attempts=None, base_delay=0.5, max_delay=5)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.get_connection(connect_to_db=False).close()
+                return
+            except Exception as e:
+                delay = policy.backoff(attempt)
+                if not is_retryable(e) or delay >= deadline.remaining():
+                    raise
+                logger.warning("Waiting for MySQL (attempt %d): %s", attempt, e)
+                time.sleep(delay)
+
     def init_db(self):
-        """Standardized DB Initialization."""
+        """
+        Create the database if needed and apply pending schema migrations
+        (see migrations.py), then open the pool's minimum of connections.
+        """
+        compile_statements(self.db_type)
+        self.wait_until_available()
+
         if self.db_type == "mysql":
             conn = self.get_connection(connect_to_db=False)
             with conn.cursor() as cursor:
@@ -96,49 +707,11 @@ class DatabaseManager:
             conn.commit()
             conn.close()
 
-        # Create Tables
-        self.execute_query(
-            """
-            CREATE TABLE IF NOT EXISTS bugs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT if sqlite else id INT AUTO_INCREMENT PRIMARY KEY,
-                title VARCHAR(255) NOT NULL,
-                status VARCHAR(50) DEFAULT 'New',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """.replace(
-                "INTEGER PRIMARY KEY AUTOINCREMENT if sqlite else id INT AUTO_INCREMENT PRIMARY KEY",
-                "INTEGER PRIMARY KEY AUTOINCREMENT"
-                if self.db_type == "sqlite"
-                else "INT AUTO_INCREMENT PRIMARY KEY",
-            )
-        )
-
-        self.execute_query(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT if sqlite else id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(100) UNIQUE NOT NULL,
-                password VARCHAR(255) NOT NULL
-            )
-        """.replace(
-                "INTEGER PRIMARY KEY AUTOINCREMENT if sqlite else id INT AUTO_INCREMENT PRIMARY KEY",
-                "INTEGER PRIMARY KEY AUTOINCREMENT"
-                if self.db_type == "sqlite"
-                else "INT AUTO_INCREMENT PRIMARY KEY",
-            )
-        )
-
-        # Seeding
-        user_count = self.fetch_one("SELECT COUNT(*) as count FROM users")
-        # Handle SQLite count result which might be tuple
-        count = user_count["count"] if isinstance(user_count, dict) else user_count[0]
+        migrations.migrate(self)
 
-        if count == 0:
-            hashed_pw = generate_password_hash("admin123")
-            self.execute_query(
-                "INSERT INTO users (username, password) VALUES (?, ?)",
-                ("admin", hashed_pw),
-            )
+        # Open the configured minimum of pooled connections up front (after the
+        # schema exists: WAL-mode readers open the file read-only)
+        self.pool.warm()
 
 
 db_manager = DatabaseManager()
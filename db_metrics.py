@@ -0,0 +1,120 @@
+"""
+Prometheus instrumentation of the database layer.
+
+``db_statement_seconds{statement, phase}`` splits every statement into its
+``execute`` and ``fetch`` phases, labelled by ``Statement.name`` (ad-hoc SQL
+strings share the ``adhoc`` label, keeping cardinality bounded).
+``db_pool_checkout_seconds`` and ``db_connect_seconds`` time waiting for a
+pooled connection and opening a new one; retries, retry sleeps and final
+failures are counted by error class in database.py. ``PoolCollector``
+reports the pools' ``stats()`` (as in ``pool_stats()``) at scrape time.
+
+Labelled children are resolved once and kept in a dict, so the per-call cost
+is a dict lookup and a histogram ``observe`` (see
+``performance/bench_db_metrics.py``).
+"""
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# From 100µs (a cached SQLite read) up to the 5s request budget
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_seconds",
+    "Time per statement phase (execute, fetch) by statement name",
+    ["statement", "phase"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time waiting to check a connection out of a pool",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_CONNECT_SECONDS = Histogram(
+    "db_connect_seconds",
+    "Time opening a new database connection",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_FAILURES = Counter(
+    "db_failures_total",
+    "Database operations that failed for good, by error class",
+    ["error"],
+)
+
+ADHOC = "adhoc"
+_statement_children = {}
+_pool_children = {}
+
+
+def statement_timer(name, phase):
+    """The ``db_statement_seconds`` child for ``name`` and ``phase``."""
+    child = _statement_children.get((name, phase))
+    if child is None:
+        child = _statement_children[(name, phase)] = DB_STATEMENT_SECONDS.labels(
+            statement=name, phase=phase
+        )
+    return child
+
+
+def pool_observers(pool_name):
+    """``(on_checkout, on_connect)`` callbacks for a ``ConnectionPool``."""
+    children = _pool_children.get(pool_name)
+    if children is None:
+        children = _pool_children[pool_name] = (
+            DB_POOL_CHECKOUT_SECONDS.labels(pool=pool_name).observe,
+            DB_CONNECT_SECONDS.labels(pool=pool_name).observe,
+        )
+    return children
+
+
+class PoolCollector:
+    """
+    Custom collector exporting ``DatabaseManager.pool_stats()``: gauges for
+    connections by state and counters for pool events. Pools that were never
+    used are not created just to be scraped.
+    """
+
+    GAUGES = ("in_use", "idle", "size", "max_size")
+    COUNTERS = ("created", "closed", "checkouts", "waits", "timeouts", "expired")
+
+    def __init__(self, db):
+        self.db = db
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "db_pool_connections",
+            "Pooled connections by state",
+            labels=["pool", "state"],
+        )
+        events = CounterMetricFamily(
+            "db_pool_events",
+            "Pool lifecycle events",
+            labels=["pool", "event"],
+        )
+        for pool_name, pool in self.db.pools().items():
+            stats = pool.stats()
+            for state in self.GAUGES:
+                connections.add_metric([pool_name, state], stats[state])
+            for event in self.COUNTERS:
+                events.add_metric([pool_name, event], stats[event])
+        yield connections
+        yield events
@@ -0,0 +1,265 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    Connections are created lazily up to ``max_size``. ``min_size`` connections
+    are opened by ``warm()`` and are never reaped for idleness. On checkout a
+    reused connection is health-checked with ``ping`` (if given) and replaced
+    when it fails or is older than ``max_lifetime`` seconds. ``on_checkout``
+    and ``on_connect`` receive the seconds each checkout and each new
+    connection took (e.g. a histogram's ``observe``).
+    """
+
+    def __init__(
+        self,
+        factory,
+        min_size=1,
+        max_size=10,
+        max_lifetime=1800,
+        timeout=5.0,
+        ping=None,
+        reset=None,
+        on_checkout=None,
+        on_connect=None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping = ping
+        self.reset = reset
+        self.on_checkout = on_checkout
+        self.on_connect = on_connect
+
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "ping_failures": 0,
+            "expired": 0,
+        }
+
+    # -- checkout / checkin -------------------------------------------------
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to ``timeout`` seconds."""
+        self._check_fork()
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            with self._cond:
+                entry = None
+                while entry is None:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Timed out after {timeout}s waiting for a connection "
+                            f"(pool size {self.max_size})"
+                        )
+                    self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                # A slot was reserved above; open the connection outside the lock.
+                entry = self._open()
+            elif not self._is_usable(entry):
+                self._discard(entry)
+                continue
+
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+                self._stats["checkouts"] += 1
+            if self.on_checkout is not None:
+                self.on_checkout(time.monotonic() - started)
+            return entry.conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if ``discard``."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            # Not ours (e.g. checked out before a fork); just close it.
+            _close_quietly(conn)
+            return
+
+        if not discard and self.reset is not None:
+            try:
+                self.reset(conn)
+            except Exception:
+                discard = True
+        if not discard and self._expired(entry):
+            self._count("expired")
+            discard = True
+
+        if discard:
+            self._discard(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that checks a connection out and back in."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, discard=not self._rollback(conn))
+            raise
+        else:
+            self.release(conn)
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def warm(self):
+        """Open connections until ``min_size`` are available."""
+        self._check_fork()
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            entry = self._open()
+            with self._cond:
+                self._idle.appendleft(entry)
+                self._cond.notify()
+
+    def close(self):
+        """Close all idle connections; in-use ones are closed on release."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._stats["closed"] += len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            _close_quietly(entry.conn)
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data.update(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=len(self._in_use),
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+        return data
+
+    # -- internals ----------------------------------------------------------
+
+    def _open(self):
+        started = time.monotonic()
+        try:
+            conn = self.factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._count("created")
+        if self.on_connect is not None:
+            self.on_connect(time.monotonic() - started)
+        return _PooledConnection(conn)
+
+    def _discard(self, entry):
+        _close_quietly(entry.conn)
+        with self._cond:
+            self._size -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def _expired(self, entry):
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - entry.created_at > self.max_lifetime
+        )
+
+    def _is_usable(self, entry):
+        if self._expired(entry):
+            self._count("expired")
+            return False
+        if self.ping is None:
+            return True
+        try:
+            self.ping(entry.conn)
+            return True
+        except Exception:
+            self._count("ping_failures")
+            return False
+
+    def _count(self, stat):
+        with self._cond:
+            self._stats[stat] += 1
+
+    @staticmethod
+    def _rollback(conn):
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _check_fork(self):
+        # Sockets and sqlite handles must not be shared across processes
+        # (e.g. gunicorn/celery prefork workers); start over in the child.
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        with self._cond:
+            if pid == self._pid:
+                return
+            self._idle.clear()
+            self._in_use.clear()
+            self._size = 0
+            self._pid = pid
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
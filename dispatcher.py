@@ -0,0 +1,572 @@
+"""
+Concurrent notification delivery on an asyncio event loop.
+
+``NotificationDispatcher`` runs one event loop per process in a background
+thread, so blocking Celery tasks can hand it hundreds of deliveries at once.
+In-flight deliveries are bounded overall and per destination (SMTP server or
+webhook host), and each attempt has a timeout. SMTP sessions and HTTP/1.1
+keep-alive connections are pooled per destination on the loop, so a burst
+pays one handshake per concurrent connection, not one per notification.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import ssl
+import threading
+from email.message import EmailMessage
+from urllib.parse import urlsplit
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_DELIVERIES = Counter(
+    "notification_deliveries_total",
+    "Async notification deliveries by kind and outcome",
+    ["kind", "outcome"],
+)
+NOTIFY_IN_FLIGHT = Gauge(
+    "notification_deliveries_in_flight", "Async notification deliveries in flight"
+)
+
+
+class DeliveryError(Exception):
+    """Raised when a server rejects a notification or answers garbage."""
+
+
+async def _close_writer(writer):
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (ConnectionError, ssl.SSLError):
+        pass
+
+
+# -- SMTP -------------------------------------------------------------------
+
+
+class SMTPConnection:
+    """One SMTP session; several messages can be sent over it in turn."""
+
+    def __init__(self, host, port, starttls=False, username=None, password=None):
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+        self.reader = self.writer = None
+
+    async def open(self, local_hostname="bugkiller"):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        await self._command(None, (220,))
+        ehlo = b"EHLO " + local_hostname.encode()
+        await self._command(ehlo, (250,))
+        if self.starttls:
+            await self._command(b"STARTTLS", (220,))
+            await self.writer.start_tls(
+                ssl.create_default_context(), server_hostname=self.host
+            )
+            await self._command(ehlo, (250,))
+        if self.username:
+            token = f"\0{self.username}\0{self.password or ''}".encode()
+            await self._command(
+                b"AUTH PLAIN " + base64.b64encode(token), (235,), secret=True
+            )
+
+    async def _reply(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("SMTP server closed the connection")
+            if len(line) < 4 or not line[:3].isdigit():
+                raise DeliveryError(f"Malformed SMTP reply: {line[:80]!r}")
+            if line[3:4] != b"-":  # last line of a (multi-line) reply
+                return int(line[:3]), line
+
+    async def _command(self, command, expected, secret=False):
+        if command is not None:
+            self.writer.write(command + b"\r\n")
+            await self.writer.drain()
+        code, line = await self._reply()
+        if code not in expected:
+            verb = command.split()[0].decode() if command else "greeting"
+            detail = "" if secret else f": {line.decode(errors='replace').strip()}"
+            raise DeliveryError(f"SMTP {verb} failed ({code}){detail}")
+
+    async def send(self, message):
+        try:
+            await self._command(f"MAIL FROM:<{message['From']}>".encode(), (250,))
+            for recipient in message["To"].split(","):
+                await self._command(
+                    f"RCPT TO:<{recipient.strip()}>".encode(), (250, 251)
+                )
+            await self._command(b"DATA", (354,))
+        except DeliveryError:
+            # Leave the session clean for the next message
+            await self._command(b"RSET", (250,))
+            raise
+        lines = message.as_bytes().replace(b"\r\n", b"\n").split(b"\n")
+        # Dot-stuffing (RFC 5321 4.5.2)
+        data = b"\r\n".join(b"." + line if line[:1] == b"." else line for line in lines)
+        await self._command(data + b"\r\n.", (250,))
+
+    async def close(self):
+        if self.writer is None:
+            return
+        try:
+            self.writer.write(b"QUIT\r\n")
+            await self.writer.drain()
+        except (ConnectionError, ssl.SSLError):
+            pass
+        await _close_writer(self.writer)
+
+
+# -- HTTP -------------------------------------------------------------------
+
+
+class HTTPConnection:
+    """An HTTP/1.1 keep-alive connection to one scheme://host:port."""
+
+    def __init__(self, scheme, host, port):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+        self.reusable = True
+
+    async def open(self):
+        context = ssl.create_default_context() if self.scheme == "https" else None
+        self.reader, self.writer = await asyncio.open_connection(
+            self.host, self.port, ssl=context
+        )
+
+    async def post(self, path, netloc, payload):
+        """POST JSON; returns ``(status, headers, body)``."""
+        body = json.dumps(payload).encode()
+        head = (
+            f"POST {path} HTTP/1.1\r\n"
+            f"Host: {netloc}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(head.encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("HTTP server closed the connection")
+        parts = status_line.split(None, 2)
+        if (
+            len(parts) < 2
+            or not parts[0].startswith(b"HTTP/")
+            or not parts[1].isdigit()
+        ):
+            self.reusable = False
+            raise DeliveryError(f"Malformed HTTP status line: {status_line[:80]!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n"):
+                break
+            if not line or b":" not in line:
+                self.reusable = False
+                raise DeliveryError(f"Malformed HTTP header: {line[:80]!r}")
+            name, value = line.split(b":", 1)
+            headers[name.strip().lower().decode()] = value.strip().decode()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked()
+        elif "content-length" in headers:
+            try:
+                data = await self.reader.readexactly(int(headers["content-length"]))
+            except ValueError:
+                self.reusable = False
+                raise DeliveryError("Malformed HTTP Content-Length")
+        else:
+            data = await self.reader.read()  # body ends when the server closes
+            self.reusable = False
+        if headers.get("connection", "").lower() == "close":
+            self.reusable = False
+        return status, headers, data
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size_line = await self.reader.readline()
+            try:
+                size = int(size_line.split(b";")[0].strip(), 16)
+            except ValueError:
+                self.reusable = False
+                raise DeliveryError(f"Malformed chunk size: {size_line[:80]!r}")
+            if size == 0:
+                # Skip trailers up to the blank line
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    async def close(self):
+        if self.writer is not None:
+            await _close_writer(self.writer)
+
+
+class ConnectionPool:
+    """Idle connections for one destination; used on the loop thread only."""
+
+    def __init__(self, factory, max_idle=10):
+        self.factory = factory
+        self.max_idle = max_idle
+        self._idle = []
+
+    async def acquire(self):
+        """Return ``(connection, reused)``."""
+        if self._idle:
+            return self._idle.pop(), True
+        connection = self.factory()
+        await connection.open()
+        return connection, False
+
+    async def release(self, connection, reuse=True):
+        if reuse and len(self._idle) < self.max_idle:
+            self._idle.append(connection)
+        else:
+            await connection.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.close()
+
+
+async def _with_connection(pool, operation):
+    """
+    Run ``operation(connection)`` on a pooled connection. A reused connection
+    the server has meanwhile closed is retried once on a fresh one.
+    """
+    for attempt in (1, 2):
+        connection, reused = await pool.acquire()
+        try:
+            result = await operation(connection)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await pool.release(connection, reuse=False)
+            if reused and attempt == 1:
+                continue
+            raise
+        except BaseException:
+            # Includes cancellation by the attempt timeout: the
+            # connection may be mid-conversation, never reuse it
+            await pool.release(connection, reuse=False)
+            raise
+        await pool.release(connection, getattr(connection, "reusable", True))
+        return result
+
+
+# -- Deliveries -------------------------------------------------------------
+
+
+class EmailDelivery:
+    """One email; with no ``host`` the send is simulated by a sleep."""
+
+    kind = "email"
+
+    def __init__(
+        self,
+        host,
+        port,
+        message,
+        simulated_delay=1.0,
+        starttls=False,
+        username=None,
+        password=None,
+    ):
+        self.host = host
+        self.port = port
+        self.message = message
+        self.simulated_delay = simulated_delay
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+        self.destination = f"smtp://{host}:{port}" if host else "smtp://simulated"
+
+    def connection(self):
+        return SMTPConnection(
+            self.host, self.port, self.starttls, self.username, self.password
+        )
+
+    async def __call__(self, pools, timeout=None):
+        if not self.host:
+            await asyncio.wait_for(asyncio.sleep(self.simulated_delay), timeout)
+            return True
+
+        async def send(connection):
+            await connection.send(self.message)
+
+        pool = pools.get(self.destination, self.connection)
+        await asyncio.wait_for(_with_connection(pool, send), timeout)
+        return True
+
+
+class WebhookDelivery:
+    """
+    One JSON POST to a webhook URL. HTTP 429 is retried after the server's
+    ``Retry-After`` (capped by ``max_retry_after``) while attempts remain;
+    the wait is on the event loop, so other deliveries keep going. The
+    timeout bounds each POST, not the waits between them.
+    """
+
+    kind = "webhook"
+
+    def __init__(self, url, payload, max_attempts=3, max_retry_after=30.0):
+        self.url = url
+        self.payload = payload
+        self.max_attempts = max_attempts
+        self.max_retry_after = max_retry_after
+        parts = urlsplit(url)
+        self._parts = parts
+        self.destination = f"{parts.scheme}://{parts.netloc}"
+
+    def connection(self):
+        parts = self._parts
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return HTTPConnection(parts.scheme, parts.hostname, port)
+
+    async def __call__(self, pools, timeout=None):
+        parts = self._parts
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        pool = pools.get(self.destination, self.connection)
+
+        async def post(connection):
+            return await connection.post(path, parts.netloc, self.payload)
+
+        for attempt in range(1, self.max_attempts + 1):
+            status, headers, _ = await asyncio.wait_for(
+                _with_connection(pool, post), timeout
+            )
+            if status != 429 or attempt == self.max_attempts:
+                break
+            try:
+                delay = float(headers.get("retry-after", 1))
+            except ValueError:
+                delay = 1.0
+            await asyncio.sleep(min(delay, self.max_retry_after))
+        if status >= 400:
+            raise DeliveryError(f"Webhook {self.url} returned HTTP {status}")
+        return status
+
+
+class BugMailer:
+    """Builds the report email for each new bug."""
+
+    def __init__(
+        self,
+        host=None,
+        port=25,
+        sender=None,
+        recipients=None,
+        starttls=False,
+        username=None,
+        password=None,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender or "bugkiller@localhost"
+        self.recipients = recipients or ["qa@localhost"]
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+
+    def deliveries(self, bugs):
+        """One ``EmailDelivery`` per ``[id, title, status]``; id may be None."""
+        deliveries = []
+        for bug_id, title, status in bugs:
+            message = EmailMessage()
+            message["From"] = self.sender
+            message["To"] = ", ".join(self.recipients)
+            message["Subject"] = f"[BugKiller] New bug: {title}"
+            heading = f"Bug #{bug_id}: {title}" if bug_id is not None else title
+            message.set_content(f"{heading}\nStatus: {status}\n")
+            deliveries.append(
+                EmailDelivery(
+                    self.host,
+                    self.port,
+                    message,
+                    starttls=self.starttls,
+                    username=self.username,
+                    password=self.password,
+                )
+            )
+        return deliveries
+
+
+# -- Dispatcher -------------------------------------------------------------
+
+
+class _Pools:
+    """Per-destination connection pools; lives on the dispatcher's loop."""
+
+    def __init__(self, max_idle):
+        self.max_idle = max_idle
+        self._pools = {}
+
+    def get(self, destination, factory):
+        pool = self._pools.get(destination)
+        if pool is None:
+            pool = self._pools[destination] = ConnectionPool(factory, self.max_idle)
+        return pool
+
+    async def close(self):
+        for pool in self._pools.values():
+            await pool.close()
+
+
+class NotificationDispatcher:
+    """
+    Run deliveries concurrently on a per-process background event loop.
+
+    At most ``max_in_flight`` deliveries run at once, and at most
+    ``per_destination`` against any single destination. ``submit`` is safe
+    to call from any thread. A delivery is an async callable taking the
+    dispatcher's connection pools and ``timeout``, which it applies to each
+    network attempt: a Retry-After back-off between attempts is not cut
+    short by it.
+    """
+
+    def __init__(self, max_in_flight=200, per_destination=50, timeout=10.0):
+        self.max_in_flight = max_in_flight
+        self.per_destination = per_destination
+        self.timeout = timeout
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._limit = None
+        self._destination_limits = {}
+        self._pools = None
+        self._stats = {"delivered": 0, "failed": 0, "in_flight": 0}
+
+    def _ensure_loop(self):
+        # The loop thread does not survive a fork; start one per process
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                self._limit = None
+                self._destination_limits = {}
+                self._pools = _Pools(max_idle=self.per_destination)
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="notification-dispatcher",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    async def _deliver(self, delivery):
+        # Runs on the loop thread only, so the limits need no locking
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.max_in_flight)
+        limit = self._destination_limits.get(delivery.destination)
+        if limit is None:
+            limit = asyncio.Semaphore(self.per_destination)
+            self._destination_limits[delivery.destination] = limit
+
+        # Destination first: a delivery queued behind a slow server must not
+        # hold one of the global slots while it waits
+        async with limit, self._limit:
+            self._stats["in_flight"] += 1
+            NOTIFY_IN_FLIGHT.inc()
+            try:
+                result = await delivery(self._pools, self.timeout)
+            except Exception:
+                self._stats["failed"] += 1
+                NOTIFY_DELIVERIES.labels(kind=delivery.kind, outcome="failed").inc()
+                raise
+            else:
+                self._stats["delivered"] += 1
+                NOTIFY_DELIVERIES.labels(kind=delivery.kind, outcome="ok").inc()
+                return result
+            finally:
+                self._stats["in_flight"] -= 1
+                NOTIFY_IN_FLIGHT.dec()
+
+    def submit(self, delivery):
+        """Schedule ``delivery``; returns a ``concurrent.futures.Future``."""
+        return asyncio.run_coroutine_threadsafe(
+            self._deliver(delivery), self._ensure_loop()
+        )
+
+    def run(self, deliveries):
+        """
+        Deliver all of ``deliveries`` concurrently and wait for them. Returns
+        one result per delivery, in order; failures are returned as exceptions.
+        """
+        futures = [self.submit(delivery) for delivery in deliveries]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self):
+        return dict(self._stats)
+
+    def close(self):
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                loop = self._loop
+                asyncio.run_coroutine_threadsafe(self._pools.close(), loop).result(5)
+                loop.call_soon_threadsafe(loop.stop)
+            self._loop = None
+
+
+class AsyncSlackClient:
+    """
+    ``SlackClient`` counterpart that posts through a ``NotificationDispatcher``
+    so Slack webhooks (and their 429 back-off) run on the event loop.
+    """
+
+    def __init__(self, dispatcher, url, max_attempts=5, max_retry_after=30.0):
+        self.dispatcher = dispatcher
+        self.url = url
+        self.max_attempts = max_attempts
+        self.max_retry_after = max_retry_after
+
+    def post(self, text):
+        delivery = WebhookDelivery(
+            self.url, {"text": text}, self.max_attempts, self.max_retry_after
+        )
+        [result] = self.dispatcher.run([delivery])
+        if isinstance(result, Exception):
+            logger.error("Slack delivery failed: %r", result)
+            return False
+        return True
+
+
+def make_dispatcher(config):
+    """The configured dispatcher, or None when NOTIFY_ASYNC is off."""
+    if not config.get("NOTIFY_ASYNC"):
+        return None
+    return NotificationDispatcher(
+        max_in_flight=config.get("NOTIFY_MAX_IN_FLIGHT", 200),
+        per_destination=config.get("NOTIFY_PER_DESTINATION", 50),
+        timeout=config.get("NOTIFY_TIMEOUT", 10.0),
+    )
+
+
+def make_mailer(config):
+    recipients = config.get("NOTIFY_EMAIL_TO") or ""
+    return BugMailer(
+        host=config.get("SMTP_HOST"),
+        port=config.get("SMTP_PORT", 25),
+        sender=config.get("NOTIFY_EMAIL_FROM"),
+        recipients=[r.strip() for r in recipients.split(",") if r.strip()],
+        starttls=config.get("SMTP_STARTTLS", False),
+        username=config.get("SMTP_USERNAME"),
+        password=config.get("SMTP_PASSWORD"),
+    )
@@ -0,0 +1,143 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+
+class GroupCommitWriter:
+    """
+    Dedicated writer thread that commits concurrent writes in groups.
+
+    Callers ``submit`` a unit of work (a callable taking a ``Transaction``)
+    and get a ``Future`` for its return value. The writer drains whatever is
+    queued, waits up to ``max_delay`` seconds for more (up to ``max_batch``
+    items), runs each item inside its own savepoint on one connection from
+    ``db.write_pool`` and commits once for the whole group. A failing item is
+    rolled back to its savepoint and only its future gets the exception.
+    """
+
+    def __init__(self, db, max_batch=64, max_delay=0.002):
+        self.db = db
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.closed = False
+
+        self._queue = queue.Queue()
+        self._pid = os.getpid()
+        self._stats_lock = threading.Lock()
+        self._stats = {"batches": 0, "items": 0, "failed_commits": 0, "max_batch": 0}
+        self._thread = threading.Thread(
+            target=self._run, name="db-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def alive(self):
+        # The writer thread does not survive a fork.
+        return not self.closed and os.getpid() == self._pid
+
+    def submit(self, work):
+        if not self.alive:
+            raise RuntimeError("Group commit writer is closed")
+        future = Future()
+        self._queue.put((work, future))
+        return future
+
+    def close(self, timeout=5):
+        """Stop accepting work and finish what is already queued."""
+        self.closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            data = dict(self._stats)
+        data["queued"] = self._queue.qsize()
+        return data
+
+    # -- writer thread ------------------------------------------------------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            stop = self._collect(batch)
+            self._commit_batch(batch)
+            if stop:
+                break
+
+    def _collect(self, batch):
+        """Fill ``batch`` from the queue; returns True if close() was seen."""
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                # Anything already queued is taken without waiting; the delay
+                # only applies once the queue is empty.
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+
+    def _commit_batch(self, batch):
+        results = []
+        try:
+            with self.db.write_pool.connection() as conn:
+                tx = self.db.bind(conn)
+                self._begin(conn)
+                for work, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    self.db._execute(conn, "SAVEPOINT group_commit_item")
+                    try:
+                        result = work(tx)
+                    except Exception as e:
+                        self.db._execute(
+                            conn, "ROLLBACK TO SAVEPOINT group_commit_item"
+                        )
+                        self.db._execute(conn, "RELEASE SAVEPOINT group_commit_item")
+                        results.append((future, None, e))
+                    else:
+                        self.db._execute(conn, "RELEASE SAVEPOINT group_commit_item")
+                        results.append((future, result, None))
+                conn.commit()
+        except Exception as e:
+            # The shared transaction is lost (the pool rolled it back or
+            # discarded the connection): fail every caller in the group.
+            with self._stats_lock:
+                self._stats["failed_commits"] += 1
+            # That includes items never started (no connection, failed BEGIN).
+            for work, future in batch:
+                if not future.done():
+                    try:
+                        future.set_exception(e)
+                    except InvalidStateError:
+                        pass  # cancelled by its caller meanwhile
+            return
+
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _begin(self, conn):
+        if self.db.db_type == "mysql":
+            conn.begin()
+        else:
+            # An explicit BEGIN; if the first SAVEPOINT opened the transaction
+            # its RELEASE would commit it.
+            conn.execute("BEGIN")
@@ -0,0 +1,156 @@
+"""
+HTTP-level caching for polled pages: validators and response compression.
+
+``ConditionalGet`` turns a data version (``VersionedCache.validator()``) into
+a strong ETag and a Last-Modified time, so a client whose copy is current
+gets ``304 Not Modified`` before the view queries or renders anything.
+``Compressor`` gzip/brotli-encodes large responses after the view ran and
+keeps the encoded bodies of ETagged responses, so a page is compressed once
+per version rather than once per poll.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+from flask import request
+
+from cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "application/json",
+    "application/javascript",
+)
+
+
+def templates_fingerprint(folder):
+    """Digest of every template, so a deploy changing markup changes ETags."""
+    digest = hashlib.sha1()
+    for root, _, files in sorted(os.walk(folder)):
+        for name in sorted(files):
+            with open(os.path.join(root, name), "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()[:12]
+
+
+class ConditionalGet:
+    """Strong ETags and Last-Modified derived from a data version."""
+
+    def __init__(self, salt=""):
+        self.salt = salt
+        self._seen = {}
+        self._latest = 0
+        self._lock = threading.Lock()
+
+    def etag(self, validator, *variant):
+        """ETag for a representation of ``validator``'s data; ``variant``
+        holds whatever else shapes the body (URL, user, ...)."""
+        raw = "\0".join(map(str, (self.salt, validator, *variant)))
+        return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+    def last_modified(self, validator):
+        """
+        When this process first saw ``validator``: never earlier than the
+        change it reflects. Seconds are strictly increasing per process, so
+        two versions never share a Last-Modified here; across processes the
+        one-second resolution remains, which is why If-None-Match (sent by
+        every browser) takes precedence.
+        """
+        with self._lock:
+            seen = self._seen.get(validator)
+            if seen is None:
+                seen = max(int(time.time()), self._latest + 1)
+                # Only current versions are ever asked about
+                if len(self._seen) > 64:
+                    self._seen.clear()
+                self._seen[validator] = self._latest = seen
+            return seen
+
+    def is_fresh(self, etag, last_modified):
+        """Whether the request's validators match (If-None-Match wins)."""
+        if request.if_none_match:
+            # Compressed variants carry an encoding suffix on the same tag
+            return any(
+                request.if_none_match.contains(etag + suffix)
+                for suffix in ("", "-gzip", "-br")
+            )
+        since = request.headers.get("If-Modified-Since")
+        if since:
+            try:
+                return parsedate_to_datetime(since).timestamp() >= last_modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def apply(response, etag, last_modified):
+        response.set_etag(etag)
+        response.headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+        return response
+
+
+class Compressor:
+    """
+    ``after_request`` hook compressing responses of at least ``min_size``
+    bytes with brotli (when installed) or gzip, per Accept-Encoding.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5, cache_size=256):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._bodies = LRUCache("compressed_bodies", maxsize=cache_size)
+
+    def _encoding(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def _compress(self, data, encoding):
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def __call__(self, response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self._encoding()
+        if encoding is None or (response.content_length or 0) < self.min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        key = f"{etag}|{encoding}" if etag and not weak else None
+        body = self._bodies.get(key) if key else None
+        if body is None:
+            body = self._compress(response.get_data(), encoding)
+            if key:
+                self._bodies.set(key, body)
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag and not weak:
+            # A strong ETag names exact bytes, so each encoding gets its own
+            response.set_etag(f"{etag}-{encoding}")
+        return response
@@ -0,0 +1,103 @@
+"""
+HDR-style latency histogram.
+
+Values are integer microseconds. Below 2048 every value has its own bucket;
+above, each power-of-two range is split into 1024 linear buckets, so any
+recorded value is reported within 0.1% (three significant digits) whatever
+its magnitude, in constant memory per range, like HdrHistogram. Recording
+is a dict increment; percentiles walk the occupied buckets in order.
+"""
+
+import threading
+
+SUB_BUCKETS = 2048
+_HALF = SUB_BUCKETS // 2
+_SUB_BITS = SUB_BUCKETS.bit_length() - 1  # 11
+
+
+def _index(value):
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - _SUB_BITS
+    return SUB_BUCKETS + (shift - 1) * _HALF + ((value >> shift) - _HALF)
+
+
+def _highest_equivalent(index):
+    """The largest value that falls into bucket ``index``."""
+    if index < SUB_BUCKETS:
+        return index
+    shift, sub = divmod(index - SUB_BUCKETS, _HALF)
+    shift += 1
+    return ((sub + _HALF) << shift) + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of microsecond latencies."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value, count=1):
+        value = max(0, int(value))
+        index = _index(value)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + count
+            self.count += count
+            self.total += value * count
+            if self.min is None or value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def merge(self, other):
+        with other._lock:
+            counts = dict(other._counts)
+            count, total, low, high = other.count, other.total, other.min, other.max
+        with self._lock:
+            for index, n in counts.items():
+                self._counts[index] = self._counts.get(index, 0) + n
+            self.count += count
+            self.total += total
+            if low is not None and (self.min is None or low < self.min):
+                self.min = low
+            self.max = max(self.max, high)
+
+    def reset(self):
+        """Clear the histogram and return a copy of what it held."""
+        copy = LatencyHistogram()
+        with self._lock:
+            copy._counts, self._counts = self._counts, {}
+            copy.count, copy.total, copy.min, copy.max = (
+                self.count,
+                self.total,
+                self.min,
+                self.max,
+            )
+            self.count = self.total = self.max = 0
+            self.min = None
+        return copy
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """The value at ``percent`` (0-100), as HdrHistogram reports it."""
+        with self._lock:
+            if not self.count:
+                return 0
+            target = max(1, round(self.count * percent / 100))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= target:
+                    return min(_highest_equivalent(index), self.max)
+            return self.max
+
+    def percentiles(self, percents=(50, 90, 99, 99.9)):
+        return {percent: self.percentile(percent) for percent in percents}
@@ -0,0 +1,171 @@
+"""
+Versioned schema migrations.
+
+``schema_version`` records every applied migration. ``MIGRATIONS`` is the
+ordered list of ``Migration(version, name, apply)``. ``migrate`` applies the
+ones above the recorded version, in order, each recorded as soon as it
+succeeds. A process that only needs to know whether the schema is current
+(``is_current``) runs one indexed lookup.
+
+Every migration is idempotent (``IF NOT EXISTS`` or an existence check).
+Databases created before versioning therefore upgrade cleanly, and two
+processes migrating at once cannot break each other. Apply migrations with
+
+    python scripts/migrate.py        (or: flask --app app migrate)
+
+and add new ones at the end of ``MIGRATIONS``, never by editing old ones.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+from werkzeug.security import generate_password_hash
+
+from archive import create_archive_table
+from search import create_search_index
+from stats import create_stats_tables
+
+logger = logging.getLogger(__name__)
+
+# Indexes backing the dashboard's keyset pagination: newest-first over
+# (created_at, id), optionally narrowed by status. On InnoDB the primary key
+# is appended to every secondary index anyway.
+BUG_INDEXES = {
+    "idx_bugs_created_id": ("created_at", "id"),
+    "idx_bugs_status_created_id": ("status", "created_at", "id"),
+}
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable
+
+
+def _base_schema(db):
+    db.execute_query(
+        f"""
+        CREATE TABLE IF NOT EXISTS bugs (
+            {db.id_column},
+            title VARCHAR(255) NOT NULL,
+            status VARCHAR(50) DEFAULT 'New',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+    db.execute_query(
+        f"""
+        CREATE TABLE IF NOT EXISTS users (
+            {db.id_column},
+            username VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL
+        )
+    """
+    )
+    for name, columns in BUG_INDEXES.items():
+        db.create_index(name, "bugs", columns)
+
+
+def _outbox(db):
+    # Notifications written in the same transaction as their bugs and
+    # published by the relay (see outbox.py). Times are epoch seconds.
+    db.execute_query(
+        f"""
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            {db.id_column},
+            kind VARCHAR(20) NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            claim_token VARCHAR(32) NULL,
+            claimed_at DOUBLE NULL,
+            published_at DOUBLE NULL,
+            attempts INT NOT NULL DEFAULT 0,
+            last_error VARCHAR(255) NULL
+        )
+    """
+    )
+    # Relay scan: pending rows in id order
+    db.create_index(
+        "idx_outbox_published_id", "notification_outbox", ("published_at", "id")
+    )
+
+
+def _outbox_dead_rows(db):
+    # Rows that failed OUTBOX_MAX_ATTEMPTS times are parked, not reclaimed
+    if not db.column_exists("notification_outbox", "dead_at"):
+        db.execute_query(
+            "ALTER TABLE notification_outbox ADD COLUMN dead_at DOUBLE NULL"
+        )
+
+
+def _admin_user(db):
+    if db.fetch_one("SELECT id FROM users LIMIT 1") is None:
+        db.execute_query(
+            "INSERT INTO users (username, password) VALUES (?, ?)",
+            ("admin", generate_password_hash("admin123")),
+        )
+
+
+MIGRATIONS = [
+    Migration(1, "bugs and users tables", _base_schema),
+    Migration(2, "notification outbox", _outbox),
+    Migration(3, "default admin user", _admin_user),
+    # Full-text search over titles (FTS5 table or FULLTEXT index)
+    Migration(4, "full-text search index", create_search_index),
+    # Cold storage for old closed bugs (see archive.py)
+    Migration(5, "bugs archive table", create_archive_table),
+    # Status counters and creation-rate rollups (see stats.py)
+    Migration(6, "statistics tables", create_stats_tables),
+    Migration(7, "dead outbox rows", _outbox_dead_rows),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(db):
+    """The highest applied migration, 0 for an unversioned database."""
+    if not db.table_exists("schema_version"):
+        return 0
+    row = db.fetch_one("SELECT MAX(version) AS version FROM schema_version")
+    return row["version"] or 0
+
+
+def is_current(db):
+    return current_version(db) >= LATEST_VERSION
+
+
+def pending(db):
+    version = current_version(db)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def migrate(db):
+    """Apply every pending migration in order; returns those applied."""
+    db.execute_query(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
+    applied = []
+    for migration in pending(db):
+        logger.info("Applying migration %d: %s", migration.version, migration.name)
+        migration.apply(db)
+        # A concurrent migrator may have recorded it first
+        if (
+            db.fetch_one(
+                "SELECT version FROM schema_version WHERE version = ?",
+                (migration.version,),
+            )
+            is None
+        ):
+            db.execute_query(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (migration.version, migration.name),
+            )
+        applied.append(migration)
+    return applied
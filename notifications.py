@@ -0,0 +1,229 @@
+"""
+Slack delivery for the notification tasks.
+
+``SlackClient`` posts through one keep-alive ``requests.Session`` per process
+(created lazily, so prefork workers never share a socket) and backs off on
+HTTP 429 using Slack's ``Retry-After``. ``SlackDigest`` coalesces the bugs
+handed to it within a time window, or until a size limit, into one message.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import requests
+from prometheus_client import Counter
+from requests.adapters import HTTPAdapter
+
+from dispatcher import AsyncSlackClient
+from resilience import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+SLACK_REQUESTS = Counter(
+    "slack_requests_total",
+    "Slack webhook requests by outcome (ok, rate_limited, error)",
+    ["outcome"],
+)
+SLACK_DIGEST_BUGS = Counter(
+    "slack_digest_bugs_total", "Bugs delivered in Slack digest messages"
+)
+
+
+class SlackDeliveryError(Exception):
+    """Slack did not accept a message; the task delivering it should retry."""
+
+
+class SlackClient:
+    """Webhook poster with a per-process pooled session and 429 handling."""
+
+    def __init__(
+        self,
+        url,
+        timeout=2.0,
+        max_attempts=5,
+        pool_size=4,
+        max_retry_after=30.0,
+        retry_policy=None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.pool_size = pool_size
+        self.max_retry_after = max_retry_after
+        self.retry_policy = retry_policy or RetryPolicy(base_delay=0.5, max_delay=10)
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Sockets must not be shared across a fork
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1, pool_maxsize=self.pool_size
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+                    self._pid = os.getpid()
+        return self._session
+
+    def post(self, text):
+        """Post ``text``; returns True once Slack accepted it, else False."""
+        for attempt in range(1, self.max_attempts + 1):
+            delay = self.retry_policy.backoff(attempt)
+            try:
+                response = self.session.post(
+                    self.url, json={"text": text}, timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                SLACK_REQUESTS.labels(outcome="error").inc()
+                logger.warning("Slack post failed (attempt %d): %s", attempt, e)
+            else:
+                if response.status_code < 400:
+                    SLACK_REQUESTS.labels(outcome="ok").inc()
+                    return True
+                if response.status_code == 429:
+                    SLACK_REQUESTS.labels(outcome="rate_limited").inc()
+                    delay = self._retry_after(response, delay)
+                else:
+                    SLACK_REQUESTS.labels(outcome="error").inc()
+                    if response.status_code < 500:
+                        logger.error(
+                            "Slack rejected message: HTTP %d", response.status_code
+                        )
+                        return False
+            if attempt < self.max_attempts:
+                time.sleep(delay)
+        logger.error("Giving up on Slack message after %d attempts", self.max_attempts)
+        return False
+
+    def _retry_after(self, response, default):
+        try:
+            return min(float(response.headers["Retry-After"]), self.max_retry_after)
+        except (KeyError, ValueError):
+            return default
+
+
+def format_digest(bugs, max_lines=50):
+    """Slack text for ``bugs`` (lists of ``[id, title, status]``)."""
+    if len(bugs) == 1:
+        _, title, status = bugs[0]
+        return f"New Bug Reported: {title} (Status: {status})"
+    lines = [f"{len(bugs)} new bugs reported:"]
+    for bug_id, title, status in bugs[:max_lines]:
+        prefix = f"#{bug_id} " if bug_id is not None else ""
+        lines.append(f"- {prefix}{title} (Status: {status})")
+    if len(bugs) > max_lines:
+        lines.append(f"...and {len(bugs) - max_lines} more")
+    return "\n".join(lines)
+
+
+class SlackDigest:
+    """
+    Coalesce bug notifications into digest messages.
+
+    With ``window=0`` every ``add`` is sent at once as one message, before
+    the task returns, and raises ``SlackDeliveryError`` if Slack did not
+    accept it, so the task is retried rather than acked: the outbox's
+    at-least-once delivery holds (up to the task's retry limit). Otherwise
+    bugs are buffered and a background thread sends them every ``window``
+    seconds; a buffer reaching ``max_bugs`` is sent immediately by the caller.
+    Buffered bugs live only in process memory after their task was acked:
+    ``flush`` runs on clean worker shutdown, but a hard kill loses them, so
+    digest mode downgrades Slack delivery to at-most-once.
+    """
+
+    def __init__(self, client, window=0.0, max_bugs=500, max_lines=50):
+        self.client = client
+        self.window = window
+        self.max_bugs = max(1, max_bugs)
+        self.max_lines = max_lines
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def add(self, bugs):
+        """Queue ``bugs`` for delivery; returns how many were accepted."""
+        bugs = [list(bug) for bug in bugs]
+        if not self.window:
+            if not self._send(bugs):
+                raise SlackDeliveryError(f"Slack did not accept {len(bugs)} bugs")
+            return len(bugs)
+        with self._lock:
+            self._buffer.extend(bugs)
+            full = len(self._buffer) >= self.max_bugs
+        self._ensure_flusher()
+        if full:
+            self.flush()
+        return len(bugs)
+
+    def flush(self):
+        """Send everything buffered so far."""
+        with self._lock:
+            bugs, self._buffer = self._buffer, []
+        for start in range(0, len(bugs), self.max_bugs):
+            self._send(bugs[start : start + self.max_bugs])
+
+    def _send(self, bugs):
+        if not bugs:
+            return True
+        if not self.client.post(format_digest(bugs, self.max_lines)):
+            return False
+        SLACK_DIGEST_BUGS.inc(len(bugs))
+        return True
+
+    def _ensure_flusher(self):
+        # Threads do not survive a fork; start one per worker process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="slack-digest", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Slack digest flush failed: %s", e)
+
+
+def make_slack_digest(config, dispatcher=None):
+    """
+    Build the process-wide ``SlackDigest`` from the Flask/Celery config. With
+    a ``NotificationDispatcher`` the webhook is posted on its event loop.
+    """
+    url = config.get("SLACK_WEBHOOK_URL", "https://api.slack.com/messaging/send")
+    if dispatcher is not None:
+        client = AsyncSlackClient(
+            dispatcher,
+            url,
+            max_attempts=config.get("SLACK_MAX_ATTEMPTS", 5),
+            max_retry_after=config.get("SLACK_MAX_RETRY_AFTER", 30.0),
+        )
+    else:
+        client = SlackClient(
+            url,
+            timeout=config.get("SLACK_TIMEOUT", 2.0),
+            max_attempts=config.get("SLACK_MAX_ATTEMPTS", 5),
+            pool_size=config.get("SLACK_POOL_SIZE", 4),
+            max_retry_after=config.get("SLACK_MAX_RETRY_AFTER", 30.0),
+        )
+    return SlackDigest(
+        client,
+        window=config.get("SLACK_DIGEST_WINDOW", 0.0),
+        max_bugs=config.get("SLACK_DIGEST_MAX_BUGS", 500),
+        max_lines=config.get("SLACK_DIGEST_MAX_LINES", 50),
+    )
@@ -0,0 +1,244 @@
+"""
+Transactional outbox for bug notifications.
+
+Writers insert one ``notification_outbox`` row per channel in the same
+transaction as the bugs they describe, so a notification exists if and only if
+its bug was committed and requests never wait on the broker. A relay (the
+``relay_outbox`` Celery beat task or ``scripts/relay_outbox.py``) claims
+pending rows under a lease, publishes them to the broker in batches and marks
+them done. Delivery is at-least-once: a relay that dies after publishing but
+before marking re-publishes those rows once their lease expires. A row whose
+publish fails ``max_attempts`` times is parked as dead (``dead_at`` set,
+``last_error`` kept) and no longer claimed; fix the cause, then clear
+``dead_at`` and ``attempts`` to retry it.
+"""
+
+import json
+import logging
+import time
+import uuid
+
+from prometheus_client import Counter, Gauge
+
+from statements import Record, statement
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KINDS = ("email", "slack")
+
+OUTBOX_PUBLISHED = Counter(
+    "outbox_published_total", "Outbox rows published to the broker", ["kind"]
+)
+OUTBOX_PUBLISH_FAILURES = Counter(
+    "outbox_publish_failures_total", "Outbox rows whose publish failed", ["kind"]
+)
+OUTBOX_DEAD = Counter(
+    "outbox_dead_total",
+    "Outbox rows parked after failing OUTBOX_MAX_ATTEMPTS times",
+    ["kind"],
+)
+OUTBOX_PENDING = Gauge("outbox_pending", "Outbox rows not yet published")
+
+
+class OutboxRecord(Record):
+    __slots__ = ("id", "kind", "payload")
+
+    def __init__(self, id, kind, payload):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+
+    @property
+    def bugs(self):
+        return json.loads(self.payload)
+
+
+INSERT_OUTBOX = statement(
+    "insert_outbox", "INSERT INTO notification_outbox (kind, payload) VALUES (?, ?)"
+)
+OUTBOX_CLAIMABLE = statement(
+    "outbox_claimable",
+    "SELECT id FROM notification_outbox WHERE published_at IS NULL"
+    " AND dead_at IS NULL AND (claimed_at IS NULL OR claimed_at < ?)"
+    " ORDER BY id LIMIT ?",
+)
+OUTBOX_CLAIMED = statement(
+    "outbox_claimed",
+    "SELECT id, kind, payload FROM notification_outbox"
+    " WHERE claim_token = ? ORDER BY id",
+    OutboxRecord,
+)
+OUTBOX_PENDING_COUNT = statement(
+    "outbox_pending_count",
+    "SELECT COUNT(*) AS pending FROM notification_outbox"
+    " WHERE published_at IS NULL AND dead_at IS NULL",
+)
+OUTBOX_PURGE = statement(
+    "outbox_purge",
+    "DELETE FROM notification_outbox"
+    " WHERE published_at IS NOT NULL AND published_at < ?",
+)
+
+
+def enqueue_bug_notifications(tx, bugs, kinds=OUTBOX_KINDS):
+    """
+    Queue notifications for ``bugs`` (a list of ``[id, title, status]``) on
+    the open transaction ``tx``: one outbox row per channel.
+    """
+    if not bugs:
+        return
+    payload = json.dumps([list(bug) for bug in bugs])
+    for kind in kinds:
+        tx.execute(INSERT_OUTBOX, (kind, payload))
+
+
+def _placeholders(ids):
+    return ", ".join("?" * len(ids))
+
+
+def _claim(tx, ids, token, now, lease):
+    # Re-check the claim condition: another relay may have taken some ids
+    # between our SELECT and this UPDATE.
+    tx.execute(
+        "UPDATE notification_outbox SET claim_token = ?, claimed_at = ?"
+        f" WHERE id IN ({_placeholders(ids)}) AND published_at IS NULL"
+        " AND dead_at IS NULL AND (claimed_at IS NULL OR claimed_at < ?)",
+        (token, now, *ids, now - lease),
+    )
+    return tx.fetchall(OUTBOX_CLAIMED, (token,))
+
+
+def _mark_published(db, ids, token):
+    db.write(
+        lambda tx: tx.execute(
+            "UPDATE notification_outbox SET published_at = ?, claim_token = NULL"
+            f" WHERE id IN ({_placeholders(ids)}) AND claim_token = ?",
+            (time.time(), *ids, token),
+        )
+    )
+
+
+def _mark_failed(db, ids, token, error, max_attempts):
+    """
+    Release the claim so the next run retries without waiting for the lease,
+    or park rows that reached ``max_attempts``. Returns how many were parked.
+    """
+    if not max_attempts:
+        dead, dead_params = "NULL", ()
+    else:
+        now = time.time()
+        dead = "CASE WHEN attempts + 1 >= ? THEN ? ELSE NULL END"
+        dead_params = (max_attempts, now)
+
+    def work(tx):
+        tx.execute(
+            # dead_at first: MySQL assigns left to right, so later
+            # expressions would see the incremented attempts
+            f"UPDATE notification_outbox SET dead_at = {dead},"
+            " attempts = attempts + 1, last_error = ?, claim_token = NULL,"
+            f" claimed_at = NULL WHERE id IN ({_placeholders(ids)})"
+            " AND claim_token = ?",
+            (*dead_params, str(error)[:255], *ids, token),
+        )
+        if not max_attempts:
+            return 0
+        row = tx.fetch_one(
+            "SELECT COUNT(*) AS dead FROM notification_outbox"
+            f" WHERE id IN ({_placeholders(ids)}) AND dead_at = ?",
+            (*ids, now),
+        )
+        return row["dead"]
+
+    return db.write(work)
+
+
+def _chunks(rows, max_bugs):
+    """Group rows into publishable chunks of at most ``max_bugs`` bugs each."""
+    chunk, bugs = [], []
+    for row in rows:
+        row_bugs = row.bugs
+        if chunk and len(bugs) + len(row_bugs) > max_bugs:
+            yield chunk, bugs
+            chunk, bugs = [], []
+        chunk.append(row)
+        bugs.extend(row_bugs)
+    if chunk:
+        yield chunk, bugs
+
+
+def relay_once(
+    db, publishers, batch_size=200, lease=60, max_bugs_per_task=500, max_attempts=10
+):
+    """
+    Claim up to ``batch_size`` pending rows and publish them.
+
+    ``publishers`` maps a kind to a callable taking a list of
+    ``[id, title, status]`` (e.g. a batch task's ``.delay``). Rows of one kind
+    are merged so many single-bug rows become one task. A row whose publish
+    has failed ``max_attempts`` times is parked as dead (None: never). Returns
+    a dict with ``claimed``, ``published``, ``failed`` and ``dead`` row counts.
+    """
+    now = time.time()
+    candidates = db.execute_query(OUTBOX_CLAIMABLE, (now - lease, batch_size), True)
+    ids = [row["id"] for row in candidates]
+    result = {"claimed": 0, "published": 0, "failed": 0, "dead": 0}
+    if ids:
+        token = uuid.uuid4().hex
+        claimed = db.write(lambda tx: _claim(tx, ids, token, now, lease))
+        result["claimed"] = len(claimed)
+
+        by_kind = {}
+        for row in claimed:
+            by_kind.setdefault(row.kind, []).append(row)
+        for kind, rows in by_kind.items():
+            publish = publishers.get(kind)
+            for chunk, bugs in _chunks(rows, max_bugs_per_task):
+                chunk_ids = [row.id for row in chunk]
+                try:
+                    if publish is None:
+                        raise LookupError(f"No publisher for outbox kind {kind!r}")
+                    publish(bugs)
+                except Exception as e:
+                    logger.warning("Outbox publish of %s rows failed: %s", kind, e)
+                    OUTBOX_PUBLISH_FAILURES.labels(kind=kind).inc(len(chunk))
+                    dead = _mark_failed(db, chunk_ids, token, e, max_attempts)
+                    if dead:
+                        logger.error(
+                            "Parked %d %s outbox rows after %s failed attempts",
+                            dead,
+                            kind,
+                            max_attempts,
+                        )
+                        OUTBOX_DEAD.labels(kind=kind).inc(dead)
+                    result["failed"] += len(chunk)
+                    result["dead"] += dead
+                else:
+                    OUTBOX_PUBLISHED.labels(kind=kind).inc(len(chunk))
+                    _mark_published(db, chunk_ids, token)
+                    result["published"] += len(chunk)
+
+    pending = db.fetch_one(OUTBOX_PENDING_COUNT)
+    OUTBOX_PENDING.set(pending["pending"])
+    return result
+
+
+def drain(
+    db, publishers, batch_size=200, lease=60, max_bugs_per_task=500, max_attempts=10
+):
+    """Relay until no claimable rows are left; returns the summed counts."""
+    total = {"claimed": 0, "published": 0, "failed": 0, "dead": 0}
+    while True:
+        result = relay_once(
+            db, publishers, batch_size, lease, max_bugs_per_task, max_attempts
+        )
+        for key, value in result.items():
+            total[key] += value
+        # A failing publish leaves its rows claimable again; stop rather than
+        # spin on them until the next run.
+        if result["claimed"] < batch_size or result["failed"]:
+            return total
+
+
+def purge_published(db, older_than):
+    """Delete rows published more than ``older_than`` seconds ago."""
+    db.write(lambda tx: tx.execute(OUTBOX_PURGE, (time.time() - older_than,)))
@@ -0,0 +1,63 @@
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at, bug_id):
+    """Encode the (created_at, id) keyset position of a row as a URL-safe token."""
+    raw = json.dumps([str(created_at), int(bug_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a token produced by ``encode_cursor`` back to ``(created_at, id)``."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, bug_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), int(bug_id)
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {token!r}") from e
+
+
+def keyset_page_sql(columns, table, by_status=False, after=False):
+    """
+    SQL for a newest-first keyset page over ``(created_at, id)``.
+
+    The seek predicate leads with ``created_at <= ?`` so both SQLite and MySQL
+    start a range scan of the composite index at the cursor instead of walking
+    it from the top.
+    """
+    where = []
+    if by_status:
+        where.append("status = ?")
+    if after:
+        where.append("created_at <= ? AND (created_at < ? OR id < ?)")
+
+    query = f"SELECT {columns} FROM {table}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    return query + " ORDER BY created_at DESC, id DESC LIMIT ?"
+
+
+def keyset_page_params(status=None, cursor=None, limit=20):
+    """
+    Parameters matching ``keyset_page_sql``. One extra row is requested so the
+    caller can tell whether another page exists.
+    """
+    params = []
+    if status:
+        params.append(status)
+    if cursor:
+        created_at, bug_id = cursor
+        params.extend([created_at, created_at, bug_id])
+    params.append(limit + 1)
+    return tuple(params)
+
+
+def keyset_page_query(columns, table, status=None, cursor=None, limit=20):
+    """Build ``(sql, params)`` for one keyset page."""
+    query = keyset_page_sql(columns, table, bool(status), bool(cursor))
+    return query, keyset_page_params(status, cursor, limit)
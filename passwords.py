@@ -0,0 +1,182 @@
+"""
+Password verification off the request threads.
+
+Checking a Werkzeug hash (scrypt or pbkdf2) costs tens of milliseconds of
+CPU with the GIL held, so a burst of logins run inline stalls every other
+request of the worker. ``PasswordVerifier`` runs the checks in a pool of
+worker processes instead, so logins use every core while request threads
+only wait on a future.
+
+Admission is bounded: at most ``max_pending`` checks may be queued or
+running at once. Beyond that ``verify`` raises ``VerifierBusy`` at once
+(the login view answers 503 with Retry-After) rather than queueing
+unboundedly behind the pool. The number in flight is exported as
+``password_verify_pending``.
+
+A correct password stored with other parameters than ``method`` (an older
+algorithm or cost) is rehashed in the same worker call; ``verify`` returns
+the new hash for the caller to store.
+"""
+
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from prometheus_client import Counter, Gauge, Histogram
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from db_metrics import LATENCY_BUCKETS
+
+PASSWORD_VERIFY_PENDING = Gauge(
+    "password_verify_pending", "Password checks queued or running in the pool"
+)
+PASSWORD_VERIFY_REJECTED = Counter(
+    "password_verify_rejected_total",
+    "Password checks refused, by reason (busy: admission limit, timeout)",
+    ["reason"],
+)
+PASSWORD_VERIFY_SECONDS = Histogram(
+    "password_verify_seconds",
+    "Time from submitting a password check to its result, queueing included",
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_REHASHED = Counter(
+    "password_rehashed_total", "Stored hashes upgraded to the current parameters"
+)
+
+
+class VerifierBusy(Exception):
+    """The check was not admitted or did not finish in time; retry later."""
+
+
+@functools.lru_cache(maxsize=None)
+def _method_prefix(method):
+    # What generate_password_hash writes before the salt, with the defaults
+    # filled in, e.g. "scrypt:32768:8:1" for "scrypt"
+    return generate_password_hash("", method=method).split("$", 1)[0]
+
+
+def needs_rehash(stored, method):
+    """Whether ``stored`` was hashed with other parameters than ``method``."""
+    return stored.split("$", 1)[0] != _method_prefix(method)
+
+
+def check_and_rehash(stored, password, method):
+    """
+    ``(valid, new_hash)``: new_hash is set when the password is right but
+    ``stored`` uses outdated parameters. Runs in the worker processes.
+    """
+    if not check_password_hash(stored, password):
+        return False, None
+    if needs_rehash(stored, method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class PasswordVerifier:
+    """
+    Bounded pool of ``workers`` processes for ``check_and_rehash``; with
+    ``workers=0`` checks run in the calling thread, still admission-limited.
+    The pool is started on first use and again in a forked child.
+    """
+
+    def __init__(self, workers=None, max_pending=64, timeout=10.0, method="scrypt"):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self.method = method
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = None
+        self._pid = None
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # spawn: forking a process with live threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                PASSWORD_VERIFY_REJECTED.labels(reason="busy").inc()
+                raise VerifierBusy("Too many password checks in progress")
+            self._pending += 1
+            PASSWORD_VERIFY_PENDING.set(self._pending)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+            PASSWORD_VERIFY_PENDING.set(self._pending)
+
+    def verify(self, stored, password):
+        """
+        ``(valid, new_hash)`` as ``check_and_rehash``; raises VerifierBusy
+        when over the admission limit or after ``timeout`` seconds.
+        """
+        self._admit()
+        start = time.perf_counter()
+        if not self.workers:
+            try:
+                return check_and_rehash(stored, password, self.method)
+            finally:
+                self._release()
+                PASSWORD_VERIFY_SECONDS.observe(time.perf_counter() - start)
+
+        try:
+            future = self._pool().submit(
+                check_and_rehash, stored, password, self.method
+            )
+        except BaseException as e:
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self._discard_pool()
+            raise
+        # A check that times out still occupies the pool until it finishes,
+        # so it stays counted until then
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            PASSWORD_VERIFY_REJECTED.labels(reason="timeout").inc()
+            raise VerifierBusy("Password check timed out") from None
+        except BrokenProcessPool:
+            self._discard_pool()
+            raise
+        finally:
+            PASSWORD_VERIFY_SECONDS.observe(time.perf_counter() - start)
+
+    def _discard_pool(self):
+        # A worker died; the next check starts a fresh pool
+        with self._lock:
+            self._executor = None
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def make_password_verifier(config):
+    return PasswordVerifier(
+        workers=config.get("PASSWORD_WORKERS"),
+        max_pending=config.get("PASSWORD_MAX_PENDING", 64),
+        timeout=config.get("PASSWORD_TIMEOUT", 10.0),
+        method=config.get("PASSWORD_HASH_METHOD", "scrypt"),
+    )
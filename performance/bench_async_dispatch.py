@@ -0,0 +1,150 @@
+"""
+Notification throughput: blocking delivery vs the asyncio dispatcher.
+
+Starts a local mock SMTP server and a mock webhook server (both answering
+after --latency seconds, like a remote service), then delivers --count emails
+and --count webhook posts once one at a time with smtplib/requests, as a
+prefork worker process does, and once through NotificationDispatcher. No
+network access or Docker needed:
+
+    python performance/bench_async_dispatch.py --count 500 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import smtplib
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dispatcher import BugMailer, NotificationDispatcher, WebhookDelivery  # noqa: E402
+
+
+class MockServers:
+    """SMTP and HTTP servers on one background event loop."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.emails = 0
+        self.posts = 0
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.smtp_port = self._start(self._smtp)
+        self.http_port = self._start(self._http)
+
+    def _start(self, handler):
+        async def start():
+            server = await asyncio.start_server(handler, "127.0.0.1", 0, backlog=1024)
+            return server.sockets[0].getsockname()[1]
+
+        return asyncio.run_coroutine_threadsafe(start(), self.loop).result()
+
+    async def _smtp(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 mock ESMTP\r\n")
+        in_data = False
+        while line := await reader.readline():
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    await asyncio.sleep(self.latency)
+                    self.emails += 1
+                    writer.write(b"250 OK queued\r\n")
+                continue
+            verb = line[:4].upper()
+            if verb == b"DATA":
+                in_data = True
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif verb == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                break
+            elif verb == b"EHLO":
+                writer.write(b"250-mock\r\n250 8BITMIME\r\n")
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+    async def _http(self, reader, writer):
+        # HTTP/1.1 keep-alive: serve requests until the client hangs up
+        self.connections += 1
+        while True:
+            length = None
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            if length is None:
+                break
+            await reader.readexactly(length)
+            await asyncio.sleep(self.latency)
+            self.posts += 1
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+        writer.close()
+
+
+def bugs(count):
+    return [[i, f"Bench bug {i}", "New"] for i in range(count)]
+
+
+def run_blocking(servers, count):
+    mailer = BugMailer("127.0.0.1", servers.smtp_port)
+    url = f"http://127.0.0.1:{servers.http_port}/hook"
+    start = time.perf_counter()
+    opened = servers.connections
+    for delivery, bug in zip(mailer.deliveries(bugs(count)), bugs(count)):
+        with smtplib.SMTP("127.0.0.1", servers.smtp_port) as smtp:
+            smtp.send_message(delivery.message)
+        requests.post(url, json={"bug": bug}, timeout=10)
+    elapsed = time.perf_counter() - start
+    print(f"  blocking: {servers.connections - opened} connections opened")
+    return elapsed
+
+
+def run_async(servers, count, max_in_flight, per_destination):
+    dispatcher = NotificationDispatcher(max_in_flight, per_destination, timeout=30)
+    mailer = BugMailer("127.0.0.1", servers.smtp_port)
+    url = f"http://127.0.0.1:{servers.http_port}/hook"
+    deliveries = mailer.deliveries(bugs(count))
+    deliveries += [WebhookDelivery(url, {"bug": bug}) for bug in bugs(count)]
+    opened = servers.connections
+    start = time.perf_counter()
+    results = dispatcher.run(deliveries)
+    elapsed = time.perf_counter() - start
+    print(f"  async: {servers.connections - opened} connections opened")
+    dispatcher.close()
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        print(f"  {len(failures)} async deliveries failed, e.g. {failures[0]!r}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--blocking-count", type=int, default=50)
+    parser.add_argument("--max-in-flight", type=int, default=200)
+    parser.add_argument("--per-destination", type=int, default=100)
+    args = parser.parse_args()
+
+    servers = MockServers(args.latency)
+    print(f"{'mode':<10} {'notifications':>13} {'seconds':>9} {'per sec':>9}")
+    # The blocking path is slow by construction; time a smaller sample
+    elapsed = run_blocking(servers, args.blocking_count)
+    total = 2 * args.blocking_count
+    print(f"{'blocking':<10} {total:>13} {elapsed:>9.2f} {total / elapsed:>9.1f}")
+    elapsed = run_async(servers, args.count, args.max_in_flight, args.per_destination)
+    total = 2 * args.count
+    print(f"{'async':<10} {total:>13} {elapsed:>9.2f} {total / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Overhead of the per-statement database metrics (db_metrics.py).
+
+Runs the same point lookup --queries times against a temporary SQLite
+database with DB_METRICS on and off and reports the cost per statement; the
+difference is what the histograms add to every query. No server needed:
+
+    python performance/bench_db_metrics.py --queries 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database import DatabaseManager  # noqa: E402
+from statements import BUG_BY_ID, INSERT_BUG  # noqa: E402
+
+
+def run(metrics, queries, rounds):
+    with patch.dict(
+        os.environ,
+        {"DATABASE_TYPE": "sqlite", "DB_METRICS": "true" if metrics else "false"},
+    ):
+        db = DatabaseManager()
+    db.sqlite_path = os.path.join(tempfile.mkdtemp(prefix="bench-metrics-"), "b.db")
+    db.init_db()
+    db.insert_many(INSERT_BUG, ((f"bug {i}", "New") for i in range(1000)))
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(queries):
+            db.query_one(BUG_BY_ID, (i % 1000 + 1,))
+        best = min(best, time.perf_counter() - start)
+    db.close()
+    return best / queries * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    off = run(False, args.queries, args.rounds)
+    on = run(True, args.queries, args.rounds)
+    print(f"{'metrics':<8} {'µs/query':>9}")
+    print(f"{'off':<8} {off:>9.2f}")
+    print(f"{'on':<8} {on:>9.2f}")
+    print(f"overhead {on - off:+.2f} µs/query ({(on - off) / off:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Memory of a full-table export: streamed cursor vs fetchall.
+
+Seeds a temporary SQLite database with --rows bugs, then reads every row once
+through DatabaseManager.stream (as /api/bugs/export does) and once through
+execute_query(fetch=True), reporting the peak Python heap and RSS growth of
+each. No server or Docker needed:
+
+    python performance/bench_export.py --rows 1000000
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database import DatabaseManager  # noqa: E402
+from statements import EXPORT_BUGS, INSERT_BUG  # noqa: E402
+
+
+def max_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(label, consume):
+    rss_before = max_rss_mb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = consume()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    growth = max_rss_mb() - rss_before
+    print(f"{label:<10} {rows:>10} {elapsed:>9.2f} {peak:>12.1f} {growth:>15.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite"}):
+        db = DatabaseManager()
+    db.sqlite_path = os.path.join(tempfile.mkdtemp(prefix="bench-export-"), "bench.db")
+    db.init_db()
+    rows = ((f"Export bug {i} " + "x" * 60, "New") for i in range(args.rows))
+    db.insert_many(INSERT_BUG, rows, chunk_size=10000)
+
+    print(
+        f"{'mode':<10} {'rows':>10} {'seconds':>9} {'heap peak MB':>12} {'RSS growth MB':>15}"
+    )
+    # Streaming first: ru_maxrss only ever grows, so the fetchall run cannot
+    # hide the streaming run's footprint
+    measure(
+        "stream",
+        lambda: sum(1 for _ in db.stream(EXPORT_BUGS, batch_size=args.batch_size)),
+    )
+    measure("fetchall", lambda: len(db.query(EXPORT_BUGS)))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
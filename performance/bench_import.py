@@ -0,0 +1,95 @@
+"""
+Startup cost: how long a fresh interpreter takes to import the app (what
+every gunicorn worker, Celery worker and test process pays before serving).
+
+Imports each module --runs times in a new process against a temporary
+SQLite database and reports the median and best wall time, then the
+slowest imports from one ``python -X importtime`` run:
+
+    python performance/bench_import.py --runs 10 app celery_app
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMED_IMPORT = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def import_seconds(module, env):
+    output = subprocess.run(
+        [sys.executable, "-c", TIMED_IMPORT.format(module=module)],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def slowest_imports(module, env, top):
+    """``(cumulative_us, name)`` of the ``top`` slowest top-level imports."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    rows, children = [], []
+    # Lines come children first, indented two spaces per level
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                rows = children
+            children = []
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=["app", "celery_app"])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-import-")
+    env = {
+        **os.environ,
+        "DATABASE_TYPE": "sqlite",
+        "DB_SQLITE_PATH": os.path.join(workdir, "bench.db"),
+    }
+    for module in args.modules:
+        times = [import_seconds(module, env) for _ in range(args.runs)]
+        print(
+            f"import {module}: median {statistics.median(times) * 1000:.0f} ms,"
+            f" best {min(times) * 1000:.0f} ms ({args.runs} runs)"
+        )
+        for cumulative, name in slowest_imports(module, env, args.top):
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+        # Importing must not create the database (the schema is migrated
+        # on first request or by scripts/migrate.py)
+        if os.path.exists(env["DB_SQLITE_PATH"]):
+            print(f"  warning: importing {module} touched the database")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Dashboard latency during a login storm, with password checks in the request
+thread (PASSWORD_WORKERS=0) and in the process pool.
+
+--logins threads log in back to back through the test client while one
+thread fetches /api/bugs/1 and records its latency; the run reports login
+throughput and the p50/p99 of the lookups. No server needed:
+
+    python performance/bench_login.py --logins 8 --seconds 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ["TESTING"] = "True"
+os.environ["DATABASE_TYPE"] = "sqlite"
+os.environ["DB_SQLITE_PATH"] = os.path.join(
+    tempfile.mkdtemp(prefix="bench-login-"), "b.db"
+)
+
+import app as app_module  # noqa: E402
+from latency_histogram import LatencyHistogram  # noqa: E402
+from passwords import PasswordVerifier  # noqa: E402
+
+
+def run(workers, logins, seconds):
+    verifier = PasswordVerifier(workers=workers, max_pending=1000)
+    app_module.password_verifier = verifier
+    flask_app = app_module.app
+    stop = threading.Event()
+    done = []
+
+    def login_loop():
+        client = flask_app.test_client()
+        count = 0
+        while not stop.is_set():
+            client.post("/login", data={"username": "admin", "password": "admin123"})
+            count += 1
+        done.append(count)
+
+    lookups = LatencyHistogram()
+    client = flask_app.test_client()
+    client.post("/api/bugs/bulk", json=[{"title": "Bench bug"}])
+    # Warm up: start the pool and the first request's schema check
+    client.post("/login", data={"username": "admin", "password": "admin123"})
+
+    threads = [threading.Thread(target=login_loop) for _ in range(logins)]
+    for thread in threads:
+        thread.start()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        start = time.perf_counter()
+        client.get("/api/bugs/1")
+        lookups.record((time.perf_counter() - start) * 1e6)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    verifier.shutdown()
+    return sum(done) / seconds, lookups.percentiles((50, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8, help="login threads")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'checks':<14} {'logins/s':>9} {'lookup p50':>11} {'lookup p99':>11}")
+    for label, workers in (("inline", 0), (f"pool x{args.workers}", args.workers)):
+        rate, p = run(workers, args.logins, args.seconds)
+        print(f"{label:<14} {rate:>9.1f} {p[50] / 1000:>9.1f}ms {p[99] / 1000:>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Dashboard read latency under a concurrent write storm, SQLite default vs WAL.
+
+Runs reader threads issuing the dashboard's keyset query while writer threads
+insert bugs as fast as they can, once per DB_SQLITE_MODE, against a temporary
+database file. No server or Docker needed:
+
+    python performance/bench_sqlite_wal.py --seconds 5 --readers 8 --writers 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database import DatabaseManager  # noqa: E402
+from pagination import keyset_page_query  # noqa: E402
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    index = min(
+        len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+def run(mode, seconds, readers, writers, seed_rows):
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite", "DB_SQLITE_MODE": mode}):
+        db = DatabaseManager()
+    db.sqlite_path = os.path.join(tempfile.mkdtemp(prefix=f"bench-{mode}-"), "bench.db")
+    db.init_db()
+    db.insert_many(
+        "INSERT INTO bugs (title, status) VALUES (?, ?)",
+        [(f"Seed bug {i}", "New") for i in range(seed_rows)],
+    )
+
+    query, params = keyset_page_query("id, title, status, created_at", "bugs", limit=20)
+    stop = threading.Event()
+    latencies, errors, writes = [], [0], [0]
+    lock = threading.Lock()
+
+    def read_loop():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                db.execute_query(query, params, fetch=True)
+                local.append(time.perf_counter() - start)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    def write_loop():
+        count = 0
+        while not stop.is_set():
+            try:
+                db.execute_write(
+                    "INSERT INTO bugs (title, status) VALUES (?, ?)",
+                    ("Storm bug", "New"),
+                )
+                count += 1
+            except Exception:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            writes[0] += count
+
+    threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+    threads += [threading.Thread(target=write_loop) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "mode": mode,
+        "reads": len(ms),
+        "writes": writes[0],
+        "errors": errors[0],
+        "p50": percentile(ms, 50),
+        "p95": percentile(ms, 95),
+        "p99": percentile(ms, 99),
+        "max": ms[-1] if ms else float("nan"),
+        "mean": statistics.fmean(ms) if ms else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seed-rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<8} {'reads':>8} {'writes':>8} {'errors':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>9}"
+    )
+    for mode in ("default", "wal"):
+        r = run(mode, args.seconds, args.readers, args.writers, args.seed_rows)
+        print(
+            f"{r['mode']:<8} {r['reads']:>8} {r['writes']:>8} {r['errors']:>7} "
+            f"{r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f} {r['max']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Headless load tests with SLO checks and run comparison.
+
+Runs a scenario from performance/scenarios.py with Locust in headless mode
+against a freshly started local app on a temporary, seeded SQLite database
+(or --host for a running deployment), then judges the per-endpoint
+p50/p95/p99 latency and error rate against the scenario's SLOs and saves a
+JSON report:
+
+    python performance/loadtest.py list
+    python performance/loadtest.py run read_heavy
+    python performance/loadtest.py run write_burst --time-scale 0.2 \\
+        --env DB_SQLITE_MODE=wal --env DB_GROUP_COMMIT=true
+    python performance/loadtest.py diff reports/a.json reports/b.json
+
+``run`` exits with status 1 when an SLO is missed; ``diff`` when a latency
+percentile of the second run is more than --threshold worse.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from unittest.mock import patch
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from scenarios import SCENARIOS  # noqa: E402
+
+REPORT_DIR = os.path.join(HERE, "reports")
+PERCENTILES = {"p50": "50%", "p95": "95%", "p99": "99%"}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_database(path, bugs, env):
+    """Create the schema at ``path`` and insert ``bugs`` generated bugs."""
+    from database import DatabaseManager
+    from seeding import seed_bugs
+
+    with patch.dict(os.environ, {**env, "DB_SQLITE_PATH": path}):
+        db = DatabaseManager()
+    db.init_db()
+    seed_bugs(db, bugs, seed=42)
+    db.close()
+
+
+def start_app(env, port, log):
+    """Start the app with Flask's threaded server; returns the process."""
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            *("-m", "flask", "--app", "app", "run", "--port", str(port)),
+            *("--no-reload", "--no-debugger", "--with-threads"),
+        ],
+        cwd=ROOT,
+        env={**os.environ, **env},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"App exited with status {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("App did not become healthy within 60s")
+
+
+def run_locust(scenario, host, prefix, time_scale):
+    command = [
+        sys.executable,
+        *("-m", "locust", "-f", os.path.join(HERE, "locustfile.py")),
+        *("--headless", "--host", host, "--csv", prefix, "--only-summary"),
+        *("--loglevel", "WARNING", "--exit-code-on-error", "0"),
+        *scenario.users,
+    ]
+    env = {
+        **os.environ,
+        "LOADTEST_SCENARIO": scenario.name,
+        "LOADTEST_TIME_SCALE": str(time_scale),
+    }
+    subprocess.run(command, env=env, check=True)
+
+
+def _number(value):
+    try:
+        return float(value)
+    except ValueError:  # "N/A" for endpoints without requests
+        return None
+
+
+def read_stats(path):
+    """``{endpoint: metrics}`` from Locust's ``<prefix>_stats.csv``."""
+    endpoints = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            name = f"{row['Type']} {row['Name']}".strip()
+            requests = int(row["Request Count"])
+            failures = int(row["Failure Count"])
+            endpoints[name] = {
+                "requests": requests,
+                "failures": failures,
+                "error_rate": failures / requests if requests else 0.0,
+                "rps": _number(row["Requests/s"]),
+                "max": _number(row["Max Response Time"]),
+                **{key: _number(row[column]) for key, column in PERCENTILES.items()},
+            }
+    return endpoints
+
+
+def check_slos(slos, endpoints):
+    """One ``{endpoint, metric, limit, actual, passed}`` dict per SLO."""
+    results = []
+    for endpoint, limits in slos.items():
+        stats = endpoints.get(endpoint)
+        for metric, limit in limits.items():
+            actual = stats.get(metric) if stats and stats["requests"] else None
+            results.append(
+                {
+                    "endpoint": endpoint,
+                    "metric": metric,
+                    "limit": limit,
+                    "actual": actual,
+                    # An SLO without traffic is not met
+                    "passed": actual is not None and actual <= limit,
+                }
+            )
+    return results
+
+
+def print_slos(results):
+    for result in results:
+        actual = result["actual"]
+        shown = "no data" if actual is None else f"{actual:g}"
+        mark = "PASS" if result["passed"] else "FAIL"
+        print(
+            f"{mark}  {result['endpoint']:<32} {result['metric']:<10}"
+            f" {shown:>10} <= {result['limit']:g}"
+        )
+
+
+def command_run(args):
+    scenario = SCENARIOS[args.scenario]
+    os.makedirs(args.report_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    workdir = tempfile.mkdtemp(prefix=f"loadtest-{scenario.name}-")
+    prefix = os.path.join(workdir, "locust")
+    app_env = dict(item.split("=", 1) for item in args.env)
+
+    server = None
+    log = open(os.path.join(workdir, "app.log"), "w")
+    try:
+        host = args.host
+        if host is None:
+            app_env = {
+                "TESTING": "True",
+                "DATABASE_TYPE": "sqlite",
+                "DB_SQLITE_PATH": os.path.join(workdir, "loadtest.db"),
+                **app_env,
+            }
+            seeds = scenario.seed_bugs if args.seed_bugs is None else args.seed_bugs
+            seed_database(app_env["DB_SQLITE_PATH"], seeds, app_env)
+            port = free_port()
+            server = start_app(app_env, port, log)
+            host = f"http://127.0.0.1:{port}"
+        started = time.time()
+        run_locust(scenario, host, prefix, args.time_scale)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        log.close()
+
+    endpoints = read_stats(f"{prefix}_stats.csv")
+    slos = check_slos(scenario.slos, endpoints)
+    report = {
+        "scenario": scenario.name,
+        "started_at": datetime.datetime.fromtimestamp(started).isoformat(),
+        "seconds": round(time.time() - started, 1),
+        "time_scale": args.time_scale,
+        "host": args.host or "local",
+        "app_env": app_env,
+        "endpoints": endpoints,
+        "slos": slos,
+        "passed": all(result["passed"] for result in slos),
+    }
+    path = os.path.join(args.report_dir, f"{scenario.name}-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print_slos(slos)
+    print(f"Report: {path} (app log: {log.name})")
+    return 0 if report["passed"] else 1
+
+
+def diff_reports(old, new, threshold):
+    """Rows of ``(endpoint, metric, old, new, change)`` and the regressions."""
+    rows, regressed = [], []
+    for endpoint in sorted(set(old["endpoints"]) & set(new["endpoints"])):
+        before, after = old["endpoints"][endpoint], new["endpoints"][endpoint]
+        for metric in (*PERCENTILES, "rps", "error_rate"):
+            a, b = before.get(metric), after.get(metric)
+            if a is None or b is None:
+                continue
+            if metric == "error_rate":
+                change = b - a  # absolute: rates are often 0
+            else:
+                change = b / a - 1 if a else 0.0
+            rows.append((endpoint, metric, a, b, change))
+            if metric in PERCENTILES and change > threshold:
+                regressed.append(f"{endpoint} {metric}")
+    return rows, regressed
+
+
+def command_diff(args):
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows, regressed = diff_reports(old, new, args.threshold)
+    print(f"{'endpoint':<32} {'metric':<10} {'old':>10} {'new':>10} {'change':>9}")
+    for endpoint, metric, a, b, change in rows:
+        print(f"{endpoint:<32} {metric:<10} {a:>10g} {b:>10g} {change:>+9.1%}")
+    for name in sorted(set(old["endpoints"]) ^ set(new["endpoints"])):
+        print(f"{name:<32} only in {'old' if name in old['endpoints'] else 'new'}")
+    if regressed:
+        print(f"Worse by more than {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def command_list(args):
+    for scenario in SCENARIOS.values():
+        users = ", ".join(
+            f"{name} x{weight}" for name, weight in scenario.users.items()
+        )
+        print(f"{scenario.name:<12} {scenario.duration:>5}s  {scenario.description}")
+        print(f"{'':<12} {'':>6}  users: {users}; {scenario.user_rps:g} req/s each")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run a scenario and check its SLOs")
+    run.add_argument("scenario", choices=sorted(SCENARIOS))
+    run.add_argument("--host", help="target URL (default: start the app locally)")
+    run.add_argument("--time-scale", type=float, default=1.0)
+    run.add_argument("--seed-bugs", type=int)
+    run.add_argument("--env", action="append", default=[], metavar="KEY=VALUE")
+    run.add_argument("--report-dir", default=REPORT_DIR)
+    run.set_defaults(func=command_run)
+
+    diff = commands.add_parser("diff", help="compare two reports")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=0.2)
+    diff.set_defaults(func=command_diff)
+
+    commands.add_parser("list", help="list scenarios").set_defaults(func=command_list)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,183 @@
+"""
+Locust users for BugKiller.
+
+Interactive (web UI, all users, 1-3s think time):
+
+    locust -f performance/locustfile.py --host http://localhost:15005
+
+Scripted, headless runs with load shapes and SLO checks go through
+performance/loadtest.py, which selects a scenario from performance/scenarios.py
+via LOADTEST_SCENARIO; its user weights, per-user request rate and stages
+then apply here.
+"""
+
+import os
+import random
+import sys
 import time
-from locust import HttpUser, task, between
+
+from locust import HttpUser, LoadTestShape, between, constant_throughput, task
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scenarios import SCENARIOS  # noqa: E402
+
+SCENARIO = SCENARIOS.get(os.environ.get("LOADTEST_SCENARIO", ""))
+# Shrinks every stage, e.g. 0.1 for a quick smoke run of a scenario
+TIME_SCALE = float(os.environ.get("LOADTEST_TIME_SCALE", 1))
+STATUSES = ["New", "In Progress", "Resolved", "Closed"]
+SEARCH_WORDS = ["login", "crash", "slow", "dashboard", "export", "safari"]
+
+
+def _wait_time():
+    if SCENARIO is None:
+        return between(1, 3)
+    return constant_throughput(SCENARIO.user_rps)
+
+
+def _check(response, ok=(200,)):
+    if response.status_code in ok:
+        response.success()
+    else:
+        response.failure(f"HTTP {response.status_code}")
+
 
 class BugKillerUser(HttpUser):
-    # 模拟用户在每个任务之间等待 1 到 3 秒
-    wait_time = between(1, 3)
+    abstract = True
+    wait_time = _wait_time()
+
+    def report_bug(self):
+        bug = {"bug_title": f"Load test bug {time.time()}", "bug_status": "New"}
+        # /add redirects to the dashboard; the redirect is not followed
+        with self.client.post(
+            "/add", data=bug, allow_redirects=False, catch_response=True
+        ) as response:
+            _check(response, (302,))
 
-    @task(4)  # 权重为 4，模拟 80% 的用户行为是查看首页
-    def view_bugs(self):
-        """模拟用户访问 Bug 列表页"""
+    def view_dashboard(self):
         with self.client.get("/", catch_response=True) as response:
-            if response.status_code == 200:
-                response.success()
-            else:
-                response.failure(f"Failed to load home page: {response.status_code}")
-
-    @task(1)  # 权重为 1，模拟 20% 的用户行为是提交 Bug
-    def create_bug(self):
-        """模拟用户提交一个新的 Bug"""
-        # 注意：在 Flask 中，/add 提交后会 302 跳转到首页，我们需要处理这个逻辑
-        bug_data = {
-            "title": f"Locust Performance Bug {time.time()}",
-            "status": "New"
-        }
-        with self.client.post("/add", data=bug_data, catch_response=True) as response:
-            # 302 是重定向，在我们的业务逻辑中代表提交成功
-            if response.status_code in [200, 302]:
+            if response.status_code == 200 and "Bug Dashboard" in response.text:
                 response.success()
             else:
-                response.failure(f"Failed to create bug: {response.status_code}")
+                response.failure(f"Dashboard not served: HTTP {response.status_code}")
+
+
+class DashboardReader(BugKillerUser):
+    """Anonymous dashboard polling: pages, filters, stats and search."""
+
+    @task(6)
+    def dashboard(self):
+        self.view_dashboard()
+
+    @task(2)
+    def filtered(self):
+        with self.client.get(
+            f"/?status={random.choice(STATUSES)}",
+            name="/?status=[status]",
+            catch_response=True,
+        ) as response:
+            _check(response)
+
+    @task(1)
+    def stats(self):
+        with self.client.get("/api/stats", catch_response=True) as response:
+            _check(response)
+
+    @task(1)
+    def search(self):
+        with self.client.get(
+            f"/search?q={random.choice(SEARCH_WORDS)}",
+            name="/search",
+            catch_response=True,
+        ) as response:
+            _check(response)
+
+
+class BugReporter(BugKillerUser):
+    """Files bugs through the /add form."""
+
+    @task
+    def add(self):
+        self.report_bug()
+
+
+class BulkImporter(BugKillerUser):
+    """Logged-in importer posting 100-bug batches to the bulk API."""
+
+    def on_start(self):
+        self.client.post("/login", data={"username": "admin", "password": "admin123"})
+
+    @task
+    def bulk(self):
+        bugs = [
+            {"title": f"Imported bug {time.time()} #{i}", "status": "New"}
+            for i in range(100)
+        ]
+        with self.client.post(
+            "/api/bugs/bulk", json={"bugs": bugs}, catch_response=True
+        ) as response:
+            _check(response, (200, 201))
+
+
+class TriageUser(BugKillerUser):
+    """
+    Logs in once, then browses, triages and reports bugs (the former
+    tests/test_performance.py behaviour).
+    """
+
+    def on_start(self):
+        with self.client.post(
+            "/login",
+            data={"username": "admin", "password": "admin123"},
+            allow_redirects=False,
+            catch_response=True,
+        ) as response:
+            _check(response, (302,))
+
+    @task(3)
+    def dashboard(self):
+        self.view_dashboard()
+
+    @task(1)
+    def report(self):
+        self.report_bug()
+
+    @task(1)
+    def triage(self):
+        with self.client.get(
+            f"/api/search?q={random.choice(SEARCH_WORDS)}",
+            name="/api/search",
+            catch_response=True,
+        ) as response:
+            _check(response)
+            ids = []
+            if response.status_code == 200:
+                ids = [bug["id"] for bug in response.json()["results"]]
+        if ids:
+            bug_id = random.choice(ids)
+            with self.client.post(
+                f"/api/bugs/{bug_id}/status",
+                json={"status": random.choice(STATUSES)},
+                name="/api/bugs/[id]/status",
+                catch_response=True,
+            ) as response:
+                _check(response, (200, 404))
+
+
+if SCENARIO is not None:
+
+    class ScenarioShape(LoadTestShape):
+        """The stages of LOADTEST_SCENARIO, then stop."""
+
+        stages = [
+            (seconds * TIME_SCALE, users, spawn_rate)
+            for seconds, users, spawn_rate in SCENARIO.stages
+        ]
+
+        def tick(self):
+            elapsed = self.get_run_time()
+            for seconds, users, spawn_rate in self.stages:
+                if elapsed < seconds:
+                    return users, spawn_rate
+                elapsed -= seconds
+            return None
@@ -0,0 +1,273 @@
+"""
+Microbenchmarks of the request hot paths, with a stored baseline.
+
+Times DatabaseManager.execute_query / fetch_one / query, password hashing,
+and the index, login and add_bug views (through Flask's test client, so
+routing, templates and the database are included but no HTTP server) on a
+temporary SQLite database. Each benchmark is calibrated to run for at least
+--min-time per round, warmed up, then measured over --rounds rounds; the
+median per-call time is what gets compared.
+
+    python performance/microbench.py                    # compare to baseline
+    python performance/microbench.py --update-baseline  # record a new one
+    python performance/microbench.py -k index --rounds 20
+
+Exits with status 1 when a benchmark's median is more than --threshold
+(default 25%) slower than performance/baseline.json, and stays so when it is
+measured again --confirm more times: one noisy run does not fail the gate.
+Timings only mean something against a baseline recorded in the same
+environment (Python, CPU model and count); against any other baseline the
+comparison is printed but never fails. Record one per machine with
+--update-baseline (or keep it elsewhere with --baseline).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(ROOT, "performance", "baseline.json")
+
+
+def measure(func, min_time=0.1, rounds=10, warmup=2):
+    """Per-call times (seconds) of ``func`` for each measured round."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    times = []
+    for i in range(warmup + rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if i >= warmup:
+            times.append((time.perf_counter() - start) / loops)
+    return times, loops
+
+
+def summarize(times, loops):
+    ordered = sorted(times)
+    return {
+        "median": statistics.median(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "rounds": len(ordered),
+        "loops": loops,
+    }
+
+
+def make_benchmarks(workdir):
+    """``{name: callable}`` of every benchmark, on a seeded database."""
+    os.environ["TESTING"] = "True"
+    from werkzeug.security import check_password_hash, generate_password_hash
+
+    from database import DatabaseManager
+    from pagination import keyset_page_params
+    from statements import BUG_BY_ID, INSERT_BUG, bug_page_statement
+
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite"}):
+        db = DatabaseManager()
+    db.sqlite_path = os.path.join(workdir, "bench.db")
+    db.init_db()
+    db.insert_many(
+        INSERT_BUG,
+        ((f"Benchmark bug {i}", "New" if i % 3 else "Resolved") for i in range(5000)),
+    )
+
+    import app as app_module
+
+    app_module.db_manager.sqlite_path = db.sqlite_path
+    app_module.db_manager._pool = db.pool
+    flask_app = app_module.app
+    flask_app.config["HTTP_CONDITIONAL_GET"] = False
+    client = flask_app.test_client()
+    client.post("/login", data={"username": "admin", "password": "admin123"})
+    anonymous = flask_app.test_client()
+    page = bug_page_statement()
+    password_hash = generate_password_hash("admin123")
+    ids = itertools.cycle(range(1, 5001))
+    titles = (f"Microbench bug {i}" for i in itertools.count())
+
+    def index_cold():
+        app_module.bug_list_cache.invalidate()
+        client.get("/")
+
+    return db, {
+        "db.execute_query": lambda: db.execute_query(
+            "SELECT id, title FROM bugs WHERE id = ?", (next(ids),), fetch=True
+        ),
+        "db.fetch_one": lambda: db.fetch_one(
+            "SELECT id, title FROM bugs WHERE id = ?", (next(ids),)
+        ),
+        "db.query_one_statement": lambda: db.query_one(BUG_BY_ID, (next(ids),)),
+        "db.bug_page": lambda: db.query(page, keyset_page_params()),
+        "password.check_hash": lambda: check_password_hash(password_hash, "admin123"),
+        "view.index_cached": lambda: client.get("/"),
+        "view.index_uncached": index_cold,
+        "view.login": lambda: anonymous.post(
+            "/login", data={"username": "admin", "password": "admin123"}
+        ),
+        "view.add_bug": lambda: client.post(
+            "/add", data={"bug_title": next(titles), "bug_status": "New"}
+        ),
+    }
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu": _cpu_model(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def change(baseline, name, result):
+    return result["median"] / baseline["benchmarks"][name]["median"] - 1
+
+
+def compare(baseline, results, threshold):
+    """
+    Rows of ``(name, baseline, current, change)`` and the names whose median
+    is more than ``threshold`` slower than the baseline's.
+    """
+    base = baseline["benchmarks"]
+    rows, regressed = [], []
+    for name, result in results.items():
+        if name not in base:
+            rows.append((name, None, result["median"], None))
+            continue
+        delta = change(baseline, name, result)
+        rows.append((name, base[name]["median"], result["median"], delta))
+        if delta > threshold:
+            regressed.append(name)
+    return rows, regressed
+
+
+def confirm_regressions(baseline, regressed, remeasure, threshold, runs):
+    """
+    The names in ``regressed`` that are still more than ``threshold`` slower
+    in each of ``runs`` fresh measurements (``remeasure(name)``).
+    """
+    confirmed = []
+    for name in regressed:
+        for attempt in range(runs):
+            delta = change(baseline, name, remeasure(name))
+            print(f"  re-run {attempt + 1} of {name}: {delta:+.1%}", file=sys.stderr)
+            if delta <= threshold:
+                break
+        else:
+            confirmed.append(name)
+    return confirmed
+
+
+def print_rows(rows):
+    print(f"{'benchmark':<26} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, expected, current, change in rows:
+        base = f"{expected * 1e6:10.1f}us" if expected is not None else "-"
+        delta = f"{change:+.1%}" if change is not None else "new"
+        print(f"{name:<26} {base:>12} {current * 1e6:10.1f}us {delta:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="pattern", help="only benchmarks matching regex")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--min-time", type=float, default=0.1)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--confirm", type=int, default=2, help="re-runs a regression must survive"
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="also write this run's results here")
+    args = parser.parse_args()
+
+    db, benchmarks = make_benchmarks(tempfile.mkdtemp(prefix="microbench-"))
+
+    def run_one(name):
+        times, loops = measure(
+            benchmarks[name], args.min_time, args.rounds, args.warmup
+        )
+        return summarize(times, loops)
+
+    results = {}
+    for name in benchmarks:
+        if args.pattern and not re.search(args.pattern, name):
+            continue
+        results[name] = run_one(name)
+        print(f"  {name}: {results[name]['median'] * 1e6:.1f}us", file=sys.stderr)
+
+    run = {"environment": environment(), "benchmarks": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        if args.pattern and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)
+            # A filtered run only replaces the benchmarks it measured, of a
+            # baseline from this environment
+            if previous.get("environment") == run["environment"]:
+                run["benchmarks"] = {**previous["benchmarks"], **results}
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        db.close()
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows, regressed = compare(baseline, results, args.threshold)
+    print_rows(rows)
+    if baseline.get("environment") != run["environment"]:
+        db.close()
+        print("Baseline recorded in another environment; not gating:")
+        print(f"  baseline: {baseline.get('environment')}")
+        print(f"  this run: {run['environment']}")
+        print("Record one here with --update-baseline --baseline <path>.")
+        return 0
+    regressed = confirm_regressions(
+        baseline, regressed, run_one, args.threshold, args.confirm
+    )
+    db.close()
+    if regressed:
+        print(f"Regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
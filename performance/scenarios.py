@@ -0,0 +1,94 @@
+"""
+Load-test scenarios run by performance/loadtest.py.
+
+A scenario names the Locust user classes to run (with weights), the load
+shape as stages of ``(seconds, users, spawn_rate)``, how many requests per
+second each user aims for (``constant_throughput``, so the arrival rate is
+users x user_rps while latency stays below 1/user_rps), how many bugs to
+seed, and the SLOs its report is judged against.
+
+SLOs are ``{endpoint: {metric: limit}}`` with latencies in milliseconds
+(``p50``, ``p95``, ``p99``) and ``error_rate`` as a fraction. Endpoint names
+are the Locust request names used in locustfile.py; ``Aggregated`` covers
+every request.
+
+This module is plain data so the runner can import it without Locust (whose
+import monkey-patches the process with gevent).
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    users: dict
+    stages: list
+    user_rps: float = 1.0
+    seed_bugs: int = 5000
+    slos: dict = field(default_factory=dict)
+
+    @property
+    def duration(self):
+        return sum(stage[0] for stage in self.stages)
+
+
+_READ_SLOS = {
+    "GET /": {"p50": 50, "p95": 200, "p99": 500, "error_rate": 0.001},
+    "GET /api/stats": {"p95": 200, "error_rate": 0.001},
+    "GET /search": {"p95": 300, "error_rate": 0.001},
+}
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario(
+            "read_heavy",
+            "Dashboard polling with a trickle of new bugs; load in steps",
+            users={"DashboardReader": 9, "BugReporter": 1},
+            stages=[(30, 10, 5), (30, 25, 5), (30, 50, 10)],
+            user_rps=2,
+            slos={
+                **_READ_SLOS,
+                "POST /add": {"p95": 500, "error_rate": 0.01},
+                "Aggregated": {"p99": 750, "error_rate": 0.005},
+            },
+        ),
+        Scenario(
+            "write_burst",
+            "Steady reads, then a spike of bug reports and bulk imports",
+            users={"DashboardReader": 1, "BugReporter": 3, "BulkImporter": 1},
+            stages=[(20, 5, 5), (20, 60, 30), (20, 5, 30)],
+            user_rps=2,
+            slos={
+                "GET /": {"p95": 300, "error_rate": 0.01},
+                "POST /add": {"p50": 100, "p95": 750, "p99": 1500, "error_rate": 0.01},
+                "POST /api/bugs/bulk": {"p95": 2000, "error_rate": 0.01},
+                "Aggregated": {"error_rate": 0.01},
+            },
+        ),
+        Scenario(
+            "auth_mix",
+            "Logged-in users: login storm, then browse, triage and report",
+            users={"TriageUser": 1},
+            stages=[(30, 20, 20), (60, 20, 20)],
+            user_rps=1,
+            slos={
+                "POST /login": {"p95": 1000, "error_rate": 0.001},
+                "GET /": {"p95": 300, "error_rate": 0.001},
+                "POST /api/bugs/[id]/status": {"p95": 300, "error_rate": 0.01},
+                "Aggregated": {"p99": 1500, "error_rate": 0.005},
+            },
+        ),
+        Scenario(
+            "soak",
+            "Moderate mixed load held for 30 minutes to surface leaks",
+            users={"DashboardReader": 6, "BugReporter": 2, "TriageUser": 1},
+            stages=[(60, 20, 5), (1740, 20, 5)],
+            user_rps=1,
+            seed_bugs=20000,
+            slos={**_READ_SLOS, "Aggregated": {"p99": 750, "error_rate": 0.001}},
+        ),
+    )
+}
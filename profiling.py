@@ -0,0 +1,211 @@
+"""
+On-demand sampling profiler for Flask requests.
+
+A profiled request registers its thread with ``SamplingProfiler``, whose
+single background thread reads that thread's stack every ``interval``
+seconds (``sys._current_frames``) until the request ends. The profiled
+code runs unmodified, with no tracing hooks. Samples are aggregated as
+collapsed stacks per endpoint and can be downloaded as Brendan Gregg's
+collapsed-stack format (``flamegraph.pl``, speedscope, inferno) or as a
+speedscope JSON file.
+
+``RequestProfiler`` chooses which requests to profile: a random
+``sample_rate`` fraction, plus any request that an admin sends with the
+``X-Profile`` header. With a rate of 0 (the default) each request costs one
+float comparison and one header lookup, and the sampler thread is never
+started.
+"""
+
+import collections
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from flask import request
+
+PROFILE_HEADER = "X-Profile"
+
+# Distinct stacks kept per endpoint; further new stacks are counted together
+MAX_STACKS = 5000
+TRUNCATED = "[other stacks]"
+
+_ROOT = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT) :]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads into per-key counters."""
+
+    def __init__(self, interval=0.005, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._targets = {}  # thread id -> key
+        self._stacks = collections.defaultdict(collections.Counter)
+        self._requests = collections.Counter()
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+
+    def start(self, key):
+        """Sample the calling thread under ``key`` until ``stop()``."""
+        with self._lock:
+            self._targets[threading.get_ident()] = key
+            self._requests[key] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+            self._wake.notify()
+
+    def stop(self):
+        with self._lock:
+            self._targets.pop(threading.get_ident(), None)
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
+
+    def _stack(self, frame):
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def sample(self):
+        """Take one sample of every registered thread."""
+        with self._lock:
+            targets = dict(self._targets)
+        if not targets:
+            return
+        frames = sys._current_frames()
+        with self._lock:
+            for thread_id, key in targets.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stacks = self._stacks[key]
+                stack = self._stack(frame)
+                if stack not in stacks and len(stacks) >= MAX_STACKS:
+                    stack = (TRUNCATED,)
+                stacks[stack] += 1
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._targets:
+                    self._wake.wait()
+            self.sample()
+            time.sleep(self.interval)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._requests.clear()
+
+    def summary(self):
+        """``{key: {"requests": n, "samples": n}}`` for every profiled key."""
+        with self._lock:
+            return {
+                key: {
+                    "requests": self._requests[key],
+                    "samples": sum(self._stacks[key].values()),
+                }
+                for key in sorted(self._requests)
+            }
+
+    def _snapshot(self, key=None):
+        with self._lock:
+            keys = [key] if key is not None else sorted(self._stacks)
+            return {k: dict(self._stacks[k]) for k in keys if k in self._stacks}
+
+    def collapsed(self, key=None):
+        """Collapsed stacks, one ``key;frame;...;frame count`` line each."""
+        lines = []
+        for k, stacks in self._snapshot(key).items():
+            for stack, count in sorted(stacks.items()):
+                lines.append(";".join((k, *stack)) + f" {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self, key=None):
+        """A speedscope file (JSON) with one sampled profile per key."""
+        frames, index = [], {}
+        profiles = []
+        for k, stacks in self._snapshot(key).items():
+            samples, weights = [], []
+            for stack, count in stacks.items():
+                ids = []
+                for label in stack:
+                    if label not in index:
+                        index[label] = len(frames)
+                        frames.append({"name": label})
+                    ids.append(index[label])
+                samples.append(ids)
+                weights.append(count * self.interval)
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": k,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            )
+        return json.dumps(
+            {
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "shared": {"frames": frames},
+                "profiles": profiles,
+                "name": "bugkiller requests",
+                "exporter": "bugkiller profiling.py",
+            }
+        )
+
+
+class RequestProfiler:
+    """
+    ``before_request``/``teardown_request`` hooks deciding which requests
+    ``profiler`` samples. ``is_admin`` is called only for requests carrying
+    ``PROFILE_HEADER``, which non-admins cannot use to force profiling.
+    """
+
+    def __init__(self, profiler, sample_rate=0.0, is_admin=None):
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.is_admin = is_admin or (lambda: False)
+
+    def init_app(self, app):
+        app.before_request(self.before_request)
+        app.teardown_request(self.teardown_request)
+
+    def _wanted(self):
+        if PROFILE_HEADER in request.headers and self.is_admin():
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def before_request(self):
+        if not self.sample_rate and PROFILE_HEADER not in request.headers:
+            return
+        if self._wanted():
+            request.environ["bugkiller.profiled"] = True
+            self.profiler.start(request.endpoint or "<unmatched>")
+
+    def teardown_request(self, exc=None):
+        if request.environ.pop("bugkiller.profiled", False):
+            self.profiler.stop()
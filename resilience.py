@@ -0,0 +1,185 @@
+import contextvars
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency that is known to be down."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the time budget for an operation has been used up."""
+
+
+class Deadline:
+    """A point in (monotonic) time by which an operation must be done."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline():
+    """The deadline of the enclosing ``deadline_scope``, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Bound every DB call inside the block by one shared time budget."""
+    token = _current_deadline.set(Deadline(seconds))
+    try:
+        yield _current_deadline.get()
+    finally:
+        _current_deadline.reset(token)
+
+
+def push_deadline(seconds):
+    """Non-context-manager form of ``deadline_scope`` for request hooks."""
+    return _current_deadline.set(Deadline(seconds))
+
+
+def pop_deadline(token):
+    _current_deadline.reset(token)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts=4, base_delay=0.05, max_delay=2.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        """Delay before retry number ``attempt`` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+
+class CircuitBreaker:
+    """
+    Classic closed/open/half-open breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with ``CircuitOpenError`` for ``reset_timeout`` seconds.
+    Then a single trial call is let through (half-open); its outcome closes
+    or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0, on_change=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """Raise ``CircuitOpenError`` unless a call may proceed now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit open: database unavailable")
+                self._set_state(self.HALF_OPEN)
+            if self._trial_in_flight:
+                raise CircuitOpenError("Circuit half-open: trial call in flight")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self._state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def release(self):
+        """End a call whose outcome says nothing about the dependency's health."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                if self._state != self.OPEN:
+                    self._set_state(self.OPEN)
+
+    def _set_state(self, state):
+        self._state = state
+        if self.on_change is not None:
+            self.on_change(state)
+
+
+# MySQL errors meaning the server is unreachable or refusing work: too many
+# connections, can't connect, server gone away, lost connection.
+MYSQL_CONNECTIVITY_ERRORS = {1040, 2002, 2003, 2006, 2013, 2055}
+# Transient contention on a healthy server: lock wait timeout, deadlock.
+MYSQL_CONTENTION_ERRORS = {1205, 1213}
+
+
+def is_connectivity_error(exc):
+    """Whether ``exc`` says the database itself is unreachable (breaker input)."""
+    if isinstance(exc, pymysql.err.InterfaceError):
+        return True  # connection already closed / broken
+    if isinstance(exc, pymysql.err.OperationalError):
+        return bool(exc.args) and exc.args[0] in MYSQL_CONNECTIVITY_ERRORS
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def is_retryable(exc):
+    """Whether ``exc`` is a transient failure worth retrying."""
+    if is_connectivity_error(exc):
+        return True
+    if isinstance(exc, pymysql.err.OperationalError):
+        return bool(exc.args) and exc.args[0] in MYSQL_CONTENTION_ERRORS
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc).lower()
+        return "locked" in message or "busy" in message
+    return False
+
+
+def error_class(exc):
+    """Short label for metrics, e.g. ``OperationalError:2003``."""
+    name = type(exc).__name__
+    if isinstance(exc, pymysql.err.MySQLError) and exc.args:
+        return f"{name}:{exc.args[0]}"
+    return name
@@ -0,0 +1,43 @@
+"""
+Run one archival pass now, e.g. for a first large backlog, with the
+ARCHIVE_* settings unless overridden:
+
+    python scripts/archive_bugs.py [--older-than-days 30] [--max-seconds 0]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from celery_app import archive_bugs, celery  # noqa: E402
+from database import db_manager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--older-than-days", type=float)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--max-duty-cycle", type=float)
+    parser.add_argument(
+        "--max-seconds", type=float, help="stop after this long (0: no limit)"
+    )
+    args = parser.parse_args()
+
+    # Apply pending migrations (a version check when there are none)
+    db_manager.init_db()
+    kwargs = dict(celery.conf.beat_schedule["archive-old-bugs"]["kwargs"])
+    for name in ("older_than_days", "batch_size", "max_duty_cycle", "max_seconds"):
+        if getattr(args, name) is not None:
+            kwargs[name] = getattr(args, name)
+    kwargs["max_seconds"] = kwargs["max_seconds"] or None
+    result = archive_bugs.run(**kwargs)
+    print(
+        f"Archived {result['archived']} bugs in {result['batches']} batches"
+        f" ({result['seconds']:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
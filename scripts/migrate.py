@@ -0,0 +1,37 @@
+"""
+Apply pending schema migrations to the configured database (DATABASE_TYPE
+and DB_* as for the app), or list them with --status. Run it as a deploy
+step before starting the web app and the Celery workers:
+
+    python scripts/migrate.py [--status]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import migrations  # noqa: E402
+from database import db_manager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--status", action="store_true", help="list pending migrations and exit"
+    )
+    args = parser.parse_args()
+
+    if args.status:
+        version = migrations.current_version(db_manager)
+        print(f"Schema at version {version} of {migrations.LATEST_VERSION}")
+        for migration in migrations.pending(db_manager):
+            print(f"  pending {migration.version}: {migration.name}")
+        return
+    db_manager.init_db()
+    print(f"Schema at version {migrations.current_version(db_manager)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Recompute the bug statistics (status counters and creation rollups) from the
+bugs table, e.g. after a backfill or rows changed by hand:
+
+    python scripts/rebuild_stats.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import stats  # noqa: E402
+from database import db_manager  # noqa: E402
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__.strip().splitlines()[0]).parse_args()
+    db_manager.init_db()
+    start = time.perf_counter()
+    stats.rebuild(db_manager)
+    counts = stats.status_counts(db_manager)
+    print(f"Rebuilt statistics in {time.perf_counter() - start:.2f}s")
+    for status, count in sorted(counts.items()):
+        print(f"  {status:<12} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Standalone notification outbox relay, for deployments without Celery beat.
+
+Polls the outbox every OUTBOX_RELAY_INTERVAL seconds and publishes pending
+rows as batch tasks on the configured broker:
+
+    python scripts/relay_outbox.py [--once]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from celery_app import celery, config, relay_outbox  # noqa: E402
+from database import db_manager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="drain once and exit")
+    args = parser.parse_args()
+
+    # Apply pending migrations (a version check when there are none)
+    db_manager.init_db()
+    interval = config["OUTBOX_RELAY_INTERVAL"]
+    kwargs = celery.conf.beat_schedule["relay-notification-outbox"]["kwargs"]
+    print(f"Outbox relay started (every {interval}s). Press Ctrl+C to stop.")
+    try:
+        while True:
+            try:
+                # Run the task body in-process; it publishes to the broker
+                result = relay_outbox.run(**kwargs)
+            except Exception as e:
+                print(f"Outbox relay run failed: {e}")
+            else:
+                if result["claimed"]:
+                    print(f"Published {result['published']} outbox rows")
+            if args.once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Outbox relay stopped.")
+
+
+if __name__ == "__main__":
+    main()
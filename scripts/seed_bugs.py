@@ -0,0 +1,50 @@
+"""
+Fill the configured database (DATABASE_TYPE, DB_*) with generated bugs for
+performance testing; the same --seed always produces the same rows:
+
+    python scripts/seed_bugs.py --count 1000000 [--seed 1] [--days 365]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database import db_manager  # noqa: E402
+from seeding import seed_bugs  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument(
+        "--keep-indexes",
+        action="store_true",
+        help="maintain the indexes row by row instead of rebuilding them",
+    )
+    args = parser.parse_args()
+
+    def progress(inserted, seconds):
+        rate = inserted / seconds if seconds else 0
+        print(f"  {inserted:>12,} rows  {rate:>10,.0f} rows/s", flush=True)
+
+    db_manager.init_db()
+    print(f"Seeding {args.count:,} bugs into {db_manager.db_type}...")
+    seed_bugs(
+        db_manager,
+        args.count,
+        seed=args.seed,
+        days=args.days,
+        chunk_size=args.chunk_size,
+        defer_indexes=not args.keep_indexes,
+        progress=progress,
+    )
+    print("Indexes and statistics rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,319 @@
-import requests
-import time
-import random
+"""
+Open-loop traffic generator with latency histograms.
+
+Requests are scheduled at a fixed target rate (--arrival constant) or as a
+Poisson process (--arrival poisson) whatever the server does, and handed to
+a pool of --concurrency workers, each keeping one keep-alive session. When
+the server slows down requests queue up instead of being sent later, as
+real users would keep arriving.
+
+Latency is measured from each request's scheduled time, not from when a
+worker got to send it. This is the coordinated-omission correction: a stall
+shows up as the latency every user scheduled during it would have seen,
+instead of as one slow request. The service time, measured from the actual
+send, is reported alongside. Percentiles come from HDR-style histograms,
+per interval while running and per endpoint at exit:
 
+    python scripts/simulate_traffic.py --rate 200 --duration 60 \\
+        --mix index=70,add=20,login=5,delete=5 --concurrency 64
+"""
+
+import argparse
+import itertools
+import json
 import os
+import queue
+import random
+import sys
+import threading
+import time
 
-URL = os.getenv("TARGET_URL", "http://localhost:5000/add")
-STATUSES = ["New", "In Progress", "Fixed", "Closed"]
+import requests
 
-print("🚀 Starting BugKiller Traffic Simulator...")
-print("Press Ctrl+C to stop.")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-try:
-    while True:
-        status = random.choice(STATUSES)
-        payload = {
-            "bug_title": f"Auto-generated Bug {random.randint(1000, 9999)}",
-            "description": "Triggered by SDET Traffic Simulator",
-            "bug_status": status
-        }
-        try:
-            # We use data=payload because Flask's request.form expects form-data
-            response = requests.post(URL, data=payload, allow_redirects=False)
-            if response.status_code == 302: # Flask redirect after success
-                print(f"✅ Bug created with status: {status}")
+from latency_histogram import LatencyHistogram  # noqa: E402
+
+STATUSES = ["New", "In Progress", "Resolved", "Closed"]
+PERCENTS = (50, 90, 99, 99.9)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.response = LatencyHistogram()  # from the scheduled time
+        self.service = LatencyHistogram()  # from the actual send
+        self.errors = 0
+
+
+class TrafficGenerator:
+    def __init__(self, args):
+        self.base = args.target.rstrip("/")
+        self.args = args
+        self.names, self.weights = parse_mix(args.mix)
+        self.rng = random.Random(args.seed)
+        self.jobs = queue.Queue()
+        self.stats = {name: EndpointStats() for name in self.names}
+        self.interval = LatencyHistogram()
+        self.interval_errors = 0
+        self.dropped = 0
+        self.delete_ids = []
+        self.titles = itertools.count()
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    # -- requests ------------------------------------------------------------
+
+    def login(self, session):
+        return session.post(
+            f"{self.base}/login",
+            data={"username": self.args.username, "password": self.args.password},
+            allow_redirects=False,
+            timeout=self.args.timeout,
+        )
+
+    def send(self, session, name, rng):
+        """Send one request; True when it succeeded."""
+        timeout = self.args.timeout
+        if name == "index":
+            response = session.get(f"{self.base}/", timeout=timeout)
+            return response.status_code == 200
+        if name == "add":
+            data = {
+                "bug_title": f"Simulated bug {next(self.titles)}",
+                "bug_status": rng.choice(STATUSES),
+            }
+            response = session.post(
+                f"{self.base}/add", data=data, allow_redirects=False, timeout=timeout
+            )
+            return response.status_code == 302
+        if name == "login":
+            return self.login(session).status_code == 302
+        if name == "delete":
+            with self.lock:
+                bug_id = self.delete_ids.pop() if self.delete_ids else None
+            if bug_id is None:
+                # Nothing left to delete: an unknown id still exercises the route
+                bug_id = 2**31 - 1
+            response = session.get(
+                f"{self.base}/delete/{bug_id}", allow_redirects=False, timeout=timeout
+            )
+            return response.status_code == 302
+        raise ValueError(name)
+
+    def prefetch_delete_ids(self, limit):
+        """Ids for /delete/<id>, newest last, from the export stream."""
+        with requests.get(
+            f"{self.base}/api/bugs/export", stream=True, timeout=self.args.timeout
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    self.delete_ids.append(json.loads(line)["id"])
+                if len(self.delete_ids) >= limit:
+                    break
+
+    # -- workers -------------------------------------------------------------
+
+    def worker(self, ready, rng):
+        session = requests.Session()
+        if "delete" in self.names:
+            self.login(session)
+        ready.wait()
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            scheduled, name = job
+            sent = time.monotonic()
+            try:
+                ok = self.send(session, name, rng)
+            except requests.RequestException:
+                ok = False
+            done = time.monotonic()
+            stats = self.stats[name]
+            stats.response.record((done - scheduled) * 1e6)
+            stats.service.record((done - sent) * 1e6)
+            self.interval.record((done - scheduled) * 1e6)
+            if not ok:
+                with self.lock:
+                    stats.errors += 1
+                    self.interval_errors += 1
+
+    def arrivals(self, start):
+        """Scheduled send times (monotonic) for the whole run."""
+        gap = 1 / self.args.rate
+        at = start
+        end = start + self.args.duration
+        while at < end:
+            yield at
+            if self.args.arrival == "poisson":
+                at += self.rng.expovariate(self.args.rate)
             else:
-                print(f"❌ Failed to create bug: {response.status_code}")
-        except Exception as e:
-            print(f"⚠️ Error: {e}")
-        
-        # Random sleep to simulate human/system activity
-        time.sleep(random.uniform(0.5, 2.0))
-except KeyboardInterrupt:
-    print("\n🛑 Simulator stopped.")
+                at += gap
+
+    def reporter(self, start):
+        while not self.stopping.wait(self.args.report_interval):
+            window = self.interval.reset()
+            with self.lock:
+                errors, self.interval_errors = self.interval_errors, 0
+            p = window.percentiles(PERCENTS)
+            print(
+                f"[{time.monotonic() - start:6.1f}s]"
+                f" {window.count / self.args.report_interval:8.1f} req/s"
+                + "".join(f"  p{k:g} {ms(v)}" for k, v in p.items())
+                + f"  max {ms(window.max)}  errors {errors}"
+                f"  backlog {self.jobs.qsize()}",
+                flush=True,
+            )
+
+    def run(self):
+        if "delete" in self.names:
+            self.prefetch_delete_ids(self.args.delete_pool)
+        # Sessions log in before the clock starts
+        ready = threading.Barrier(self.args.concurrency + 1)
+        # random.Random is not shared across threads: each worker gets its
+        # own, seeded from --seed through self.rng
+        workers = [
+            threading.Thread(
+                target=self.worker,
+                args=(ready, random.Random(self.rng.getrandbits(64))),
+                daemon=True,
+            )
+            for _ in range(self.args.concurrency)
+        ]
+        for thread in workers:
+            thread.start()
+        ready.wait()
+        start = time.monotonic()
+        threading.Thread(target=self.reporter, args=(start,), daemon=True).start()
+        try:
+            for scheduled in self.arrivals(start):
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                if self.jobs.qsize() >= self.args.max_backlog:
+                    # The generator itself cannot keep up; say so, don't hide it
+                    self.dropped += 1
+                    continue
+                name = self.rng.choices(self.names, self.weights)[0]
+                self.jobs.put((scheduled, name))
+        except KeyboardInterrupt:
+            print("\nStopping; waiting for requests in flight...")
+            while not self.jobs.empty():
+                try:
+                    self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+        for _ in workers:
+            self.jobs.put(None)
+        for thread in workers:
+            thread.join()
+        self.stopping.set()
+        return time.monotonic() - start
+
+    def summary(self, seconds):
+        endpoints = {}
+        for name, stats in self.stats.items():
+            endpoints[name] = {
+                "requests": stats.response.count,
+                "errors": stats.errors,
+                "response_us": {
+                    **{
+                        f"p{k:g}": v
+                        for k, v in stats.response.percentiles(PERCENTS).items()
+                    },
+                    "max": stats.response.max,
+                    "mean": stats.response.mean,
+                },
+                "service_us": {
+                    **{
+                        f"p{k:g}": v
+                        for k, v in stats.service.percentiles(PERCENTS).items()
+                    },
+                    "max": stats.service.max,
+                    "mean": stats.service.mean,
+                },
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        return {
+            "target": self.base,
+            "rate": self.args.rate,
+            "arrival": self.args.arrival,
+            "seconds": seconds,
+            "requests": total,
+            "throughput": total / seconds if seconds else 0.0,
+            "dropped": self.dropped,
+            "endpoints": endpoints,
+        }
+
+
+def ms(micros):
+    return f"{micros / 1000:7.1f}ms"
+
+
+def parse_mix(text):
+    names, weights = [], []
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ("index", "add", "login", "delete"):
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def print_summary(summary):
+    print(
+        f"\n{summary['requests']} requests in {summary['seconds']:.1f}s"
+        f" ({summary['throughput']:.1f} req/s, target {summary['rate']:g});"
+        f" {summary['dropped']} not sent (generator backlog full)"
+    )
+    print(
+        f"{'endpoint':<8} {'requests':>9} {'errors':>7}"
+        + "".join(f" {f'p{k:g}':>9}" for k in PERCENTS)
+        + f" {'max':>9}   service p50/p99"
+    )
+    for name, e in summary["endpoints"].items():
+        response, service = e["response_us"], e["service_us"]
+        print(
+            f"{name:<8} {e['requests']:>9} {e['errors']:>7}"
+            + "".join(f" {ms(response[f'p{k:g}'])}" for k in PERCENTS)
+            + f" {ms(response['max'])}"
+            f"   {ms(service['p50'])} / {ms(service['p99'])}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--target", default=os.getenv("TARGET_URL", "http://localhost:5000")
+    )
+    parser.add_argument("--rate", type=float, default=50, help="requests per second")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="poisson")
+    parser.add_argument("--mix", default="index=70,add=20,login=5,delete=5")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--max-backlog", type=int, default=100000)
+    parser.add_argument("--report-interval", type=float, default=5)
+    parser.add_argument("--delete-pool", type=int, default=10000)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json-out", help="write the final summary here as JSON")
+    args = parser.parse_args()
+
+    generator = TrafficGenerator(args)
+    print(
+        f"Sending {args.rate:g} req/s ({args.arrival}) to {args.target}"
+        f" for {args.duration:g}s; Ctrl+C stops early."
+    )
+    summary = generator.summary(generator.run())
+    print_summary(summary)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Full-text search over bug titles.
+
+SQLite uses an external-content FTS5 table, ``bugs_fts``, that triggers on
+``bugs`` keep in step inside the writing transaction. MySQL uses a FULLTEXT
+index on ``bugs.title``, which InnoDB maintains itself. Either way a search
+is an inverted-index lookup ranked by relevance (BM25 on SQLite, InnoDB's
+TF-IDF score on MySQL), never a ``LIKE '%term%'`` scan of the table.
+
+User input is reduced to word tokens before it reaches the engine, so the
+FTS5/boolean-mode query syntax cannot be injected: every term must match and
+the last one also matches as a prefix (search-as-you-type).
+"""
+
+import re
+
+from statements import BugRecord, statement
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+MAX_TERMS = 16
+
+# One ranked page. Pages are OFFSET-based: relevance order has no stable
+# keyset, and SEARCH_MAX_RESULTS bounds how deep a client can page.
+SEARCH_BUGS = statement(
+    "search_bugs",
+    "SELECT b.id, b.title, b.status, b.created_at FROM bugs_fts"
+    " JOIN bugs b ON b.id = bugs_fts.rowid WHERE bugs_fts MATCH ?"
+    " ORDER BY bugs_fts.rank, b.id DESC LIMIT ? OFFSET ?",
+    BugRecord,
+    mysql="SELECT id, title, status, created_at FROM bugs"
+    " WHERE MATCH(title) AGAINST (? IN BOOLEAN MODE)"
+    " ORDER BY MATCH(title) AGAINST (? IN BOOLEAN MODE) DESC, id DESC"
+    " LIMIT ? OFFSET ?",
+)
+
+
+def search_terms(text):
+    """The word tokens of ``text`` used for matching (at most MAX_TERMS)."""
+    return _TOKEN.findall(text or "")[:MAX_TERMS]
+
+
+def match_expression(terms, dialect):
+    """Engine query for ``terms``: all required, the last one as a prefix."""
+    if dialect == "mysql":
+        return " ".join(f"+{term}" for term in terms) + "*"
+    # FTS5 strings are quoted so words like AND/NEAR stay plain terms
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def create_search_index(db):
+    """
+    Create the full-text index for ``db``'s dialect if missing. A new FTS5
+    table is filled from the existing rows once. This is migration 4; apply
+    it with ``migrations.migrate`` rather than calling it directly, so
+    ``schema_version`` records it.
+    """
+    if db.db_type == "mysql":
+        db.create_index("idx_bugs_title_ft", "bugs", ("title",), fulltext=True)
+        return
+
+    if db.table_exists("bugs_fts"):
+        return
+
+    with db.transaction() as tx:
+        tx.execute(
+            "CREATE VIRTUAL TABLE bugs_fts USING fts5(title, content='bugs',"
+            " content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        # External-content tables are synced by hand; the triggers run in
+        # the same transaction as every insert, delete or retitle of a bug.
+        tx.execute(
+            "CREATE TRIGGER bugs_fts_insert AFTER INSERT ON bugs BEGIN"
+            " INSERT INTO bugs_fts (rowid, title) VALUES (new.id, new.title); END"
+        )
+        tx.execute(
+            "CREATE TRIGGER bugs_fts_delete AFTER DELETE ON bugs BEGIN"
+            " INSERT INTO bugs_fts (bugs_fts, rowid, title)"
+            " VALUES ('delete', old.id, old.title); END"
+        )
+        tx.execute(
+            "CREATE TRIGGER bugs_fts_update AFTER UPDATE OF title ON bugs BEGIN"
+            " INSERT INTO bugs_fts (bugs_fts, rowid, title)"
+            " VALUES ('delete', old.id, old.title);"
+            " INSERT INTO bugs_fts (rowid, title) VALUES (new.id, new.title); END"
+        )
+        tx.execute("INSERT INTO bugs_fts (bugs_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(db):
+    """
+    Drop the full-text index (and on SQLite its triggers), e.g. around a bulk
+    load; ``create_search_index`` rebuilds it from the table in one pass.
+    """
+    if db.db_type == "mysql":
+        db.drop_index("idx_bugs_title_ft", "bugs")
+        return
+    with db.transaction() as tx:
+        for trigger in ("bugs_fts_insert", "bugs_fts_delete", "bugs_fts_update"):
+            tx.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        tx.execute("DROP TABLE IF EXISTS bugs_fts")
+
+
+def search_bugs(db, text, page=1, per_page=20):
+    """
+    Return one ranked page of BugRecords matching ``text`` and whether a
+    further page exists. Text without any word tokens matches nothing.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return [], False
+    expression = match_expression(terms, db.db_type)
+    limit, offset = per_page + 1, (page - 1) * per_page
+    if db.db_type == "mysql":
+        params = (expression, expression, limit, offset)
+    else:
+        params = (expression, limit, offset)
+    rows = db.query(SEARCH_BUGS, params)
+    return rows[:per_page], len(rows) > per_page
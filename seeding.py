@@ -0,0 +1,172 @@
+"""
+Synthetic bug data at production scale, for performance testing.
+
+``generate_bugs`` yields ``(title, status, created_at)`` rows that are
+deterministic for a given seed. ``created_at`` rises with the id over
+``days`` days, with volume growing linearly (as in a live tracker), so the
+keyset indexes see the same id/time correlation as production. Titles are
+component, symptom and context phrases from about 10 to 255 characters,
+with a long tail. Status depends on age: recent bugs are mostly New or In
+Progress, old ones mostly Resolved or Closed.
+
+``seed_bugs`` writes them through ``DatabaseManager.insert_many``
+(``executemany``, which pymysql folds into multi-row INSERTs). With
+``defer_indexes`` the secondary and full-text indexes are dropped for the
+load and rebuilt once at the end, and the statistics are rebuilt from the
+table afterwards:
+
+    python scripts/seed_bugs.py --count 10000000 --seed 1
+"""
+
+import datetime
+import itertools
+import math
+import random
+import time
+
+import stats
+from migrations import BUG_INDEXES
+from search import create_search_index, drop_search_index
+from statements import statement
+
+SEED_BUG = statement(
+    "seed_bug", "INSERT INTO bugs (title, status, created_at) VALUES (?, ?, ?)"
+)
+
+COMPONENTS = [
+    "Login",
+    "Dashboard",
+    "Search",
+    "Export",
+    "Bulk import",
+    "Notifications",
+    "Slack digest",
+    "Email report",
+    "Pagination",
+    "Statistics",
+    "Archive",
+    "API",
+    "Settings",
+    "Profile page",
+]
+SYMPTOMS = [
+    "crashes",
+    "times out",
+    "returns 500",
+    "shows stale data",
+    "is slow",
+    "loses input",
+    "renders blank",
+    "double-submits",
+    "ignores filter",
+    "leaks memory",
+    "hangs",
+    "shows wrong count",
+]
+CONTEXTS = [
+    "on Safari",
+    "after logout",
+    "with a long title",
+    "under load",
+    "for archived bugs",
+    "when offline",
+    "on mobile",
+    "with unicode input",
+    "after a deploy",
+    "behind the proxy",
+    "with an expired session",
+    "on the second page",
+]
+DETAIL_WORDS = (
+    "steps to reproduce open the page click save wait reload observe error "
+    "expected actual intermittent regression since last release customer "
+    "reported affects admin users only see attached log trace id"
+).split()
+
+OPEN_STATUSES = ("New", "In Progress")
+DONE_STATUSES = ("Resolved", "Closed")
+
+
+def _title(rng):
+    title = f"{rng.choice(COMPONENTS)} {rng.choice(SYMPTOMS)}"
+    roll = rng.random()
+    if roll < 0.6:
+        title += f" {rng.choice(CONTEXTS)}"
+    if roll > 0.8:
+        # The long tail: a pasted description, cut at the column size
+        words = rng.choices(DETAIL_WORDS, k=int(rng.expovariate(1 / 12)) + 3)
+        title += ": " + " ".join(words)
+    return title[:255]
+
+
+def _status(rng, age_days):
+    # Half the bugs are done after about ten days; a few stay open for good
+    done = 0.95 * (1 - math.exp(-age_days / 14))
+    if rng.random() < done:
+        return DONE_STATUSES[rng.random() < 0.6]
+    return OPEN_STATUSES[rng.random() < 0.35]
+
+
+def generate_bugs(count, seed=0, days=365, now=None):
+    """Yield ``count`` deterministic ``(title, status, created_at)`` rows."""
+    rng = random.Random(seed)
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=datetime.timezone.utc)
+    span = days * 86400
+    start = int(now.timestamp()) - span
+    day_names = {}
+    for i in range(count):
+        # Linear growth: bug density is proportional to time, so the share
+        # created by time t grows as t^2
+        offset = int(span * math.sqrt((i + rng.random()) / count))
+        day, second = divmod(start + offset, 86400)
+        name = day_names.get(day)
+        if name is None:
+            name = day_names[day] = datetime.datetime.fromtimestamp(
+                day * 86400, datetime.timezone.utc
+            ).strftime("%Y-%m-%d")
+        created_at = (
+            f"{name} {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+        )
+        age_days = (span - offset) / 86400
+        yield _title(rng), _status(rng, age_days), created_at
+
+
+def seed_bugs(
+    db,
+    count,
+    seed=0,
+    days=365,
+    now=None,
+    chunk_size=10000,
+    defer_indexes=True,
+    progress=None,
+):
+    """
+    Insert ``count`` generated bugs, committing every ``chunk_size`` rows,
+    and rebuild the statistics. ``progress(inserted, seconds)`` is called
+    after each group of chunks. Returns the number of rows inserted.
+    """
+    rows = generate_bugs(count, seed=seed, days=days, now=now)
+    if defer_indexes:
+        drop_search_index(db)
+        for name in BUG_INDEXES:
+            db.drop_index(name, "bugs")
+    started = time.monotonic()
+    inserted = 0
+    try:
+        # insert_many returns every id; hand it bounded blocks instead
+        while block := list(itertools.islice(rows, chunk_size * 20)):
+            db.insert_many(SEED_BUG, block, chunk_size=chunk_size)
+            inserted += len(block)
+            if progress is not None:
+                progress(inserted, time.monotonic() - started)
+    finally:
+        if defer_indexes:
+            for name, columns in BUG_INDEXES.items():
+                db.create_index(name, "bugs", columns)
+            create_search_index(db)
+        stats.rebuild(db)
+    return inserted
@@ -0,0 +1,153 @@
+"""
+Named SQL statements, declared once and compiled per dialect on first use.
+
+Statements are written with ``?`` placeholders. ``Statement.sql_for`` turns
+them into the driver's paramstyle once per process instead of on every call,
+and statements with a ``record`` type return compact ``__slots__`` records
+built from plain tuple rows (no per-row dicts or ``sqlite3.Row`` objects).
+"""
+
+from pagination import keyset_page_sql
+
+
+class Record:
+    """Base class for compact row records; subclasses only declare __slots__."""
+
+    __slots__ = ()
+
+    def as_tuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class BugRecord(Record):
+    __slots__ = ("id", "title", "status", "created_at")
+
+    def __init__(self, id, title, status, created_at=None):
+        self.id = id
+        self.title = title
+        self.status = status
+        self.created_at = created_at
+
+
+class UserRecord(Record):
+    __slots__ = ("id", "username", "password")
+
+    def __init__(self, id, username, password=None):
+        self.id = id
+        self.username = username
+        self.password = password
+
+
+class Statement:
+    """A named statement with optional per-dialect SQL and a result record type."""
+
+    __slots__ = ("name", "sql", "record", "overrides", "_compiled")
+
+    def __init__(self, name, sql, record=None, **overrides):
+        self.name = name
+        self.sql = sql
+        self.record = record
+        self.overrides = overrides
+        self._compiled = {}
+
+    def sql_for(self, dialect):
+        compiled = self._compiled.get(dialect)
+        if compiled is None:
+            compiled = self.overrides.get(dialect, self.sql)
+            if dialect == "mysql":
+                compiled = compiled.replace("?", "%s")
+            self._compiled[dialect] = compiled
+        return compiled
+
+    def __repr__(self):
+        return f"Statement({self.name!r})"
+
+
+STATEMENTS = {}
+
+
+def statement(name, sql, record=None, **overrides):
+    """Declare and register a statement; names must be unique."""
+    if name in STATEMENTS:
+        raise ValueError(f"Duplicate statement name: {name}")
+    stmt = Statement(name, sql, record, **overrides)
+    STATEMENTS[name] = stmt
+    return stmt
+
+
+def compile_statements(dialect):
+    """Compile every registered statement for ``dialect`` (done at startup)."""
+    for stmt in STATEMENTS.values():
+        stmt.sql_for(dialect)
+
+
+# -- Bugs -------------------------------------------------------------------
+
+# Only the columns templates/index.html renders
+BUG_LIST_COLUMNS = "id, title, status, created_at"
+
+INSERT_BUG = statement("insert_bug", "INSERT INTO bugs (title, status) VALUES (?, ?)")
+DELETE_BUG = statement("delete_bug", "DELETE FROM bugs WHERE id = ?")
+BUG_BY_ID = statement(
+    "bug_by_id", f"SELECT {BUG_LIST_COLUMNS} FROM bugs WHERE id = ?", BugRecord
+)
+# Read-then-update of one bug; the MySQL lock serializes concurrent changes
+BUG_STATUS = statement(
+    "bug_status",
+    "SELECT status FROM bugs WHERE id = ?",
+    mysql="SELECT status FROM bugs WHERE id = ? FOR UPDATE",
+)
+UPDATE_BUG_STATUS = statement(
+    "update_bug_status", "UPDATE bugs SET status = ? WHERE id = ?"
+)
+
+BUG_PAGES = {
+    (by_status, after): statement(
+        "bug_page" + ("_by_status" if by_status else "") + ("_after" if after else ""),
+        keyset_page_sql(BUG_LIST_COLUMNS, "bugs", by_status, after),
+        BugRecord,
+    )
+    for by_status in (False, True)
+    for after in (False, True)
+}
+
+
+# Full-table export in primary-key order (streamed, see DatabaseManager.stream)
+EXPORT_BUGS = statement(
+    "export_bugs", f"SELECT {BUG_LIST_COLUMNS} FROM bugs ORDER BY id", BugRecord
+)
+EXPORT_BUGS_BY_STATUS = statement(
+    "export_bugs_by_status",
+    f"SELECT {BUG_LIST_COLUMNS} FROM bugs WHERE status = ? ORDER BY id",
+    BugRecord,
+)
+
+
+def bug_page_statement(status=None, cursor=None):
+    """The keyset page variant matching the given filter and cursor."""
+    return BUG_PAGES[(bool(status), bool(cursor))]
+
+
+# -- Users ------------------------------------------------------------------
+
+USER_BY_ID = statement(
+    "user_by_id", "SELECT id, username FROM users WHERE id = ?", UserRecord
+)
+USER_BY_USERNAME = statement(
+    "user_by_username",
+    "SELECT id, username, password FROM users WHERE username = ?",
+    UserRecord,
+)
+UPDATE_USER_PASSWORD = statement(
+    "update_user_password", "UPDATE users SET password = ? WHERE id = ?"
+)
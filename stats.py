@@ -0,0 +1,187 @@
+"""
+Incrementally maintained bug statistics.
+
+``bug_status_counts`` holds one counter row per status and
+``bug_created_rollups`` one row per hour and per day with the number of
+bugs created in it that were not deleted (archived bugs still count). Every
+write path adjusts them in the transaction that changes ``bugs``, so
+reading the dashboard cards costs one row per status and a trend one row per
+bucket, never a ``COUNT(*)`` over ``bugs``.
+``rebuild`` recomputes both from ``bugs`` and ``bugs_archive`` (after a
+backfill or manual SQL):
+
+    python scripts/rebuild_stats.py
+
+Buckets are ``created_at`` truncated to the hour/day, in the database's
+clock (UTC on SQLite), as ``YYYY-MM-DD HH:00:00`` strings.
+"""
+
+import collections
+import datetime
+
+from statements import statement
+
+PERIODS = ("hour", "day")
+
+STATUS_COUNTS = statement(
+    "stats_status_counts", "SELECT status, total FROM bug_status_counts"
+)
+ADD_STATUS_COUNT = statement(
+    "stats_add_status_count",
+    "INSERT INTO bug_status_counts (status, total) VALUES (?, ?)"
+    " ON CONFLICT (status) DO UPDATE SET total = total + excluded.total",
+    mysql="INSERT INTO bug_status_counts (status, total) VALUES (?, ?)"
+    " ON DUPLICATE KEY UPDATE total = total + VALUES(total)",
+)
+ADD_ROLLUP = statement(
+    "stats_add_rollup",
+    "INSERT INTO bug_created_rollups (period, bucket, total) VALUES (?, ?, ?)"
+    " ON CONFLICT (period, bucket) DO UPDATE SET total = total + excluded.total",
+    mysql="INSERT INTO bug_created_rollups (period, bucket, total) VALUES (?, ?, ?)"
+    " ON DUPLICATE KEY UPDATE total = total + VALUES(total)",
+)
+ROLLUPS_SINCE = statement(
+    "stats_rollups_since",
+    "SELECT bucket, total FROM bug_created_rollups"
+    " WHERE period = ? AND bucket >= ? AND total > 0 ORDER BY bucket",
+)
+
+# Rebuild: the same buckets computed by GROUP BY (MySQL needs %% because
+# parameterless statements still go through pymysql's % formatting)
+_HOUR_SQL = {
+    "sqlite": "substr(created_at, 1, 13) || ':00:00'",
+    "mysql": "DATE_FORMAT(created_at, '%%Y-%%m-%%d %%H:00:00')",
+}
+_DAY_SQL = {
+    "sqlite": "substr(created_at, 1, 10) || ' 00:00:00'",
+    "mysql": "DATE_FORMAT(created_at, '%%Y-%%m-%%d 00:00:00')",
+}
+# Archival moves rows but keeps them counted
+_ALL_BUGS = (
+    "(SELECT status, created_at FROM bugs"
+    " UNION ALL SELECT status, created_at FROM bugs_archive) all_bugs"
+)
+REBUILD_STATUS_COUNTS = statement(
+    "stats_rebuild_status_counts",
+    "INSERT INTO bug_status_counts (status, total)"
+    f" SELECT status, COUNT(*) FROM {_ALL_BUGS} GROUP BY status",
+)
+REBUILD_ROLLUPS = {
+    period: statement(
+        f"stats_rebuild_{period}_rollups",
+        "INSERT INTO bug_created_rollups (period, bucket, total)"
+        f" SELECT '{period}', {sql['sqlite']}, COUNT(*) FROM {_ALL_BUGS} GROUP BY 2",
+        mysql="INSERT INTO bug_created_rollups (period, bucket, total)"
+        f" SELECT '{period}', {sql['mysql']}, COUNT(*) FROM {_ALL_BUGS}"
+        " GROUP BY 2",
+    )
+    for period, sql in (("hour", _HOUR_SQL), ("day", _DAY_SQL))
+}
+
+
+def create_stats_tables(db):
+    """
+    Create the aggregate tables if missing, filling new ones from ``bugs``.
+    This is migration 6; apply it with ``migrations.migrate``.
+    """
+    if db.table_exists("bug_status_counts"):
+        return
+    db.execute_query(
+        """
+        CREATE TABLE IF NOT EXISTS bug_status_counts (
+            status VARCHAR(50) NOT NULL PRIMARY KEY,
+            total INT NOT NULL DEFAULT 0
+        )
+    """
+    )
+    db.execute_query(
+        """
+        CREATE TABLE IF NOT EXISTS bug_created_rollups (
+            period VARCHAR(4) NOT NULL,
+            bucket VARCHAR(19) NOT NULL,
+            total INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket)
+        )
+    """
+    )
+    rebuild(db)
+
+
+def buckets(created_at):
+    """``{period: bucket}`` for a ``created_at`` value (datetime or string)."""
+    text = str(created_at)[:19]
+    return {"hour": text[:13] + ":00:00", "day": text[:10] + " 00:00:00"}
+
+
+def _apply(tx, rows, sign):
+    by_status = collections.Counter()
+    by_bucket = collections.Counter()
+    for status, created_at in rows:
+        by_status[status] += 1
+        for period, bucket in buckets(created_at).items():
+            by_bucket[(period, bucket)] += 1
+    for status, total in by_status.items():
+        tx.execute(ADD_STATUS_COUNT, (status, sign * total))
+    for (period, bucket), total in by_bucket.items():
+        tx.execute(ADD_ROLLUP, (period, bucket, sign * total))
+
+
+def _status_and_created(tx, ids, lock=False):
+    placeholders = ", ".join("?" * len(ids))
+    query = f"SELECT status, created_at FROM bugs WHERE id IN ({placeholders})"
+    if lock and tx.db.db_type == "mysql":
+        # Two concurrent deletes of one bug must not both uncount it
+        query += " FOR UPDATE"
+    rows = tx.fetchall(query, tuple(ids))
+    return [(row["status"], row["created_at"]) for row in rows]
+
+
+def record_created(tx, ids):
+    """Count the bugs ``ids`` just inserted on ``tx``."""
+    if ids:
+        _apply(tx, _status_and_created(tx, ids), 1)
+
+
+def record_removed(tx, ids):
+    """Uncount the bugs ``ids``; call on ``tx`` before deleting them."""
+    if ids:
+        _apply(tx, _status_and_created(tx, ids, lock=True), -1)
+
+
+def record_status_change(tx, old_status, new_status):
+    """Move one bug between status counters."""
+    if old_status != new_status:
+        tx.execute(ADD_STATUS_COUNT, (old_status, -1))
+        tx.execute(ADD_STATUS_COUNT, (new_status, 1))
+
+
+def rebuild(db):
+    """Recompute every aggregate from all bugs in one transaction."""
+    with db.transaction() as tx:
+        tx.execute("DELETE FROM bug_status_counts")
+        tx.execute("DELETE FROM bug_created_rollups")
+        tx.execute(REBUILD_STATUS_COUNTS)
+        for stmt in REBUILD_ROLLUPS.values():
+            tx.execute(stmt)
+
+
+def status_counts(db):
+    """``{status: count}`` for every status with bugs."""
+    rows = db.query(STATUS_COUNTS)
+    return {row["status"]: row["total"] for row in rows if row["total"]}
+
+
+def created_trend(db, period="hour", since=None):
+    """
+    ``[(bucket, count), ...]`` of bugs created per ``period`` from ``since``
+    (a datetime or bucket string, default 7 days ago) on; empty buckets are
+    omitted.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    if since is None:
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            days=7
+        )
+    rows = db.query(ROLLUPS_SINCE, (period, buckets(since)[period]))
+    return [(row["bucket"], row["total"]) for row in rows]
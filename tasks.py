@@ -1,42 +1,252 @@
+import os
 import time
-import requests
 
-# We will use the celery instance from app.py to ensure shared configuration
-# To avoid circular imports, we don't import app here, but let app import tasks.
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_process_shutdown,
+)
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
 
+from db_metrics import LATENCY_BUCKETS
+
+from dispatcher import BugMailer
+from notifications import SlackClient, SlackDeliveryError, SlackDigest
+
+# The celery instance lives in celery_app.py, which registers these tasks;
+# this module does not import it, to avoid circular imports.
+
+SLACK_URL = "https://api.slack.com/messaging/send"
+
+TASK_SECONDS = Histogram(
+    "celery_task_seconds",
+    "Task run time by task and final state",
+    ["task", "state"],
+    buckets=LATENCY_BUCKETS + (10.0, 30.0, 60.0, 300.0),
+)
+TASK_QUEUE_SECONDS = Histogram(
+    "celery_task_queue_seconds",
+    "Time from publishing a task to a worker starting it",
+    ["task"],
+    buckets=LATENCY_BUCKETS + (10.0, 30.0, 60.0, 300.0),
+)
+_task_started = {}
+
+
+@before_task_publish.connect(weak=False)
+def stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+@task_prerun.connect(weak=False)
+def start_task_timer(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, "published_at", None)
+    if published_at is None:
+        published_at = (getattr(task.request, "headers", None) or {}).get(
+            "published_at"
+        )
+    if published_at is not None:
+        TASK_QUEUE_SECONDS.labels(task=task.name).observe(
+            max(0.0, time.time() - published_at)
+        )
+
+
+@task_postrun.connect(weak=False)
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_SECONDS.labels(task=task.name, state=state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
+
+
+def start_metrics_server(port, addr="0.0.0.0"):
+    """
+    Serve the worker's metrics (task durations and queue waits among them)
+    for Prometheus on ``port``. Prefork children each have their own
+    registry, so they must run with PROMETHEUS_MULTIPROC_DIR set (before
+    prometheus_client is imported): the server, started in the main worker
+    process, then aggregates every child's metrics from that directory.
+    Returns the server and its thread.
+    """
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return start_http_server(port, addr=addr, registry=registry)
+
+
+@worker_process_shutdown.connect(weak=False)
+def release_process_metrics(pid=None, **kwargs):
+    # Drops the exited child's live gauges; its counters stay aggregated
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def register_tasks(
+    celery_app,
+    slack=None,
+    dispatcher=None,
+    mailer=None,
+    on_archived=None,
+    slack_max_retries=5,
+):
+    """
+    Register the notification and maintenance tasks on ``celery_app``. ``slack`` is the
+    ``SlackDigest`` they deliver through (one per worker process). With a
+    ``NotificationDispatcher`` the email tasks send one report per bug
+    concurrently on its event loop instead of blocking per email (pass the
+    same dispatcher to ``make_slack_digest`` for the Slack webhook).
+    ``on_archived`` is called after an archival run moved any bugs. Slack
+    tasks whose message was not accepted are retried with exponential
+    backoff, up to ``slack_max_retries`` times, and then fail.
+    """
+    if slack is None:
+        slack = SlackDigest(SlackClient(SLACK_URL))
+    if mailer is None:
+        mailer = BugMailer()
+
+    def dispatch_emails(bugs):
+        results = dispatcher.run(mailer.deliveries(bugs))
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            print(f" [Background Task] {len(failed)} emails failed: {failed[0]!r}")
+        return len(results) - len(failed)
+
+    @worker_process_shutdown.connect(weak=False)
+    def flush_slack_digest(**kwargs):
+        slack.flush()
 
-def register_tasks(celery_app):
     @celery_app.task
     def send_bug_report_email(bug_title, bug_status):
         """
         Simulate sending an email report for a new bug.
         """
         print(f" [Background Task] Starting to send email for bug: {bug_title}")
+        if dispatcher is not None:
+            return dispatch_emails([[None, bug_title, bug_status]]) == 1
         # In testing mode (eager), this sleep will be noticeable,
         # but won't hang forever like a broken Redis connection.
         time.sleep(1)
         print(f" [Background Task] Email sent successfully for bug: {bug_title}")
         return True
 
-    @celery_app.task
+    slack_retries = {
+        "autoretry_for": (SlackDeliveryError,),
+        "retry_backoff": True,
+        "retry_backoff_max": 600,
+        "max_retries": slack_max_retries,
+    }
+
+    @celery_app.task(**slack_retries)
     def send_slack_notification(title, status):
         """
         Async task to send Slack notification.
         Replaces the blocking call in app.py.
         """
         print(f" [Background Task] sending slack for: {title}")
-        try:
-            # Real request heavily relying on network I/O
-            requests.post(
-                "https://api.slack.com/messaging/send",
-                json={"text": f"New Bug Reported: {title} (Status: {status})"},
-                timeout=2,
-            )  # Reasonable timeout for background task
+        slack.add([[None, title, status]])
+        return True
+
+    @celery_app.task
+    def send_bug_report_email_batch(bugs):
+        """
+        Simulate one summary email covering a batch of new bugs.
+        ``bugs`` is a list of [id, title, status].
+        """
+        if dispatcher is not None:
+            sent = dispatch_emails(bugs)
+            print(f" [Background Task] Sent {sent}/{len(bugs)} bug report emails")
+            return sent
+        print(f" [Background Task] Sending summary email for {len(bugs)} bugs")
+        time.sleep(1)
+        print(f" [Background Task] Summary email sent for {len(bugs)} bugs")
+        return len(bugs)
+
+    @celery_app.task(**slack_retries)
+    def send_slack_notification_batch(bugs):
+        """
+        Send a single Slack message listing a batch of new bugs.
+        ``bugs`` is a list of [id, title, status].
+        """
+        slack.add(bugs)
+        print(f" [Background Task] Slack summary queued for {len(bugs)} bugs")
+        return len(bugs)
+
+    @celery_app.task(ignore_result=True)
+    def relay_outbox(
+        batch_size=200,
+        lease=60,
+        max_bugs_per_task=500,
+        retention=3600,
+        max_attempts=10,
+    ):
+        """
+        Publish pending notification outbox rows as batch tasks (run by beat).
+        """
+        from database import db_manager
+        import outbox
+
+        publishers = {
+            "email": send_bug_report_email_batch.delay,
+            "slack": send_slack_notification_batch.delay,
+        }
+        result = outbox.drain(
+            db_manager, publishers, batch_size, lease, max_bugs_per_task, max_attempts
+        )
+        outbox.purge_published(db_manager, retention)
+        if result["claimed"]:
             print(
-                f" [Background Task] Slack notification sent (simulated) for: {title}"
+                f" [Background Task] Outbox relay published {result['published']}"
+                f" rows, {result['failed']} failed ({result['dead']} parked)"
             )
-        except Exception as e:
-            print(f" [Background Task] Failed to send Slack: {e}")
-        return True
+        return result
+
+    @celery_app.task(ignore_result=True)
+    def archive_bugs(
+        older_than_days=90,
+        statuses=("Resolved", "Closed"),
+        batch_size=500,
+        max_duty_cycle=0.2,
+        max_seconds=300,
+    ):
+        """
+        Move old bugs in terminal states to the archive table (run by beat).
+        """
+        from database import db_manager
+        import archive
+
+        result = archive.archive_old_bugs(
+            db_manager,
+            older_than_days,
+            statuses,
+            batch_size=batch_size,
+            max_duty_cycle=max_duty_cycle,
+            max_seconds=max_seconds,
+        )
+        if result["archived"]:
+            print(
+                f" [Background Task] Archived {result['archived']} bugs"
+                f" in {result['seconds']:.1f}s"
+            )
+            if on_archived is not None:
+                on_archived()
+        return result
 
-    return {"send_email": send_bug_report_email, "send_slack": send_slack_notification}
+    return {
+        "send_email": send_bug_report_email,
+        "send_slack": send_slack_notification,
+        "send_email_batch": send_bug_report_email_batch,
+        "send_slack_batch": send_slack_notification_batch,
+        "relay_outbox": relay_outbox,
+        "archive_bugs": archive_bugs,
+    }
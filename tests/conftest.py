@@ -6,6 +6,7 @@ except ImportError:
     pymysql = None
 import os
 import sys
+from unittest.mock import patch
 
 # Ensure project root is in sys.path for importing app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -19,6 +20,29 @@ DB_PASSWORD = os.environ.get("DB_PASSWORD", "root")
 DB_NAME = os.environ.get("DB_NAME", "bugkiller")
 
 
+@pytest.fixture
+def db_env():
+    """Environment for the ``db`` fixture; override it in a test module."""
+    return {}
+
+
+@pytest.fixture
+def db(tmp_path, db_env):
+    """
+    A ``DatabaseManager`` on a fresh temporary SQLite file with the schema
+    created, configured from ``db_env``; its writer and pools are closed after
+    the test.
+    """
+    from database import DatabaseManager
+
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite", **db_env}):
+        manager = DatabaseManager()
+    manager.sqlite_path = str(tmp_path / "test.db")
+    manager.init_db()
+    yield manager
+    manager.close()
+
+
 @pytest.fixture(scope="function")
 def db_conn():
     """
@@ -1,10 +1,12 @@
 import pytest
 import responses
 import os
+import uuid
 
 # Set testing environment variable BEFORE importing app
 os.environ['TESTING'] = 'True'
 from app import app
+from celery_app import relay_outbox
 
 @pytest.fixture
 def client():
@@ -61,7 +63,64 @@ def test_add_bug_with_mocked_notification(client):
     assert response.status_code == 200
     assert b"Mocked Notification Bug" in response.data
     
-    # 5. Verify the Slack notification was actually attempted
+    # 5. Notifications go through the outbox; run the relay as beat would
+    assert len(responses.calls) == 0
+    relay_outbox()
+
+    # 6. Verify the Slack notification was actually attempted
     # responses.calls tracks all intercepted requests
     assert len(responses.calls) == 1
     assert responses.calls[0].request.url == SLACK_URL
+
+def test_search_endpoints(client):
+    """Added bugs are found by /search and /api/search."""
+    # The app database outlives test runs; search for a word unique to this one
+    word = "flux" + uuid.uuid4().hex[:8]
+    login(client)
+    client.post("/add", data={"bug_title": f"Searchable {word} capacitor", "bug_status": "New"})
+
+    response = client.get(f"/api/search?q=capacitor {word[:-2]}")
+    assert response.status_code == 200
+    assert [r["title"] for r in response.json["results"]] == [f"Searchable {word} capacitor"]
+    assert response.json["next_page"] is None
+
+    response = client.get(f"/search?q={word}")
+    assert word.encode() in response.data
+    assert client.get(f"/api/search?q={word}&page=100000").status_code == 400
+
+def test_stats_follow_status_changes(client):
+    """Status changes move a bug between the counters /api/stats serves."""
+    login(client)
+    client.post("/add", data={"bug_title": "Counted bug", "bug_status": "New"})
+    before = client.get("/api/stats?period=day").json
+    assert before["created"] and before["counts"]["total"] >= 1
+    bug_id = client.get("/api/search?q=counted").json["results"][0]["id"]
+
+    response = client.post(f"/api/bugs/{bug_id}/status", json={"status": "Resolved"})
+    assert response.status_code == 200
+    after = client.get("/api/stats").json["counts"]
+    assert after["Resolved"] == before["counts"].get("Resolved", 0) + 1
+    assert after["total"] == before["counts"]["total"]
+    assert client.post("/api/bugs/0/status", json={"status": "New"}).status_code == 404
+    assert client.get("/api/stats?period=week").status_code == 400
+
+
+def test_archived_bugs_stay_readable(client):
+    """Archived bugs are served by /api/bugs/<id> and /api/bugs/archived."""
+    from database import db_manager
+    import archive
+
+    bug_id = db_manager.execute_write(
+        "INSERT INTO bugs (title, status, created_at) VALUES (?, ?, ?)",
+        ("Ancient closed bug", "Closed", "2001-01-01 00:00:00"),
+    )
+    assert client.get(f"/api/bugs/{bug_id}").json["archived"] is False
+
+    archive.archive_old_bugs(db_manager, 30, ["Closed"])
+
+    response = client.get(f"/api/bugs/{bug_id}")
+    assert response.json["archived"] is True
+    assert response.json["title"] == "Ancient closed bug"
+    listed = client.get(f"/api/bugs/archived?before={bug_id + 1}&limit=1").json
+    assert [bug["id"] for bug in listed["bugs"]] == [bug_id]
+    assert client.get("/api/bugs/0").status_code == 404
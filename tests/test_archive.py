@@ -0,0 +1,71 @@
+import archive
+import stats
+from statements import INSERT_BUG
+
+
+def add_bug(db, title, status, created_at):
+    return db.execute_write(
+        "INSERT INTO bugs (title, status, created_at) VALUES (?, ?, ?)",
+        (title, status, created_at),
+    )
+
+
+def live_ids(db):
+    return [row["id"] for row in db.execute_query("SELECT id FROM bugs ORDER BY id", fetch=True)]
+
+
+def test_only_old_bugs_in_terminal_states_move(db):
+    old_closed = add_bug(db, "old closed", "Closed", "2020-01-01 00:00:00")
+    old_new = add_bug(db, "old new", "New", "2020-01-01 00:00:00")
+    recent = db.execute_write(INSERT_BUG, ("recent", "Closed"))
+
+    result = archive.archive_old_bugs(db, 30, ["Resolved", "Closed"])
+
+    assert result["archived"] == 1
+    assert live_ids(db) == [old_new, recent]
+    bug = archive.archived_bug(db, old_closed)
+    assert (bug.title, bug.status) == ("old closed", "Closed")
+    assert archive.archived_bug(db, old_new) is None
+
+
+def test_runs_in_throttled_batches(db):
+    for i in range(7):
+        add_bug(db, f"bug {i}", "Resolved", "2020-01-01 00:00:00")
+    sleeps = []
+
+    result = archive.archive_old_bugs(
+        db, 30, ["Resolved"], batch_size=3, max_duty_cycle=0.25, sleep=sleeps.append
+    )
+
+    assert (result["archived"], result["batches"]) == (7, 3)
+    # Sleeps three times as long as each full batch held the writer
+    assert len(sleeps) == 2 and all(s > 0 for s in sleeps)
+    assert live_ids(db) == []
+
+
+def test_stop_after_max_seconds(db):
+    for i in range(4):
+        add_bug(db, f"bug {i}", "Resolved", "2020-01-01 00:00:00")
+    result = archive.archive_old_bugs(
+        db, 30, ["Resolved"], batch_size=1, max_seconds=0, sleep=lambda s: None
+    )
+    assert result["archived"] == 1
+    assert len(live_ids(db)) == 3
+
+
+def test_archived_pages_and_stats(db):
+    ids = [add_bug(db, f"bug {i}", "Closed", "2020-01-01 00:00:00") for i in range(5)]
+    archive.archive_old_bugs(db, 30, ["Closed"])
+
+    page, next_before = archive.archived_page(db, limit=2)
+    assert [bug.id for bug in page] == ids[:-3:-1]
+    page, next_before = archive.archived_page(db, next_before, limit=2)
+    assert [bug.id for bug in page] == [ids[2], ids[1]]
+    assert archive.archived_page(db, next_before, limit=2) == (
+        [archive.archived_bug(db, ids[0])],
+        None,
+    )
+
+    # Archived bugs stay counted
+    stats.rebuild(db)
+    assert stats.status_counts(db) == {"Closed": 5}
@@ -0,0 +1,80 @@
+import pytest
+import responses
+import os
+from unittest.mock import patch
+
+os.environ['TESTING'] = 'True'
+from app import app
+from celery_app import relay_outbox
+from database import db_manager
+
+SLACK_URL = "https://api.slack.com/messaging/send"
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+@responses.activate
+def test_bulk_insert_returns_ids_in_order(client):
+    """Bulk API inserts every bug, returns their ids and sends one Slack digest."""
+    responses.add(responses.POST, SLACK_URL, json={"status": "ok"}, status=200)
+    bugs = [{"title": f"Bulk bug {i}", "status": "New"} for i in range(7)]
+    app.config['BULK_INSERT_CHUNK_SIZE'] = 3  # force several transactions
+
+    try:
+        response = client.post("/api/bugs/bulk", json={"bugs": bugs})
+    finally:
+        app.config['BULK_INSERT_CHUNK_SIZE'] = 500
+
+    assert response.status_code == 201
+    ids = response.json["ids"]
+    assert response.json["count"] == 7 and len(set(ids)) == 7
+    for bug_id, bug in zip(ids, bugs):
+        row = db_manager.fetch_one("SELECT title FROM bugs WHERE id = ?", (bug_id,))
+        assert row["title"] == bug["title"]
+    relay_outbox()
+    assert len(responses.calls) == 1
+
+
+def test_bulk_insert_rejects_invalid_payload(client):
+    response = client.post(
+        "/api/bugs/bulk", json=[{"title": "ok"}, {"title": ""}, "nope"]
+    )
+    assert response.status_code == 400
+    assert [d["index"] for d in response.json["details"]] == [1, 2]
+
+
+def test_bulk_insert_requires_list(client):
+    assert client.post("/api/bugs/bulk", json={"title": "x"}).status_code == 400
+
+
+def test_failed_chunk_reports_committed_ids(client):
+    """Earlier chunks stay committed; the client learns where to resume."""
+    bugs = [{"title": f"Partial bug {i}", "status": "New"} for i in range(5)]
+    original = db_manager._executemany
+    calls = []
+
+    def fail_second_chunk(conn, query, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return original(conn, query, rows)
+
+    app.config['BULK_INSERT_CHUNK_SIZE'] = 2
+    try:
+        with patch.object(db_manager, "_executemany", fail_second_chunk):
+            response = client.post("/api/bugs/bulk", json=bugs)
+    finally:
+        app.config['BULK_INSERT_CHUNK_SIZE'] = 500
+
+    assert response.status_code == 207
+    assert response.json["failed_index"] == 2 and len(response.json["ids"]) == 2
+    for bug_id in response.json["ids"]:
+        assert db_manager.fetch_one("SELECT id FROM bugs WHERE id = ?", (bug_id,))
+    assert not db_manager.fetch_one(
+        "SELECT id FROM bugs WHERE title = ?", ("Partial bug 2",)
+    )
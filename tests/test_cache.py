@@ -0,0 +1,73 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from prometheus_client import REGISTRY
+from cache import LRUCache, VersionedCache, make_cache
+
+
+def metric(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache("test_lru", maxsize=2)
+    before = metric("cache_evictions_total", cache="test_lru", reason="capacity")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert metric("cache_evictions_total", cache="test_lru", reason="capacity") == before + 1
+
+
+def test_lru_entries_expire():
+    cache = LRUCache("test_ttl", ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_hits_and_misses_are_counted():
+    cache = LRUCache("test_counts")
+    cache.get("missing")
+    cache.set("present", 1)
+    cache.get("present")
+
+    assert metric("cache_misses_total", cache="test_counts") == 1
+    assert metric("cache_hits_total", cache="test_counts") == 1
+
+
+def test_versioned_cache_reads_through_and_invalidates():
+    cache = VersionedCache(LRUCache("test_versioned"), "bugs")
+    loader = MagicMock(side_effect=["first", "second"])
+
+    assert cache.get_or_load("page", loader) == "first"
+    assert cache.get_or_load("page", loader) == "first"
+    cache.invalidate()
+    assert cache.get_or_load("page", loader) == "second"
+    assert loader.call_count == 2
+
+
+def test_version_survives_lru_eviction():
+    """Evicting entries must not reset the version and resurrect stale pages."""
+    backend = LRUCache("test_version_evict", maxsize=1)
+    cache = VersionedCache(backend, "bugs")
+    cache.invalidate()
+    for i in range(5):
+        backend.set(f"filler{i}", i)
+    assert cache.version() == 1
+
+
+def test_null_cache_always_loads():
+    cache = VersionedCache(make_cache("test_null", backend="none"), "bugs")
+    loader = MagicMock(return_value="rows")
+    cache.get_or_load("page", loader)
+    cache.get_or_load("page", loader)
+    assert loader.call_count == 2
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        make_cache("test_bad", backend="memcached")
@@ -53,3 +53,49 @@ def test_fetch_one_logic(db_manager):
         # Case 2: No results
         mock_execute.return_value = []
         assert db_manager.fetch_one("SELECT...") is None
+
+def test_mysql_executemany_stays_under_max_stmt_length():
+    """Rows are batched so pymysql never splits a statement behind our back."""
+    with patch.dict(os.environ, {"DATABASE_TYPE": "mysql"}):
+        manager = DatabaseManager()
+    cursor = MagicMock()
+    cursor.max_stmt_length = 250
+    cursor.connection.encoding = "utf8"
+    cursor.mogrify.side_effect = lambda sql, row: sql % tuple(repr(v) for v in row)
+    cursor.lastrowid = 10
+
+    def executemany(sql, batch):
+        cursor.rowcount = len(batch)
+        cursor.lastrowid += 100  # each batch gets its own id range
+
+    cursor.executemany.side_effect = executemany
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    rows = [("é" * 20, "New")] * 10
+    ids = manager._executemany(conn, "INSERT INTO bugs (title, status) VALUES (?, ?)", rows)
+
+    batches = [call.args[1] for call in cursor.executemany.call_args_list]
+    assert len(batches) > 1 and sum(len(b) for b in batches) == 10
+    assert len(ids) == 10 and len(set(ids)) == 10
+
+@patch('pymysql.connect')
+def test_mysql_stream_uses_unbuffered_cursor(mock_connect):
+    """stream() reads MySQL rows through an SSCursor in fetchmany batches."""
+    import pymysql
+    from statements import EXPORT_BUGS
+
+    with patch.dict(os.environ, {"DATABASE_TYPE": "mysql"}):
+        manager = DatabaseManager()
+    conn = MagicMock()
+    mock_connect.return_value = conn
+    stream_cursor = MagicMock()
+    stream_cursor.fetchmany.side_effect = [[(1, "a", "New", None)], [(2, "b", "New", None)], []]
+    conn.cursor.side_effect = lambda cls=None: stream_cursor if cls else MagicMock()
+
+    rows = list(manager.stream(EXPORT_BUGS, batch_size=1))
+
+    assert [row.id for row in rows] == [1, 2]
+    assert conn.cursor.call_args.args[0] is pymysql.cursors.SSCursor
+    stream_cursor.fetchmany.assert_called_with(1)
+    conn.close.assert_called_once()
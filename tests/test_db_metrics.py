@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import urllib.request
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from db_metrics import PoolCollector
+from tasks import start_metrics_server
+from statements import USER_BY_ID
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_statement_phases_are_timed_by_name(db):
+    before = sample("db_statement_seconds_count", statement="user_by_id", phase="fetch")
+
+    db.query(USER_BY_ID, (1,))
+
+    after = sample("db_statement_seconds_count", statement="user_by_id", phase="fetch")
+    assert after == before + 1
+    assert sample("db_statement_seconds_count", statement="user_by_id", phase="execute")
+
+
+def test_adhoc_sql_shares_one_label(db):
+    before = sample("db_statement_seconds_count", statement="adhoc", phase="execute")
+
+    db.execute_query("SELECT 1", fetch=True)
+    db.execute_query("SELECT 2", fetch=True)
+
+    after = sample("db_statement_seconds_count", statement="adhoc", phase="execute")
+    assert after == before + 2
+
+
+def test_pool_checkouts_are_timed(db):
+    before = sample("db_pool_checkout_seconds_count", pool="main")
+
+    db.execute_query("SELECT 1", fetch=True)
+
+    assert sample("db_pool_checkout_seconds_count", pool="main") == before + 1
+
+
+def test_pool_collector_reports_pool_stats(db):
+    db.execute_query("SELECT 1", fetch=True)
+    families = {f.name: f for f in PoolCollector(db).collect()}
+
+    in_use = {
+        s.labels["state"]: s.value for s in families["db_pool_connections"].samples
+    }
+    assert in_use["in_use"] == 0
+    assert in_use["idle"] == db.pool_stats()["idle"]
+    events = {
+        s.labels["event"]: s.value
+        for s in families["db_pool_events"].samples
+        if s.name == "db_pool_events_total"
+    }
+    assert events["checkouts"] == db.pool_stats()["checkouts"]
+
+
+def test_metrics_can_be_disabled(tmp_path):
+    from database import DatabaseManager
+
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite", "DB_METRICS": "false"}):
+        db = DatabaseManager()
+    db.sqlite_path = str(tmp_path / "off.db")
+    db.init_db()
+    before = sample("db_statement_seconds_count", statement="user_by_id", phase="fetch")
+
+    db.query(USER_BY_ID, (1,))
+
+    after = sample("db_statement_seconds_count", statement="user_by_id", phase="fetch")
+    assert after == before
+    db.close()
+
+
+def test_celery_task_duration_is_observed():
+    from celery import Celery
+
+    import tasks  # noqa: F401  (connects the signal handlers)
+
+    celery_app = Celery("metrics-test")
+    celery_app.conf.task_always_eager = True
+
+    @celery_app.task(name="metrics_test.noop")
+    def noop():
+        return 1
+
+    labels = {"task": "metrics_test.noop", "state": "SUCCESS"}
+    before = sample("celery_task_seconds_count", **labels)
+    noop.delay()
+    assert sample("celery_task_seconds_count", **labels) == before + 1
+
+
+def test_worker_processes_metrics_are_served(tmp_path, monkeypatch):
+    # A "prefork child": runs a task with PROMETHEUS_MULTIPROC_DIR set
+    child = """
+from celery import Celery
+import tasks
+
+app = Celery("metrics-child")
+app.conf.task_always_eager = True
+
+@app.task(name="metrics_test.child")
+def child():
+    return 1
+
+child.delay()
+"""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", child], cwd=root, env=env, check=True)
+
+    # The main worker process serves the aggregate over HTTP
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    server, thread = start_metrics_server(0, addr="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+    assert (
+        'celery_task_seconds_count{state="SUCCESS",task="metrics_test.child"} 1.0'
+        in body
+    )
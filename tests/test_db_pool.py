@@ -0,0 +1,101 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from db_pool import ConnectionPool, PoolTimeout
+from database import DatabaseManager
+import os
+
+
+def make_pool(**kwargs):
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    return ConnectionPool(factory, **kwargs), factory
+
+
+def test_connections_are_reused():
+    """A released connection is handed out again instead of reconnecting."""
+    pool, factory = make_pool(max_size=2)
+
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert factory.call_count == 1
+
+
+def test_checkout_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, timeout=0.05)
+    pool.acquire()
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_released_connection():
+    pool, factory = make_pool(max_size=1, timeout=2)
+    conn = pool.acquire()
+    got = []
+
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    pool.release(conn)
+    waiter.join(timeout=2)
+
+    assert got == [conn]
+    assert factory.call_count == 1
+
+
+def test_failed_ping_replaces_connection():
+    ping = MagicMock(side_effect=Exception("gone away"))
+    pool, factory = make_pool(ping=ping)
+
+    stale = pool.acquire()
+    pool.release(stale)
+    fresh = pool.acquire()
+
+    assert fresh is not stale
+    stale.close.assert_called_once()
+    assert pool.stats()["ping_failures"] == 1
+
+
+def test_connection_past_max_lifetime_is_closed():
+    pool, factory = make_pool(max_lifetime=0)
+
+    conn = pool.acquire()
+    pool.release(conn)
+
+    conn.close.assert_called_once()
+    assert pool.stats()["size"] == 0
+
+
+def test_error_inside_context_rolls_back():
+    pool, _ = make_pool()
+
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            raise ValueError("boom")
+
+    conn.rollback.assert_called()
+    assert pool.stats()["idle"] == 1
+
+
+def test_warm_opens_min_size():
+    pool, factory = make_pool(min_size=3, max_size=5)
+    pool.warm()
+
+    stats = pool.stats()
+    assert factory.call_count == 3
+    assert stats["idle"] == 3 and stats["in_use"] == 0
+
+
+@patch("sqlite3.connect")
+def test_execute_query_uses_pool(mock_connect):
+    """Repeated queries through DatabaseManager share one sqlite connection."""
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite"}):
+        manager = DatabaseManager()
+    mock_connect.return_value = MagicMock(in_transaction=False)
+
+    manager.execute_query("SELECT 1", fetch=True)
+    manager.execute_query("SELECT 1", fetch=True)
+
+    mock_connect.assert_called_once()
+    assert manager.pool_stats()["checkouts"] == 2
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+
+import pytest
+
+from dispatcher import (
+    BugMailer,
+    DeliveryError,
+    NotificationDispatcher,
+    WebhookDelivery,
+)
+
+
+class FakeDelivery:
+    kind = "fake"
+
+    def __init__(self, destination, *trackers, delay=0.05):
+        self.destination = destination
+        self.trackers = trackers
+        self.delay = delay
+
+    async def __call__(self, pools, timeout=None):
+        for tracker in self.trackers:
+            tracker["now"] += 1
+            tracker["peak"] = max(tracker["peak"], tracker["now"])
+        try:
+            await asyncio.wait_for(asyncio.sleep(self.delay), timeout)
+        finally:
+            for tracker in self.trackers:
+                tracker["now"] -= 1
+        return self.destination
+
+
+def stop_loop(loop):
+    """Cancel the server's connection handlers, then stop its loop."""
+
+    async def cancel_all():
+        current = asyncio.current_task()
+        for task in asyncio.all_tasks():
+            if task is not current:
+                task.cancel()
+
+    asyncio.run_coroutine_threadsafe(cancel_all(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+@pytest.fixture
+def dispatcher():
+    d = NotificationDispatcher(max_in_flight=20, per_destination=5, timeout=1)
+    yield d
+    d.close()
+
+
+def test_deliveries_run_concurrently_within_limits(dispatcher):
+    overall = {"now": 0, "peak": 0}
+    per_host = {host: {"now": 0, "peak": 0} for host in "abcdef"}
+    deliveries = [
+        FakeDelivery(host, tracker, overall)
+        for host, tracker in per_host.items()
+        for _ in range(10)
+    ]
+    results = dispatcher.run(deliveries)
+
+    assert results == [d.destination for d in deliveries]
+    assert overall["peak"] == 20
+    assert max(t["peak"] for t in per_host.values()) == 5
+    assert dispatcher.stats()["delivered"] == 60
+
+
+def test_timeouts_are_returned_as_errors(dispatcher):
+    slow = FakeDelivery("slow", delay=5)
+    fast = FakeDelivery("fast", delay=0)
+    results = dispatcher.run([slow, fast])
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert results[1] == "fast"
+    assert dispatcher.stats()["failed"] == 1
+
+
+@pytest.fixture
+def smtp_server():
+    """Tiny SMTP server on its own loop; collects received messages."""
+    received = []
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def handle(reader, writer):
+        writer.write(b"220 test\r\n")
+        data = None
+        while line := await reader.readline():
+            if data is not None:
+                if line == b".\r\n":
+                    received.append(b"".join(data))
+                    data = None
+                    writer.write(b"250 OK\r\n")
+                else:
+                    data.append(line)
+                continue
+            if line.startswith(b"DATA"):
+                data = []
+                writer.write(b"354 go\r\n")
+            elif line.startswith(b"RCPT") and b"nobody" in line:
+                writer.write(b"550 No such user\r\n")
+            elif line.startswith(b"QUIT"):
+                writer.write(b"221 bye\r\n")
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def start():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return server.sockets[0].getsockname()[1]
+
+    port = asyncio.run_coroutine_threadsafe(start(), loop).result()
+    yield port, received
+    stop_loop(loop)
+
+
+def test_emails_are_sent_over_smtp(dispatcher, smtp_server):
+    port, received = smtp_server
+    mailer = BugMailer("127.0.0.1", port, recipients=["qa@example.com"])
+    results = dispatcher.run(mailer.deliveries([[1, ".dotted title", "New"]]))
+    assert results == [True]
+    assert b"Subject: [BugKiller] New bug: .dotted title" in received[0]
+    assert b"\r\nBug #1: .dotted title\r\n" in received[0]
+
+
+def test_unknown_bug_id_is_left_out_of_the_email(dispatcher, smtp_server):
+    port, received = smtp_server
+    mailer = BugMailer("127.0.0.1", port)
+    dispatcher.run(mailer.deliveries([[None, ".no id", "New"]]))
+    assert b"#None" not in received[0]
+    # The title now starts the body line, so it is dot-stuffed on the wire
+    assert b"\r\n..no id\r\nStatus: New" in received[0]
+
+
+def test_rejected_recipient_fails_the_delivery(dispatcher, smtp_server):
+    port, received = smtp_server
+    mailer = BugMailer("127.0.0.1", port, recipients=["nobody@example.com"])
+    [result] = dispatcher.run(mailer.deliveries([[1, "t", "New"]]))
+    assert isinstance(result, DeliveryError) and "550" in str(result)
+    assert received == []
+
+
+@pytest.fixture
+def http_server():
+    """Keep-alive HTTP server; ``responses`` scripts the raw replies."""
+    state = {"connections": 0, "requests": 0, "responses": []}
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def handle(reader, writer):
+        state["connections"] += 1
+        while True:
+            length = None
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            if length is None:
+                break
+            await reader.readexactly(length)
+            state["requests"] += 1
+            reply = (
+                state["responses"].pop(0)
+                if state["responses"]
+                else b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+            )
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+    async def start():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return server.sockets[0].getsockname()[1]
+
+    port = asyncio.run_coroutine_threadsafe(start(), loop).result()
+    yield f"http://127.0.0.1:{port}/hook", state
+    stop_loop(loop)
+
+
+def test_webhooks_reuse_keep_alive_connections(http_server):
+    url, state = http_server
+    d = NotificationDispatcher(max_in_flight=10, per_destination=2, timeout=2)
+    try:
+        results = d.run([WebhookDelivery(url, {"n": i}) for i in range(20)])
+    finally:
+        d.close()
+    assert results == [200] * 20
+    assert state["requests"] == 20
+    assert state["connections"] <= 2
+
+
+def test_webhook_handles_chunked_and_rate_limited_replies(dispatcher, http_server):
+    url, state = http_server
+    state["responses"] = [
+        b"HTTP/1.1 429 Too Many Requests\r\nRetry-After: 0\r\n"
+        b"Content-Length: 0\r\n\r\n",
+        b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b"2\r\nok\r\n0\r\n\r\n",
+    ]
+    assert dispatcher.run([WebhookDelivery(url, {"text": "hi"})]) == [200]
+    assert state["requests"] == 2
+
+
+def test_timeout_applies_to_each_attempt_not_the_back_off(http_server):
+    url, state = http_server
+    state["responses"] = [
+        b"HTTP/1.1 429 Too Many Requests\r\nRetry-After: 0.4\r\n"
+        b"Content-Length: 0\r\n\r\n",
+    ] * 2
+    d = NotificationDispatcher(timeout=0.5)
+    try:
+        # 0.8s of back-off in total, more than the timeout
+        assert d.run([WebhookDelivery(url, {"text": "hi"})]) == [200]
+    finally:
+        d.close()
+    assert state["requests"] == 3
+
+
+def test_malformed_reply_is_a_delivery_error(dispatcher, http_server):
+    url, state = http_server
+    state["responses"] = [b"\r\n"]
+    [result] = dispatcher.run([WebhookDelivery(url, {"text": "hi"})])
+    assert isinstance(result, DeliveryError)
+
+
+def test_webhook_error_status_fails_the_delivery(dispatcher, http_server):
+    url, state = http_server
+    state["responses"] = [b"HTTP/1.1 503 Unavailable\r\nContent-Length: 0\r\n\r\n"]
+    [result] = dispatcher.run([WebhookDelivery(url, {"text": "hi"})])
+    assert isinstance(result, DeliveryError) and "503" in str(result)
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+import os
+import tracemalloc
+
+import pytest
+
+os.environ["TESTING"] = "True"
+from app import app
+from database import db_manager
+from statements import EXPORT_BUGS, EXPORT_BUGS_BY_STATUS, INSERT_BUG, BugRecord
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(db_manager, "sqlite_path", db.sqlite_path)
+    monkeypatch.setattr(db_manager, "_pool", db.pool)
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_stream_yields_records_in_batches(db):
+    ids = db.insert_many(INSERT_BUG, [(f"bug {i}", "New") for i in range(25)])
+    rows = db.stream(EXPORT_BUGS, batch_size=10)
+    first = next(rows)
+    assert isinstance(first, BugRecord) and first.id == ids[0]
+    assert [row.id for row in rows] == ids[1:]
+
+    # Closing a half-read stream releases its connection
+    rows = db.stream(EXPORT_BUGS_BY_STATUS, ("New",), batch_size=10)
+    next(rows)
+    rows.close()
+
+
+def test_stream_memory_does_not_grow_with_the_table(db):
+    db.insert_many(INSERT_BUG, [(f"bug {i} " + "x" * 100, "New") for i in range(20000)])
+
+    def peak(consume):
+        tracemalloc.start()
+        consume()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    streamed = peak(lambda: sum(1 for _ in db.stream(EXPORT_BUGS, batch_size=500)))
+    materialised = peak(lambda: len(db.query(EXPORT_BUGS)))
+    assert streamed * 10 < materialised
+
+
+def test_export_endpoint_formats(client, db):
+    db.insert_many(INSERT_BUG, [("one, with comma", "New"), ("two", "Resolved")])
+
+    response = client.get("/api/bugs/export")
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [(r["title"], r["status"]) for r in rows] == [
+        ("one, with comma", "New"),
+        ("two", "Resolved"),
+    ]
+
+    response = client.get("/api/bugs/export?format=csv&status=Resolved")
+    assert "attachment" in response.headers["Content-Disposition"]
+    rows = list(csv.reader(io.StringIO(response.data.decode())))
+    assert rows[0] == ["id", "title", "status", "created_at"]
+    assert [row[1] for row in rows[1:]] == ["two"]
+
+    assert client.get("/api/bugs/export?format=xml").status_code == 400
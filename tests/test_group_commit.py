@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from resilience import DeadlineExceeded, pop_deadline, push_deadline
+
+
+@pytest.fixture
+def db_env():
+    return {"DB_GROUP_COMMIT": "true"}
+
+
+def test_concurrent_inserts_share_commits(db):
+    """Each caller gets its own lastrowid while commits are coalesced."""
+    db.group_commit_max_delay = 0.01
+    results = {}
+
+    def insert(i):
+        results[i] = db.execute_write(
+            "INSERT INTO bugs (title, status) VALUES (?, ?)", (f"gc {i}", "New")
+        )
+
+    threads = [threading.Thread(target=insert, args=(i,)) for i in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(results.values())) == 40
+    for i, bug_id in results.items():
+        row = db.fetch_one("SELECT title FROM bugs WHERE id = ?", (bug_id,))
+        assert row["title"] == f"gc {i}"
+    stats = db.writer.stats()
+    assert stats["items"] == 40
+    assert stats["batches"] < 40
+
+
+def test_failing_item_does_not_abort_its_group(db):
+    ok = db.writer.submit(
+        lambda tx: tx.execute("INSERT INTO bugs (title) VALUES (?)", ("kept",))
+    )
+    bad = db.writer.submit(
+        lambda tx: tx.execute("INSERT INTO bugs (title) VALUES (?)", (None,))
+    )
+
+    assert ok.result(timeout=5)
+    with pytest.raises(Exception):
+        bad.result(timeout=5)
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM bugs")["n"] == 1
+
+
+def test_multi_statement_unit_is_atomic(db):
+    def unit(tx):
+        tx.execute("INSERT INTO bugs (title) VALUES (?)", ("half done",))
+        raise RuntimeError("second statement failed")
+
+    with pytest.raises(RuntimeError):
+        db.writer.submit(unit).result(timeout=5)
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM bugs")["n"] == 0
+
+
+def test_connection_failure_fails_every_caller(db):
+    """Items never started still get the error, so retries and the breaker see it."""
+    db.retry_policy.max_attempts = 1
+    db.breaker.failure_threshold = 1
+    db.write_pool.close()
+    db.write_pool.factory = lambda: (_ for _ in ()).throw(ConnectionError("down"))
+
+    with pytest.raises(ConnectionError):
+        db.execute_write("INSERT INTO bugs (title) VALUES (?)", ("lost",))
+    assert db.breaker.state == "open"
+
+
+def test_timed_out_write_is_cancelled_not_committed(db):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(tx):
+        started.set()
+        release.wait(5)
+
+    blocker = db.writer.submit(slow)
+    started.wait(5)
+    db.group_commit_timeout = 0.2
+    try:
+        with pytest.raises(DeadlineExceeded):
+            db.execute_write("INSERT INTO bugs (title) VALUES (?)", ("too late",))
+    finally:
+        release.set()
+    blocker.result(timeout=5)
+    db.writer.submit(lambda tx: None).result(timeout=5)  # writer drained
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM bugs")["n"] == 0
+
+
+def test_started_write_does_not_outlive_the_budget(db):
+    started, release = threading.Event(), threading.Event()
+
+    def stalled(tx):
+        started.set()
+        release.wait(5)
+
+    token = push_deadline(0.3)
+    start = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded, match="may or may not"):
+            db.write(stalled)
+    finally:
+        pop_deadline(token)
+        release.set()
+    assert started.is_set()
+    assert time.monotonic() - start < 2
@@ -0,0 +1,90 @@
+import gzip
+import os
+from unittest.mock import patch
+
+import brotli
+import pytest
+
+os.environ['TESTING'] = 'True'
+from app import app, bug_list_cache
+from cache import NullCache, VersionedCache
+from database import db_manager
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app.config['TESTING'] = True
+    # Keep the version token from rolling over between two requests
+    monkeypatch.setattr(bug_list_cache.backend, "ttl", 3600)
+    with app.test_client() as client:
+        yield client
+
+
+def test_unchanged_dashboard_is_not_modified_without_touching_the_db(client):
+    first = client.get("/")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    with patch.object(db_manager, "execute_query", side_effect=AssertionError):
+        again = client.get("/", headers={"If-None-Match": etag})
+        since = client.get(
+            "/", headers={"If-Modified-Since": first.headers["Last-Modified"]}
+        )
+    assert again.status_code == 304 and again.data == b""
+    assert since.status_code == 304
+
+    # Another page of the same version is a different representation
+    assert client.get("/?status=New", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_writes_change_the_etag(client):
+    etag = client.get("/").headers["ETag"]
+    client.post("/add", data={"bug_title": "Fresh bug", "bug_status": "New"})
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert b"Fresh bug" in response.data
+
+
+def test_pending_flash_messages_are_rendered(client):
+    etag = client.get("/").headers["ETag"]
+    with client.session_transaction() as session:
+        session["_flashes"] = [("message", "Heads up")]
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and b"Heads up" in response.data
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)]
+)
+def test_large_responses_are_compressed(client, encoding, decompress):
+    plain = client.get("/")
+    response = client.get("/", headers={"Accept-Encoding": encoding})
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decompress(response.data) == plain.data
+    assert len(response.data) < len(plain.data) / 3
+
+    # The encoded representation has its own strong ETag, also accepted
+    etag = response.headers["ETag"]
+    assert etag == plain.headers["ETag"][:-1] + f'-{encoding}"'
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_small_responses_stay_uncompressed(client):
+    response = client.get("/health", headers={"Accept-Encoding": "gzip, br"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_backends_without_versions_disable_validation():
+    assert VersionedCache(NullCache("test_null"), "bugs").validator() is None
+
+
+def test_last_modified_moves_forward_for_every_version():
+    from http_cache import ConditionalGet
+
+    conditional = ConditionalGet()
+    first = conditional.last_modified("v1")
+    assert conditional.last_modified("v2") > first
+    assert conditional.last_modified("v1") == first
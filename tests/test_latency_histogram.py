@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from latency_histogram import LatencyHistogram
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == 500
+    assert histogram.percentile(99) == 990
+    assert histogram.percentile(100) == 1000
+    assert histogram.mean == pytest.approx(500.5)
+
+
+def test_large_values_keep_three_significant_digits():
+    rng = random.Random(1)
+    values = sorted(int(rng.lognormvariate(10, 2)) for _ in range(20000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for percent in (50, 90, 99, 99.9):
+        exact = values[round(len(values) * percent / 100) - 1]
+        assert histogram.percentile(percent) == pytest.approx(exact, rel=0.001)
+    assert histogram.max == values[-1]
+    assert histogram.min == values[0]
+
+
+def test_merge_and_reset():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(100, count=3)
+    b.record(5000)
+
+    a.merge(b)
+    assert a.count == 4
+    assert a.percentile(100) == 5000
+
+    snapshot = a.reset()
+    assert snapshot.count == 4 and snapshot.max == 5000
+    assert a.count == 0 and a.percentile(50) == 0
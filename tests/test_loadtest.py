@@ -0,0 +1,79 @@
+import csv
+
+import pytest
+
+from performance.loadtest import check_slos, diff_reports, read_stats
+from performance.scenarios import SCENARIOS
+
+HEADER = [
+    "Type",
+    "Name",
+    "Request Count",
+    "Failure Count",
+    "Requests/s",
+    "Max Response Time",
+    "50%",
+    "95%",
+    "99%",
+]
+
+
+def write_stats(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def test_read_stats_keys_endpoints_by_method(tmp_path):
+    path = tmp_path / "locust_stats.csv"
+    write_stats(
+        path,
+        [
+            ["GET", "/", 200, 2, 10.0, 300, 20, 90, 150],
+            ["POST", "/add", 0, 0, 0.0, 0, "N/A", "N/A", "N/A"],
+            ["", "Aggregated", 200, 2, 10.0, 300, 20, 90, 150],
+        ],
+    )
+    stats = read_stats(path)
+
+    assert stats["GET /"]["error_rate"] == 0.01
+    assert stats["GET /"]["p95"] == 90
+    assert stats["POST /add"]["p50"] is None
+    assert "Aggregated" in stats
+
+
+def test_slos_fail_when_exceeded_or_without_traffic():
+    endpoints = {
+        "GET /": {"requests": 100, "p95": 90, "error_rate": 0.02},
+        "POST /add": {"requests": 0, "p95": None, "error_rate": 0.0},
+    }
+    slos = {"GET /": {"p95": 100, "error_rate": 0.01}, "POST /add": {"p95": 500}}
+
+    results = {
+        (r["endpoint"], r["metric"]): r["passed"] for r in check_slos(slos, endpoints)
+    }
+
+    assert results == {
+        ("GET /", "p95"): True,
+        ("GET /", "error_rate"): False,
+        ("POST /add", "p95"): False,
+    }
+
+
+def test_diff_flags_latency_regressions():
+    old = {"endpoints": {"GET /": {"p50": 10, "p95": 100, "p99": 200, "rps": 50}}}
+    new = {"endpoints": {"GET /": {"p50": 10, "p95": 130, "p99": 210, "rps": 40}}}
+
+    rows, regressed = diff_reports(old, new, threshold=0.2)
+
+    assert regressed == ["GET / p95"]
+    changes = {metric: change for _, metric, _, _, change in rows}
+    assert changes["rps"] == pytest.approx(-0.2)
+
+
+def test_scenarios_are_well_formed():
+    for scenario in SCENARIOS.values():
+        assert scenario.duration > 0
+        assert all(len(stage) == 3 for stage in scenario.stages)
+        assert all(weight > 0 for weight in scenario.users.values())
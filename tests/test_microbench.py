@@ -0,0 +1,39 @@
+from performance.microbench import compare, confirm_regressions, measure, summarize
+
+
+def run(**medians):
+    return {name: {"median": median} for name, median in medians.items()}
+
+
+def test_regressions_beyond_threshold_fail():
+    baseline = {"benchmarks": run(fast=1.0, slow=1.0)}
+    rows, regressed = compare(baseline, run(fast=1.1, slow=1.5), 0.25)
+
+    assert regressed == ["slow"]
+    assert [row[0] for row in rows] == ["fast", "slow"]
+
+
+def test_only_regressions_that_reproduce_are_confirmed():
+    baseline = {"benchmarks": run(noisy=1.0, slow=1.0)}
+    reruns = {"noisy": iter([1.4, 1.05]), "slow": iter([1.5, 1.6])}
+
+    def remeasure(name):
+        return {"median": next(reruns[name])}
+
+    confirmed = confirm_regressions(baseline, ["noisy", "slow"], remeasure, 0.25, 2)
+    assert confirmed == ["slow"]
+
+
+def test_new_benchmarks_are_reported_not_gated():
+    rows, regressed = compare({"benchmarks": {}}, run(query=1.0), 0.25)
+    assert rows == [("query", None, 1.0, None)]
+    assert regressed == []
+
+
+def test_measure_runs_warmup_and_rounds():
+    calls = []
+    times, loops = measure(lambda: calls.append(1), min_time=0, rounds=3, warmup=2)
+
+    assert len(times) == 3
+    assert len(calls) == loops * 6  # calibration pass + 2 warmup + 3 rounds
+    assert summarize(times, loops)["rounds"] == 3
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+os.environ["TESTING"] = "True"
+import app as app_module
+import migrations
+from database import DatabaseManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_fresh_database_is_at_latest_version(db):
+    assert migrations.current_version(db) == migrations.LATEST_VERSION
+    assert migrations.is_current(db)
+    assert migrations.migrate(db) == []
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM users")["n"] == 1
+
+
+def test_unversioned_database_is_upgraded(tmp_path):
+    # The schema as created before migrations existed, with data
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE bugs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title VARCHAR(255) NOT NULL,
+            status VARCHAR(50) DEFAULT 'New',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL
+        );
+        INSERT INTO bugs (title, status) VALUES ('Old bug', 'New');
+        INSERT INTO users (username, password) VALUES ('alice', 'x');
+        """
+    )
+    conn.close()
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite"}):
+        db = DatabaseManager()
+    db.sqlite_path = path
+    try:
+        assert migrations.current_version(db) == 0
+        db.init_db()
+
+        assert migrations.is_current(db)
+        assert db.fetch_one("SELECT title FROM bugs")["title"] == "Old bug"
+        # Existing users are kept and no default admin is added
+        users = db.execute_query("SELECT username FROM users", fetch=True)
+        assert [row["username"] for row in users] == ["alice"]
+        assert db.table_exists("notification_outbox")
+    finally:
+        db.close()
+
+
+def test_importing_app_does_not_touch_the_database(tmp_path):
+    path = tmp_path / "untouched.db"
+    env = {
+        **os.environ,
+        "TESTING": "True",
+        "DATABASE_TYPE": "sqlite",
+        "DB_SQLITE_PATH": str(path),
+    }
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import app; import sys; assert 'celery' not in sys.modules",
+        ],
+        cwd=ROOT,
+        env=env,
+        check=True,
+    )
+    assert not path.exists()
+
+
+@pytest.fixture
+def empty_app_db(tmp_path, monkeypatch):
+    """Point the app at an empty database and forget its schema check."""
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite"}):
+        empty = DatabaseManager()
+    empty.sqlite_path = str(tmp_path / "empty.db")
+    monkeypatch.setattr(app_module.db_manager, "sqlite_path", empty.sqlite_path)
+    monkeypatch.setattr(app_module.db_manager, "_pool", empty.pool)
+    monkeypatch.setattr(app_module, "_schema_ready", False)
+    yield empty
+    empty.close()
+
+
+def test_first_request_migrates_when_allowed(empty_app_db, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, "DB_AUTO_MIGRATE", True)
+    client = app_module.app.test_client()
+
+    assert client.get("/api/stats").status_code == 200
+    assert migrations.is_current(empty_app_db)
+
+
+def test_first_request_refuses_an_outdated_schema(empty_app_db, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, "DB_AUTO_MIGRATE", False)
+    client = app_module.app.test_client()
+
+    # Health checks do not depend on the schema
+    assert client.get("/health").status_code == 200
+    with pytest.raises(RuntimeError, match="schema is behind"):
+        client.get("/api/stats")
+    assert not empty_app_db.table_exists("bugs")
@@ -0,0 +1,100 @@
+import time
+import pytest
+from prometheus_client import REGISTRY
+from statements import INSERT_BUG
+import outbox
+
+
+def add_bug(db, title, status="New"):
+    def work(tx):
+        bug_id = tx.execute(INSERT_BUG, (title, status))
+        outbox.enqueue_bug_notifications(tx, [[bug_id, title, status]])
+        return bug_id
+
+    return db.write(work)
+
+
+def pending(db):
+    return db.fetch_one(outbox.OUTBOX_PENDING_COUNT)["pending"]
+
+
+def test_outbox_rows_commit_and_roll_back_with_the_bug(db):
+    add_bug(db, "kept")
+    assert pending(db) == 2
+
+    def failing(tx):
+        bug_id = tx.execute(INSERT_BUG, ("lost", "New"))
+        outbox.enqueue_bug_notifications(tx, [[bug_id, "lost", "New"]])
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        db.write(failing)
+    assert pending(db) == 2
+
+
+def test_relay_merges_rows_into_batches(db):
+    ids = [add_bug(db, f"bug {i}") for i in range(5)]
+    sent = {"email": [], "slack": []}
+    publishers = {kind: sent[kind].append for kind in sent}
+
+    result = outbox.drain(db, publishers, batch_size=10, max_bugs_per_task=3)
+
+    assert result == {"claimed": 10, "published": 10, "failed": 0, "dead": 0}
+    for kind in sent:
+        assert [len(batch) for batch in sent[kind]] == [3, 2]
+        assert [bug[0] for batch in sent[kind] for bug in batch] == ids
+    assert pending(db) == 0
+    assert outbox.drain(db, publishers)["claimed"] == 0
+
+
+def test_failed_publish_is_retried(db):
+    add_bug(db, "flaky")
+
+    def broken(bugs):
+        raise ConnectionError("broker down")
+
+    sent = []
+    result = outbox.relay_once(db, {"email": sent.append, "slack": broken})
+    assert result == {"claimed": 2, "published": 1, "failed": 1, "dead": 0}
+    row = db.fetch_one(
+        "SELECT attempts, last_error FROM notification_outbox WHERE kind = 'slack'"
+    )
+    assert row["attempts"] == 1 and "broker down" in row["last_error"]
+
+    result = outbox.relay_once(db, {"slack": sent.append})
+    assert result["published"] == 1 and len(sent) == 2
+
+
+def test_rows_failing_max_attempts_times_are_parked(db):
+    add_bug(db, "undeliverable")
+
+    def broken(bugs):
+        raise ConnectionError("broker down")
+
+    publishers = {"email": lambda bugs: None, "slack": broken}
+    before = REGISTRY.get_sample_value("outbox_dead_total", {"kind": "slack"}) or 0
+    assert outbox.relay_once(db, publishers, max_attempts=2)["dead"] == 0
+    assert outbox.relay_once(db, publishers, max_attempts=2)["dead"] == 1
+
+    row = db.fetch_one(
+        "SELECT attempts, last_error, dead_at FROM notification_outbox"
+        " WHERE kind = 'slack'"
+    )
+    assert row["attempts"] == 2 and row["dead_at"] is not None
+    assert "broker down" in row["last_error"]
+    assert REGISTRY.get_sample_value("outbox_dead_total", {"kind": "slack"}) == (
+        before + 1
+    )
+    assert pending(db) == 0
+    assert outbox.relay_once(db, {"slack": lambda bugs: None}, lease=0)["claimed"] == 0
+
+
+def test_claimed_rows_are_skipped_until_the_lease_expires(db):
+    add_bug(db, "claimed elsewhere")
+    db.execute_query(
+        "UPDATE notification_outbox SET claim_token = 'other', claimed_at = ?",
+        (time.time(),),
+    )
+    publishers = {"email": lambda bugs: None, "slack": lambda bugs: None}
+    assert outbox.relay_once(db, publishers, lease=60)["claimed"] == 0
+    assert outbox.relay_once(db, publishers, lease=0)["claimed"] == 2
@@ -0,0 +1,62 @@
+import re
+import uuid
+import pytest
+import os
+
+os.environ['TESTING'] = 'True'
+from app import app
+from database import db_manager
+from pagination import encode_cursor, decode_cursor, keyset_page_query, InvalidCursor
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_cursor_round_trip():
+    token = encode_cursor("2024-01-02 03:04:05", 42)
+    assert decode_cursor(token) == ("2024-01-02 03:04:05", 42)
+
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_query_seeks_past_cursor():
+    query, params = keyset_page_query(
+        "id", "bugs", status="New", cursor=("2024-01-01 00:00:00", 7), limit=20
+    )
+    assert "status = ?" in query
+    assert "created_at <= ? AND (created_at < ? OR id < ?)" in query
+    assert query.endswith("ORDER BY created_at DESC, id DESC LIMIT ?")
+    assert params == ("New", "2024-01-01 00:00:00", "2024-01-01 00:00:00", 7, 21)
+
+
+def test_dashboard_pages_through_filtered_bugs(client):
+    """Following the 'Older' link walks every bug of a status exactly once."""
+    status = f"Paged-{uuid.uuid4().hex[:8]}"
+    titles = [f"Paged bug {i} {status}" for i in range(5)]
+    for title in titles:
+        db_manager.execute_query(
+            "INSERT INTO bugs (title, status) VALUES (?, ?)", (title, status)
+        )
+
+    seen = []
+    url = f"/?status={status}&limit=2"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        seen.extend(t for t in titles if t in html)
+        match = re.search(r'href="(/\?[^"]*after=[^"]+)"', html)
+        url = match.group(1).replace("&amp;", "&") if match else None
+
+    assert sorted(seen) == sorted(titles)
+
+
+def test_bad_cursor_returns_400(client):
+    assert client.get("/?after=garbage").status_code == 400
@@ -0,0 +1,101 @@
+import os
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+from werkzeug.security import generate_password_hash
+
+os.environ["TESTING"] = "True"
+import app as app_module
+import passwords
+from passwords import PasswordVerifier, VerifierBusy, check_and_rehash
+
+# Cheap hashes keep the tests fast; scrypt is the configured method
+OLD_HASH = generate_password_hash("secret", method="pbkdf2:sha256:1000")
+
+
+def pending_gauge():
+    return REGISTRY.get_sample_value("password_verify_pending")
+
+
+def test_check_and_rehash():
+    assert check_and_rehash(OLD_HASH, "wrong", "scrypt") == (False, None)
+
+    valid, new_hash = check_and_rehash(OLD_HASH, "secret", "scrypt")
+    assert valid and new_hash.startswith("scrypt:32768:8:1$")
+    assert check_and_rehash(new_hash, "secret", "scrypt") == (True, None)
+    assert check_and_rehash(OLD_HASH, "secret", "pbkdf2:sha256:1000") == (True, None)
+
+
+def test_pool_verifies_in_worker_processes():
+    verifier = PasswordVerifier(workers=1, method="pbkdf2:sha256:1000")
+    try:
+        assert verifier.verify(OLD_HASH, "secret") == (True, None)
+        assert verifier.verify(OLD_HASH, "wrong") == (False, None)
+    finally:
+        verifier.shutdown()
+    assert verifier.pending == 0
+    assert pending_gauge() == 0
+
+
+def test_checks_over_the_limit_are_rejected(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_check(stored, password, method):
+        started.set()
+        release.wait(5)
+        return True, None
+
+    monkeypatch.setattr(passwords, "check_and_rehash", slow_check)
+    verifier = PasswordVerifier(workers=0, max_pending=1)
+    thread = threading.Thread(target=verifier.verify, args=(OLD_HASH, "secret"))
+    thread.start()
+    started.wait(5)
+    try:
+        assert pending_gauge() == 1
+        with pytest.raises(VerifierBusy):
+            verifier.verify(OLD_HASH, "secret")
+    finally:
+        release.set()
+        thread.join()
+    assert verifier.pending == 0
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(app_module.db_manager, "sqlite_path", db.sqlite_path)
+    monkeypatch.setattr(app_module.db_manager, "_pool", db.pool)
+    app_module.app.config["TESTING"] = True
+    return app_module.app.test_client()
+
+
+def test_login_upgrades_outdated_hash(db, client, monkeypatch):
+    old_hash = generate_password_hash("admin123", method="pbkdf2:sha256:1000")
+    db.execute_query(
+        "UPDATE users SET password = ? WHERE username = 'admin'", (old_hash,)
+    )
+    invalidated = []
+    monkeypatch.setattr(app_module, "invalidate_user", invalidated.append)
+
+    response = client.post("/login", data={"username": "admin", "password": "admin123"})
+
+    assert response.status_code == 302
+    stored = db.fetch_one("SELECT id, password FROM users WHERE username = 'admin'")
+    assert stored["password"].startswith("scrypt:")
+    assert invalidated == [stored["id"]]
+
+    client.get("/logout")
+    client.post("/login", data={"username": "admin", "password": "admin123"})
+    assert len(invalidated) == 1
+
+
+def test_login_is_shed_when_the_pool_is_busy(client, monkeypatch):
+    def busy(stored, password):
+        raise VerifierBusy("busy")
+
+    monkeypatch.setattr(app_module.password_verifier, "verify", busy)
+
+    response = client.post("/login", data={"username": "admin", "password": "admin123"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
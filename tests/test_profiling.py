@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+os.environ["TESTING"] = "True"
+from app import app, request_profiler
+from database import db_manager
+from profiling import SamplingProfiler
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(db_manager, "sqlite_path", db.sqlite_path)
+    monkeypatch.setattr(db_manager, "_pool", db.pool)
+    request_profiler.profiler.reset()
+    with app.test_client() as client:
+        yield client
+    request_profiler.profiler.reset()
+    request_profiler.sample_rate = 0.0
+
+
+def login(client):
+    client.post("/login", data={"username": "admin", "password": "admin123"})
+
+
+def busy_loop(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def test_samples_are_collapsed_per_key():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start("busy")
+    busy_loop(0.1)
+    profiler.stop()
+
+    summary = profiler.summary()
+    assert summary["busy"]["requests"] == 1
+    assert summary["busy"]["samples"] > 0
+    lines = profiler.collapsed().splitlines()
+    assert all(line.startswith("busy;") for line in lines)
+    assert any("busy_loop (tests/test_profiling.py:" in line for line in lines)
+
+    speedscope = json.loads(profiler.speedscope("busy"))
+    (profile,) = speedscope["profiles"]
+    assert profile["name"] == "busy"
+    assert len(profile["samples"]) == len(profile["weights"])
+
+
+def test_only_registered_threads_are_sampled():
+    profiler = SamplingProfiler(interval=0.001)
+    other = threading.Thread(target=busy_loop, args=(0.1,))
+    other.start()
+    profiler.start("idle")
+    time.sleep(0.05)
+    profiler.stop()
+    other.join()
+
+    assert "busy_loop" not in profiler.collapsed()
+
+
+def test_profile_endpoints_are_hidden_from_non_admins(client):
+    assert client.get("/admin/profile").status_code == 404
+    assert client.get("/admin/profile/download").status_code == 404
+
+
+def test_admin_can_profile_a_request_by_header(client):
+    client.get("/health", headers={"X-Profile": "1"})
+    assert "health_check" not in request_profiler.profiler.summary()
+
+    login(client)
+    client.get("/health", headers={"X-Profile": "1"})
+
+    summary = client.get("/admin/profile").get_json()
+    assert summary["sample_rate"] == 0.0
+    assert summary["endpoints"]["health_check"]["requests"] == 1
+
+    response = client.get("/admin/profile/download?format=speedscope")
+    assert response.status_code == 200
+    assert "attachment" in response.headers["Content-Disposition"]
+    assert json.loads(response.data)["profiles"][0]["name"] == "health_check"
+
+
+def test_admin_sets_sample_rate(client):
+    login(client)
+    assert client.post("/admin/profile", json={"sample_rate": 2}).status_code == 400
+
+    assert client.post("/admin/profile", json={"sample_rate": 1}).status_code == 200
+    client.get("/health")
+
+    assert request_profiler.profiler.summary()["health_check"]["requests"] == 1
+    client.post("/admin/profile/reset")
+    assert request_profiler.profiler.summary() == {}
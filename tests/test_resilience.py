@@ -0,0 +1,110 @@
+import sqlite3
+import time
+import pytest
+import pymysql
+from unittest.mock import MagicMock, patch
+from prometheus_client import REGISTRY
+from database import DatabaseManager
+from resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    RetryPolicy,
+    deadline_scope,
+    is_retryable,
+)
+import os
+
+GONE_AWAY = pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+
+@pytest.fixture
+def db():
+    with patch.dict(os.environ, {"DATABASE_TYPE": "sqlite", "DB_RETRY_BASE_DELAY": "0.001"}):
+        return DatabaseManager()
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.5)
+    delays = [policy.backoff(attempt) for attempt in range(1, 10) for _ in range(20)]
+    assert all(0 <= d <= 0.5 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retryable_error_classes():
+    assert is_retryable(GONE_AWAY)
+    assert is_retryable(sqlite3.OperationalError("database is locked"))
+    assert not is_retryable(pymysql.err.IntegrityError(1062, "Duplicate entry"))
+    assert not is_retryable(sqlite3.OperationalError("no such table: nope"))
+    assert not is_retryable(CircuitOpenError())
+
+
+def test_breaker_opens_then_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # the single trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_transient_errors_are_retried(db):
+    before = REGISTRY.get_sample_value(
+        "db_retries_total", {"error": "OperationalError:2006"}
+    ) or 0
+    operation = MagicMock(side_effect=[GONE_AWAY, GONE_AWAY, "ok"])
+
+    assert db._with_retries(operation) == "ok"
+    assert operation.call_count == 3
+    assert REGISTRY.get_sample_value(
+        "db_retries_total", {"error": "OperationalError:2006"}
+    ) == before + 2
+
+
+def test_non_retryable_errors_fail_immediately(db):
+    operation = MagicMock(side_effect=pymysql.err.IntegrityError(1062, "dup"))
+    with pytest.raises(pymysql.err.IntegrityError):
+        db._with_retries(operation)
+    assert operation.call_count == 1
+
+
+def test_retries_stop_at_the_deadline(db):
+    db.retry_policy = RetryPolicy(max_attempts=None, base_delay=0.01, max_delay=0.01)
+    operation = MagicMock(side_effect=GONE_AWAY)
+    db.breaker.failure_threshold = 1000
+
+    start = time.monotonic()
+    with deadline_scope(0.1):
+        with pytest.raises((pymysql.err.OperationalError, DeadlineExceeded)):
+            db._with_retries(operation)
+    assert time.monotonic() - start < 0.5
+
+
+def test_open_breaker_fails_fast(db):
+    db.breaker.failure_threshold = 1
+    with pytest.raises(pymysql.err.OperationalError):
+        db._with_retries(MagicMock(side_effect=GONE_AWAY))
+
+    operation = MagicMock()
+    with pytest.raises(CircuitOpenError):
+        db._with_retries(operation)
+    operation.assert_not_called()
+
+
+def test_health_reports_degraded_when_breaker_open():
+    os.environ['TESTING'] = 'True'
+    from app import app, db_manager
+
+    with patch.object(type(db_manager.breaker), "state", "open"):
+        response = app.test_client().get("/health")
+    assert response.status_code == 200
+    assert response.json == {"status": "degraded", "database": "open"}
@@ -0,0 +1,63 @@
+from statements import DELETE_BUG, INSERT_BUG
+from search import create_search_index, match_expression, search_bugs, search_terms
+
+
+def titles(rows):
+    return [row.title for row in rows]
+
+
+def test_search_matches_every_term_and_prefixes_the_last(db):
+    db.insert_many(
+        INSERT_BUG,
+        [
+            ("Login page crashes on submit", "New"),
+            ("Crash when exporting reports", "New"),
+            ("Login button misaligned", "Resolved"),
+        ],
+    )
+    assert titles(search_bugs(db, "login crash")[0]) == ["Login page crashes on submit"]
+    assert sorted(titles(search_bugs(db, "LOGIN")[0])) == [
+        "Login button misaligned",
+        "Login page crashes on submit",
+    ]
+    assert search_bugs(db, "nothing here")[0] == []
+
+
+def test_index_follows_inserts_and_deletes(db):
+    bug_id = db.execute_write(INSERT_BUG, ("Memory leak in worker", "New"))
+    assert titles(search_bugs(db, "leak")[0]) == ["Memory leak in worker"]
+
+    db.execute_write(DELETE_BUG, (bug_id,))
+    assert search_bugs(db, "leak")[0] == []
+
+
+def test_results_are_ranked_and_paginated(db):
+    db.insert_many(
+        INSERT_BUG,
+        [("timeout " + "padding words " * 20, "New")]
+        + [(f"timeout timeout bug {i}", "New") for i in range(4)],
+    )
+    first, has_next = search_bugs(db, "timeout", page=1, per_page=3)
+    assert has_next
+    assert all(row.title.startswith("timeout timeout") for row in first)
+    second, has_next = search_bugs(db, "timeout", page=2, per_page=3)
+    assert not has_next
+    assert len(second) == 2 and second[-1].title.startswith("timeout padding")
+
+
+def test_query_syntax_cannot_be_injected(db):
+    db.execute_write(INSERT_BUG, ("NEAR miss AND OR", "New"))
+    assert search_terms('"a" OR b* -c NEAR(') == ["a", "OR", "b", "c", "NEAR"]
+    assert titles(search_bugs(db, 'near "miss')[0]) == ["NEAR miss AND OR"]
+    assert search_bugs(db, '"*()') == ([], False)
+    assert match_expression(["a", "b"], "mysql") == "+a +b*"
+
+
+def test_index_is_built_from_existing_rows(db):
+    db.execute_write(INSERT_BUG, ("Stale cache entry", "New"))
+    db.execute_write("DROP TABLE bugs_fts")
+    for trigger in ("insert", "delete", "update"):
+        db.execute_write(f"DROP TRIGGER bugs_fts_{trigger}")
+
+    create_search_index(db)
+    assert titles(search_bugs(db, "stale")[0]) == ["Stale cache entry"]
@@ -0,0 +1,46 @@
+import datetime
+
+from seeding import generate_bugs, seed_bugs
+import stats
+
+NOW = datetime.datetime(2026, 1, 1)
+
+
+def test_generation_is_deterministic():
+    first = list(generate_bugs(100, seed=7, now=NOW))
+    assert first == list(generate_bugs(100, seed=7, now=NOW))
+    assert first != list(generate_bugs(100, seed=8, now=NOW))
+
+
+def test_rows_are_realistic():
+    rows = list(generate_bugs(5000, seed=1, days=365, now=NOW))
+
+    created = [created_at for _, _, created_at in rows]
+    assert created == sorted(created)
+    assert "2025-01-01" <= created[0] and created[-1] <= "2026-01-01 00:00:00"
+    assert all(0 < len(title) <= 255 for title, _, _ in rows)
+    # Old bugs are mostly done, the newest mostly open
+    done = {"Resolved", "Closed"}
+    assert sum(s in done for _, s, _ in rows[:500]) > 400
+    assert sum(s in done for _, s, _ in rows[-50:]) < 20
+
+
+def test_seed_bugs_rebuilds_indexes_and_stats(db):
+    assert seed_bugs(db, 2500, seed=3, chunk_size=1000) == 2500
+
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM bugs")["n"] == 2500
+    assert sum(stats.status_counts(db).values()) == 2500
+    indexes = {
+        row["name"]
+        for row in db.execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'index'", fetch=True
+        )
+    }
+    assert {"idx_bugs_created_id", "idx_bugs_status_created_id"} <= indexes
+    hits = db.fetch_one(
+        "SELECT COUNT(*) AS n FROM bugs_fts WHERE bugs_fts MATCH 'login'"
+    )
+    assert hits["n"] > 0
+    # The FTS triggers are back: new bugs are searchable again
+    db.execute_query("INSERT INTO bugs (title) VALUES ('zyxwv unique')")
+    assert db.fetch_one("SELECT rowid FROM bugs_fts WHERE bugs_fts MATCH 'zyxwv'")
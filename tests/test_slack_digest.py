@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from notifications import SlackClient, SlackDeliveryError, SlackDigest, format_digest
+from resilience import RetryPolicy
+
+
+class SlackStandIn(BaseHTTPRequestHandler):
+    """Local stand-in for the Slack webhook: keep-alive, scripted statuses."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.messages.append(body["text"])
+        server.connections.add(self.client_address)
+        status = server.statuses.pop(0) if server.statuses else 200
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slack_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlackStandIn)
+    server.messages, server.connections, server.statuses = [], set(), []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, **kwargs):
+    url = f"http://127.0.0.1:{server.server_address[1]}/hook"
+    return SlackClient(url, retry_policy=RetryPolicy(base_delay=0.001), **kwargs)
+
+
+def test_messages_reuse_one_connection(slack_server):
+    client = make_client(slack_server)
+    for i in range(5):
+        assert client.post(f"message {i}")
+    assert len(slack_server.messages) == 5
+    assert len(slack_server.connections) == 1
+
+
+def test_rate_limited_post_is_retried(slack_server):
+    slack_server.statuses = [429, 429, 200]
+    assert make_client(slack_server).post("eventually")
+    assert slack_server.messages == ["eventually"] * 3
+
+
+def test_client_error_is_not_retried(slack_server):
+    slack_server.statuses = [400]
+    assert not make_client(slack_server).post("bad")
+    assert len(slack_server.messages) == 1
+
+
+def test_digest_window_coalesces_bugs(slack_server):
+    digest = SlackDigest(make_client(slack_server), window=0.2, max_bugs=100)
+    for i in range(30):
+        digest.add([[i, f"bug {i}", "New"]])
+    deadline = time.monotonic() + 5
+    while not slack_server.messages and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(slack_server.messages) == 1
+    assert slack_server.messages[0].startswith("30 new bugs reported:")
+
+
+def test_digest_flushes_when_full(slack_server):
+    digest = SlackDigest(make_client(slack_server), window=60, max_bugs=10)
+    digest.add([[i, f"bug {i}", "New"] for i in range(5)])
+    assert slack_server.messages == []
+    digest.add([[i, f"bug {i}", "New"] for i in range(5, 25)])
+    # A full buffer is sent at once, split into messages of max_bugs
+    assert [m.splitlines()[0] for m in slack_server.messages] == [
+        "10 new bugs reported:",
+        "10 new bugs reported:",
+        "5 new bugs reported:",
+    ]
+
+
+def test_format_digest_truncates():
+    text = format_digest([[i, "t", "New"] for i in range(5)], max_lines=2)
+    assert text.splitlines()[-1] == "...and 3 more"
+    assert format_digest([[1, "only", "New"]]) == "New Bug Reported: only (Status: New)"
+
+
+def test_undelivered_message_raises_for_the_task_to_retry(slack_server):
+    slack_server.statuses = [500, 500]
+    digest = SlackDigest(make_client(slack_server, max_attempts=2))
+    with pytest.raises(SlackDeliveryError):
+        digest.add([[1, "lost?", "New"]])
+
+
+def test_slack_task_is_retried_until_delivered():
+    from celery import Celery
+
+    from tasks import register_tasks
+
+    class FlakySlack:
+        def __init__(self):
+            self.calls = 0
+
+        def add(self, bugs):
+            self.calls += 1
+            if self.calls < 3:
+                raise SlackDeliveryError("down")
+            return len(bugs)
+
+    celery_app = Celery("slack-retry-test")
+    celery_app.conf.task_always_eager = True
+    slack = FlakySlack()
+    tasks = register_tasks(celery_app, slack=slack, slack_max_retries=5)
+
+    result = tasks["send_slack_batch"].delay([[1, "bug", "New"]])
+
+    assert result.successful() and result.get() == 1
+    assert slack.calls == 3
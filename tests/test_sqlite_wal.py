@@ -0,0 +1,45 @@
+import sqlite3
+import pytest
+
+
+@pytest.fixture
+def db_env():
+    return {"DB_SQLITE_MODE": "wal"}
+
+
+def test_wal_journal_enabled(db):
+    row = db.fetch_one("PRAGMA journal_mode")
+    assert row[0] == "wal"
+
+
+def test_reads_use_read_only_connections(db):
+    with db.pool.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO bugs (title) VALUES ('nope')")
+
+
+def test_reads_do_not_wait_for_open_write_transaction(db):
+    """A reader sees the last committed state while a write is in flight."""
+    db.execute_query("INSERT INTO bugs (title) VALUES (?)", ("committed",))
+
+    writer = db.write_pool.acquire()
+    try:
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("INSERT INTO bugs (title) VALUES ('in flight')")
+
+        rows = db.execute_query("SELECT title FROM bugs", fetch=True)
+        assert [r["title"] for r in rows] == ["committed"]
+
+        writer.commit()
+    finally:
+        db.write_pool.release(writer)
+
+    rows = db.execute_query("SELECT title FROM bugs ORDER BY id", fetch=True)
+    assert [r["title"] for r in rows] == ["committed", "in flight"]
+
+
+def test_writes_are_serialized_through_one_connection(db):
+    for i in range(3):
+        db.execute_write("INSERT INTO bugs (title) VALUES (?)", (f"bug {i}",))
+
+    assert db.pool_stats()["writer"]["created"] == 1
@@ -0,0 +1,49 @@
+import pytest
+from statements import (
+    BugRecord,
+    INSERT_BUG,
+    USER_BY_USERNAME,
+    Statement,
+    statement,
+    bug_page_statement,
+)
+
+
+def test_statement_compiled_once_per_dialect():
+    stmt = Statement("test_compile", "SELECT id FROM bugs WHERE id = ? AND status = ?")
+    assert stmt.sql_for("mysql") == "SELECT id FROM bugs WHERE id = %s AND status = %s"
+    assert stmt.sql_for("mysql") is stmt.sql_for("mysql")
+    assert stmt.sql_for("sqlite") == stmt.sql
+
+
+def test_dialect_override():
+    stmt = Statement("test_override", "SELECT 1", mysql="SELECT 2 FROM DUAL")
+    assert stmt.sql_for("mysql") == "SELECT 2 FROM DUAL"
+    assert stmt.sql_for("sqlite") == "SELECT 1"
+
+
+def test_duplicate_statement_name_rejected():
+    with pytest.raises(ValueError):
+        statement("insert_bug", "INSERT INTO bugs (title) VALUES (?)")
+
+
+def test_records_are_compact():
+    bug = BugRecord(1, "Crash", "New", "2024-01-01 00:00:00")
+    assert not hasattr(bug, "__dict__")
+    assert bug.as_dict() == {
+        "id": 1,
+        "title": "Crash",
+        "status": "New",
+        "created_at": "2024-01-01 00:00:00",
+    }
+
+
+def test_query_returns_records(db):
+    bug_id = db.execute_write(INSERT_BUG, ("Record bug", "New"))
+
+    rows = db.query(bug_page_statement(), (10,))
+    assert [(r.id, r.title, r.status) for r in rows] == [(bug_id, "Record bug", "New")]
+    assert isinstance(rows[0], BugRecord)
+
+    admin = db.query_one(USER_BY_USERNAME, ("admin",))
+    assert admin.username == "admin" and admin.password
@@ -0,0 +1,84 @@
+import stats
+from statements import BUG_STATUS, INSERT_BUG, UPDATE_BUG_STATUS
+
+
+def add_bugs(db, rows):
+    return db.insert_many(
+        INSERT_BUG, rows, on_chunk=lambda tx, chunk, ids: stats.record_created(tx, ids)
+    )
+
+
+def remove_bug(db, bug_id):
+    def work(tx):
+        stats.record_removed(tx, [bug_id])
+        tx.execute("DELETE FROM bugs WHERE id = ?", (bug_id,))
+
+    db.write(work)
+
+
+def change_status(db, bug_id, status):
+    def work(tx):
+        old = tx.fetch_one(BUG_STATUS, (bug_id,))["status"]
+        tx.execute(UPDATE_BUG_STATUS, (status, bug_id))
+        stats.record_status_change(tx, old, status)
+
+    db.write(work)
+
+
+def snapshot(db):
+    return stats.status_counts(db), {
+        period: stats.created_trend(db, period) for period in stats.PERIODS
+    }
+
+
+def test_counters_follow_every_write_path(db):
+    ids = add_bugs(db, [("a", "New"), ("b", "New"), ("c", "Resolved")])
+    assert stats.status_counts(db) == {"New": 2, "Resolved": 1}
+
+    change_status(db, ids[0], "In Progress")
+    remove_bug(db, ids[2])
+    assert stats.status_counts(db) == {"New": 1, "In Progress": 1}
+    assert sum(count for _, count in stats.created_trend(db, "day")) == 2
+
+
+def test_incremental_state_matches_a_rebuild(db):
+    ids = add_bugs(db, [(f"bug {i}", ("New", "Closed")[i % 2]) for i in range(10)])
+    remove_bug(db, ids[3])
+    change_status(db, ids[4], "Resolved")
+    # Rows written outside the app, e.g. old data with spread timestamps
+    db.execute_write(
+        "INSERT INTO bugs (title, status, created_at) VALUES (?, ?, ?)",
+        ("imported", "New", "2020-01-02 03:04:05"),
+    )
+    incremental = snapshot(db)
+
+    stats.rebuild(db)
+    rebuilt = snapshot(db)
+    assert rebuilt[1] == incremental[1]
+    assert rebuilt[0] == {**incremental[0], "New": incremental[0]["New"] + 1}
+
+
+def test_trend_buckets(db):
+    for created_at in (
+        "2024-05-01 10:15:00",
+        "2024-05-01 10:45:00",
+        "2024-05-02 08:00:00",
+    ):
+        db.execute_write(
+            "INSERT INTO bugs (title, status, created_at) VALUES (?, ?, ?)",
+            ("old", "New", created_at),
+        )
+    stats.rebuild(db)
+    assert stats.buckets("2024-05-01 10:15:00") == {
+        "hour": "2024-05-01 10:00:00",
+        "day": "2024-05-01 00:00:00",
+    }
+    since = "2024-05-01 00:00:00"
+    assert stats.created_trend(db, "hour", since) == [
+        ("2024-05-01 10:00:00", 2),
+        ("2024-05-02 08:00:00", 1),
+    ]
+    assert stats.created_trend(db, "day", since) == [
+        ("2024-05-01 00:00:00", 2),
+        ("2024-05-02 00:00:00", 1),
+    ]
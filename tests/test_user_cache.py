@@ -0,0 +1,60 @@
+import pytest
+import os
+from prometheus_client import REGISTRY
+
+os.environ['TESTING'] = 'True'
+from app import app, user_cache, invalidate_user
+
+
+def lookups(source):
+    return REGISTRY.get_sample_value("user_lookups_total", {"source": source}) or 0
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    user_cache.clear()
+    with app.test_client() as client:
+        yield client
+    app.config['USER_IDENTITY_IN_SESSION'] = False
+
+
+def login(client):
+    return client.post('/login', data=dict(username="admin", password="admin123"))
+
+
+def test_authenticated_requests_use_cached_identity(client):
+    """After login, dashboard hits resolve the user without touching the DB."""
+    login(client)
+    db_before, cache_before = lookups("db"), lookups("cache")
+
+    for _ in range(3):
+        assert client.get("/").status_code == 200
+
+    assert lookups("db") == db_before
+    assert lookups("cache") == cache_before + 3
+
+
+def test_invalidated_user_is_reloaded_from_db(client):
+    login(client)
+    with client.session_transaction() as sess:
+        user_id = sess["_user_id"]
+    invalidate_user(user_id)
+    db_before = lookups("db")
+
+    client.get("/")
+    client.get("/")
+
+    assert lookups("db") == db_before + 1
+
+
+def test_identity_carried_in_session(client):
+    app.config['USER_IDENTITY_IN_SESSION'] = True
+    login(client)
+    user_cache.clear()
+    db_before, session_before = lookups("db"), lookups("session")
+
+    client.get("/")
+
+    assert lookups("db") == db_before
+    assert lookups("session") == session_before + 1